@@ -1,35 +1,102 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 import uvicorn
-from src import Parser, Solver
+from src import Parser, Solver, Dispatcher, JobManager, Monitor, ProblemCache, SessionManager
 from src.communication import Response, Issue
-import json
+from src.validation import ValidationError
 
 app = FastAPI()
-parser = Parser()
+# Requests repeating rooms, teachers, groups and clusters (e.g. an editor calling /check
+# after every change of allocations) reuse the Problem parsed for the first one.
+parser = Parser(ProblemCache.from_env("PROBLEM_CACHE"))
 solver = Solver()
+# Solving and checking run outside of the event loop, each with its own workers,
+# so long /schedule requests do not block cheap /check requests.
+# Limits can be configured with SCHEDULE_* and CHECK_* environment variables (see Dispatcher.from_env).
+schedule_dispatcher = Dispatcher.from_env("SCHEDULE", max_workers=2, max_queue=8, timeout=300)
+check_dispatcher = Dispatcher.from_env("CHECK", max_workers=4, max_queue=32, timeout=30)
+# Long schedule requests can also be submitted as jobs, polled for progress and cancelled.
+jobs = JobManager(lambda request, monitor: main(request, False, monitor), max_workers=2, max_queue=8)
+# Editing sessions keep their problems in this process, so they always run in threads.
+sessions = SessionManager(parser)
+session_dispatcher = Dispatcher(max_workers=4, max_queue=32, timeout=30)
 
 @app.post("/schedule")
 async def schedule_endpoint(request: dict):
-    result = main(json.dumps(request), False)
+    # solving is cancelled once the request times out, so it does not keep holding a worker
+    monitor = Monitor()
+    result = await schedule_dispatcher.run(main, request, False, monitor, monitor=monitor)
     return result
 
 @app.post("/check")
 async def check_endpoint(request: dict):
-    result = main(json.dumps(request), True)
+    result = await check_dispatcher.run(main, request, True)
     return result
- 
-def main(problem_json_string: str, just_check: bool) -> Response:
-    try:
-        if just_check:
-            request = parser.parse(problem_json_string, check_request=True)
-            check_msg = request.problem.check(method=request.method)
-            if check_msg == []:
-                return Response(True, [], [])
-            else:
-                return Response(False, check_msg, [])
+
+@app.post("/jobs")
+async def submit_job_endpoint(request: dict):
+    job = jobs.submit(request)
+    if job is None:
+        raise HTTPException(status_code=429, detail=f"Service is busy ({jobs.pending} jobs in progress). Try again later.")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+async def job_status_endpoint(job_id: str):
+    return get_job(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def job_result_endpoint(job_id: str):
+    job = get_job(job_id)
+    if job.result is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has no result (status: {job.status})")
+    return job.result
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job_endpoint(job_id: str):
+    return jobs.cancel(get_job(job_id).id).to_dict()
+
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job with id {job_id}")
+    return job
+
+@app.post("/sessions")
+async def create_session_endpoint(request: dict):
+    return await session_dispatcher.run(handle_errors, sessions.create, request)
+
+@app.patch("/sessions/{session_id}/allocations")
+async def edit_session_endpoint(session_id: str, request: dict):
+    if sessions.get(session_id) is None:
+        raise HTTPException(status_code=404, detail=f"No session with id {session_id}")
+    return await session_dispatcher.run(handle_errors, sessions.apply, session_id, request)
+
+@app.delete("/sessions/{session_id}")
+async def close_session_endpoint(session_id: str):
+    if not sessions.remove(session_id):
+        raise HTTPException(status_code=404, detail=f"No session with id {session_id}")
+    return {"id": session_id}
+
+def main(problem: dict, just_check: bool, monitor: Monitor = None) -> Response:
+    return handle_errors(solve_or_check, problem, just_check, monitor)
+
+def solve_or_check(problem: dict, just_check: bool, monitor: Monitor = None) -> Response:
+    if just_check:
+        request = parser.parse_dict(problem, check_request=True)
+        check_msg = request.problem.check(method=request.method)
+        if check_msg == []:
+            return Response(True, [], [])
         else:
-            request = parser.parse(problem_json_string)
-            return solver.solve(request.problem, request.method)
+            return Response(False, check_msg, [])
+    else:
+        request = parser.parse_dict(problem)
+        return solver.solve(request.problem, request.method, request.restarts, request.workers, request.select, request.deadline, monitor)
+
+def handle_errors(fn, *args) -> Response:
+    # errors raised while handling a request are sent back as issues
+    try:
+        return fn(*args)
+    except ValidationError as e:
+        return Response(False, e.issues, [])
     except RuntimeError as e:
         return Response(False, [Issue("runtime_error", 0, e.args[0])], [])
     except KeyError as e:
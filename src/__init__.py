@@ -1,5 +1,11 @@
 from src.models import Allocation, Availability, Cluster, Group, Room, Teacher
 from src.communication import Query, Response
 from .problem import Problem, CHECK_OPTIONS
-from .solver import Solver, ALGORITHMS_AVAILABLE
+from .room_index import RoomIndex
+from .solver import Solver, ALGORITHMS_AVAILABLE, SELECT_OPTIONS, PORTFOLIO_METHOD
+from .problem_cache import ProblemCache
 from .parser import Parser
+from .dispatcher import Dispatcher
+from .jobs import Job, JobStore, InMemoryJobStore, JobManager
+from .sessions import Session, SessionManager
+from .monitor import Monitor
@@ -1,5 +1,11 @@
-from .utils import covers, get_all_placements_for_group
+from .utils import covers, get_all_placements_for_group, iter_placement_candidates, sample_placement
 from .random_solve import random_solve
 from .ordered_groups_solve import ordered_groups_solve
-from .rating_function_solve import rating_function_solve
+from .rating_function_solve import rating_function_solve, rating_function, placement_rating, rate_solution, ScheduleRating
 from .deep_ordered_groups_solve import deep_ordered_groups_solve
+from .backtracking_solve import backtracking_solve, BacktrackingSearch
+from .repair_solve import repair_solve, RepairSearch
+from .annealing_solve import annealing_solve, Annealing
+from .lns_solve import lns_solve, NeighbourhoodSearch
+from .exact_solve import exact_solve, ExactModel
+from .sat import SatSolver
@@ -0,0 +1,119 @@
+from .utils import cancelled_response, get_placements_of_groups
+from .backtracking_solve import BacktrackingSearch, search_response, SOLVED
+from .repair_solve import RepairSearch
+from .rating_function_solve import ScheduleRating
+from src import Problem
+from src.models import Allocation
+from src.communication import Response, Issue
+import math
+import random
+import time
+
+# budget of the optimisation: steps per group to place and seconds
+ANNEALING_STEPS_PER_GROUP = 100
+ANNEALING_TIME_LIMIT = 10.0
+# temperature at the start and at the end of the cooling (in points of rating)
+ANNEALING_START_TEMPERATURE = 5.0
+ANNEALING_END_TEMPERATURE = 0.05
+
+class Annealing:
+    # Simulated annealing over feasible schedules. A step relocates a random group,
+    # changes its rooms or swaps times of two groups; moves creating conflicts are skipped
+    # (conflicts are counted as in RepairSearch) and the others are accepted if they do not
+    # lower the rating, or with probability exp(delta / temperature) otherwise.
+    # The temperature falls geometrically with the used part of the budget.
+    def __init__(self, prob: Problem, placements: dict[int, list[Allocation]], solution: list[Allocation]):
+        self.prob = prob
+        self.state = RepairSearch(prob, placements)
+        self.state.assign(solution)
+        self.rating = ScheduleRating(prob, prob.allocations + solution)
+        self.best = dict(self.state.assignment)
+        self.best_rating = self.rating.total
+        self.steps = 0
+
+    def neighbour(self) -> dict[int, Allocation] | None:
+        # new placements of one or two groups, or None if the chosen move is not possible
+        state = self.state
+        g_id = random.choice(list(state.assignment))
+        current = state.assignment[g_id]
+        r = random.random()
+        if r < 0.5:
+            return {g_id: random.choice(state.placements[g_id])}
+        if r < 0.8:
+            return {g_id: random.choice(state.by_time[g_id][(current.day, current.slots[0])])}
+        h_id = random.choice(list(state.assignment))
+        other = state.assignment[h_id]
+        g_options = state.by_time[g_id].get((other.day, other.slots[0]), [])
+        h_options = state.by_time[h_id].get((current.day, current.slots[0]), [])
+        if h_id == g_id or not g_options or not h_options:
+            return None
+        return {g_id: random.choice(g_options), h_id: random.choice(h_options)}
+
+    def feasible(self, changes: dict[int, Allocation]) -> bool:
+        if len(changes) == 1:
+            (allocation,) = changes.values()
+            return self.state.conflicts_at(allocation) == 0
+        old = {g_id: self.state.assignment[g_id] for g_id in changes}
+        self.state.move(changes)
+        if any(self.state.conflicts[g_id] for g_id in changes):
+            self.state.move(old)
+            return False
+        self.state.move(old)
+        return True
+
+    def step(self, temperature: float) -> None:
+        changes = self.neighbour()
+        if changes is None or not self.feasible(changes):
+            return
+        old = {g_id: self.state.assignment[g_id] for g_id in changes}
+        delta = self.rating.change([(old[g_id], new) for g_id, new in changes.items()])
+        if delta >= 0 or random.random() < math.exp(delta / temperature):
+            self.state.move(changes)
+            if self.rating.total > self.best_rating:
+                self.best = dict(self.state.assignment)
+                self.best_rating = self.rating.total
+        else:
+            self.rating.change([(new, old[g_id]) for g_id, new in changes.items()])
+
+    def run(self, max_steps: int, time_limit: float) -> None:
+        start = time.monotonic()
+        while self.steps < max_steps and not self.prob.monitor.cancelled:
+            used = max(self.steps / max_steps, (time.monotonic() - start) / time_limit)
+            if used >= 1:
+                break
+            temperature = ANNEALING_START_TEMPERATURE * (ANNEALING_END_TEMPERATURE / ANNEALING_START_TEMPERATURE) ** used
+            self.step(temperature)
+            self.steps += 1
+
+def annealing_solve(prob: Problem, steps_per_group: int = ANNEALING_STEPS_PER_GROUP, time_limit: float = ANNEALING_TIME_LIMIT) -> Response:
+    groups     = list(prob.groups.values())
+
+    # remove established groups from groups
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
+
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
+
+    # placements possible next to established allocations only
+    placements, failure = get_placements_of_groups(groups, prob, "ANNEALING_SOLVE")
+    if failure is not None:
+        return failure
+
+    # start from a feasible solution
+    marker = prob.snapshot()
+    search = BacktrackingSearch(prob, groups)
+    result = search.run()
+    if result != SOLVED:
+        return search_response(prob, search, result)
+    solution = [a for a in prob.allocations if a.group_id in placements]
+    prob.restore(marker)
+
+    annealing = Annealing(prob, placements, solution)
+    annealing.run(steps_per_group * len(groups), time_limit)
+    if prob.monitor.cancelled:
+        return cancelled_response(prob)
+
+    for g in groups:
+        if not prob.add_allocation_and_update_availability(annealing.best[g.id]):
+            return Response(False, [Issue("other", 0, "Unexpected error while looking for solution")], [])
+    return Response(True, [], prob.allocations)
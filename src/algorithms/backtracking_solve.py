@@ -0,0 +1,222 @@
+from .utils import cancelled_response, iter_placement_candidates, number_of_possible_placements
+from src import Problem
+from src.models import Group, Allocation
+from src.communication import Response, Issue
+from itertools import product
+import random
+import time
+
+# budget of one search, after which it gives up (see BacktrackingSearch)
+BACKTRACKING_MAX_NODES = 100000
+BACKTRACKING_TIME_LIMIT = 60.0
+# nodes of the first run before the search is restarted (the limit doubles with every restart)
+BACKTRACKING_RESTART_NODES = 100
+
+# results of BacktrackingSearch.run()
+SOLVED = "solved"
+INFEASIBLE = "infeasible"
+OUT_OF_BUDGET = "out_of_budget"
+CANCELLED = "cancelled"
+RESTART = "restart"
+
+class Frame:
+    # one level of the search: the group being placed and placements left to try
+    def __init__(self, group: Group, placements):
+        self.group = group
+        self.placements = placements
+        # ids of placed groups responsible for failures of tried placements
+        self.conflicts = set()
+        # set while a placement of the group is booked
+        self.marker = None
+        self.saved_counts = None
+
+class BacktrackingSearch:
+    # Depth-first search placing `groups` into the problem as it is (other allocations stay).
+    # The next group is the one with the fewest placements left (MRV). After a placement
+    # is booked, placements of groups sharing a teacher, a candidate room or a cluster
+    # with it are counted again and a group left with none rejects the placement
+    # (forward checking). When all placements of a group fail, the search jumps back
+    # to the deepest placed group which could have caused it (conflict-directed backjumping),
+    # skipping placed groups unrelated to the failure.
+    # Unlucky early choices can make the search very long, so it is restarted
+    # in another random order after a number of nodes which doubles with every restart.
+    # Every booking is undone with Problem.snapshot() / restore().
+    def __init__(self, prob: Problem, groups: list[Group], max_nodes: int = BACKTRACKING_MAX_NODES, time_limit: float = BACKTRACKING_TIME_LIMIT):
+        self.prob = prob
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.nodes = 0
+        self.remaining = {g.id: g for g in groups}
+        self.placed = set()
+        # ties are resolved by the initial order of groups
+        self.order = {g.id: i for i, g in enumerate(groups)}
+        self.counts = {g.id: number_of_possible_placements(g, prob) for g in groups}
+        # group which could not be placed when the search failed
+        self.failed_group = None
+
+        self.groups_by_teacher = {}
+        self.groups_by_room = {}
+        room_index = prob.get_room_index()
+        for g in groups:
+            for t_id in g.teacher_ids:
+                self.groups_by_teacher.setdefault(t_id, set()).add(g.id)
+            for room_ids in room_index.candidates_for_group(g.labels, g.capacity):
+                for r_id in room_ids:
+                    self.groups_by_room.setdefault(r_id, set()).add(g.id)
+
+        # groups whose placement may take placements of the group
+        self.related = {}
+        for g in groups:
+            related = set()
+            for c in prob.clusters_by_group.get(g.id, []):
+                related |= c.group_ids
+            for t_id in g.teacher_ids:
+                related |= self.groups_by_teacher[t_id]
+            for room_ids in room_index.candidates_for_group(g.labels, g.capacity):
+                for r_id in room_ids:
+                    related |= self.groups_by_room[r_id]
+            related.discard(g.id)
+            self.related[g.id] = related & self.remaining.keys()
+
+    def affected_by(self, allocation: Allocation) -> set:
+        # remaining groups which may lose placements when `allocation` is booked
+        g = self.prob.groups[allocation.group_id]
+        affected = set()
+        for c in self.prob.clusters_by_group.get(g.id, []):
+            affected |= c.group_ids
+        for t_id in g.teacher_ids:
+            affected |= self.groups_by_teacher.get(t_id, set())
+        for r_id in allocation.room_ids:
+            affected |= self.groups_by_room.get(r_id, set())
+        return affected & self.remaining.keys()
+
+    def culprits(self, g_id: int) -> set:
+        # placed groups which may have taken placements of the group
+        return self.related[g_id] & self.placed
+
+    def select(self) -> Group:
+        g_id = min(self.remaining, key=lambda id: (self.counts[id], self.order[id]))
+        return self.remaining.pop(g_id)
+
+    def open(self, g: Group) -> Frame:
+        # candidates are listed now, as the problem changes while deeper levels are searched
+        candidates = list(iter_placement_candidates(g, self.prob))
+        random.shuffle(candidates)
+        placements = (
+            Allocation(g.id, list(room_ids), day, list(range(start, start+g.duration)))
+            for day, start, ok_rooms in candidates
+            for room_ids in product(*ok_rooms)
+        )
+        return Frame(g, placements)
+
+    def book(self, frame: Frame, allocation: Allocation) -> bool:
+        # books the placement unless it leaves some remaining group with no placements
+        g_id = frame.group.id
+        marker = self.prob.snapshot()
+        if not self.prob.add_allocation_and_update_availability(allocation):
+            frame.conflicts |= self.culprits(g_id)
+            return False
+
+        affected = self.affected_by(allocation)
+        saved_counts = {id: self.counts[id] for id in affected}
+        for id in affected:
+            self.counts[id] = number_of_possible_placements(self.remaining[id], self.prob)
+            if self.counts[id] == 0:
+                frame.conflicts |= self.culprits(id)
+                self.counts.update(saved_counts)
+                self.prob.restore(marker)
+                return False
+
+        frame.marker = marker
+        frame.saved_counts = saved_counts
+        self.placed.add(g_id)
+        self.prob.monitor.placed()
+        return True
+
+    def unbook(self, frame: Frame) -> None:
+        self.prob.restore(frame.marker)
+        self.counts.update(frame.saved_counts)
+        self.placed.discard(frame.group.id)
+        self.prob.monitor.unplaced()
+        frame.marker = None
+
+    def run(self) -> str:
+        deadline = time.monotonic() + self.time_limit
+        restart_nodes = BACKTRACKING_RESTART_NODES
+        while True:
+            result = self.search(deadline, self.nodes + restart_nodes)
+            if result != RESTART:
+                return result
+            restart_nodes *= 2
+            order = list(self.order)
+            random.shuffle(order)
+            self.order = {g_id: i for i, g_id in enumerate(order)}
+
+    def search(self, deadline: float, restart_at: int) -> str:
+        if not self.remaining:
+            return SOLVED
+        stack = [self.open(self.select())]
+        while True:
+            frame = stack[-1]
+            if self.prob.monitor.cancelled:
+                return CANCELLED
+            if self.nodes >= self.max_nodes or time.monotonic() > deadline:
+                return OUT_OF_BUDGET
+            if self.nodes >= restart_at:
+                for frame in reversed(stack):
+                    if frame.marker is not None:
+                        self.unbook(frame)
+                    self.remaining[frame.group.id] = frame.group
+                return RESTART
+
+            allocation = next(frame.placements, None)
+            if allocation is None:
+                # every placement failed; jump back to the deepest group responsible
+                conflicts = frame.conflicts | self.culprits(frame.group.id)
+                stack.pop()
+                self.remaining[frame.group.id] = frame.group
+                while stack:
+                    parent = stack[-1]
+                    self.unbook(parent)
+                    if parent.group.id in conflicts:
+                        parent.conflicts |= conflicts - {parent.group.id}
+                        break
+                    stack.pop()
+                    self.remaining[parent.group.id] = parent.group
+                else:
+                    self.failed_group = frame.group
+                    return INFEASIBLE
+                continue
+
+            self.nodes += 1
+            if not self.book(frame, allocation):
+                continue
+            if not self.remaining:
+                return SOLVED
+            stack.append(self.open(self.select()))
+
+def backtracking_solve(prob: Problem, max_nodes: int = BACKTRACKING_MAX_NODES, time_limit: float = BACKTRACKING_TIME_LIMIT) -> Response:
+    groups     = list(prob.groups.values())
+
+    # remove established groups from groups
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
+
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
+
+    random.shuffle(groups)
+    search = BacktrackingSearch(prob, groups, max_nodes, time_limit)
+    result = search.run()
+
+    return search_response(prob, search, result)
+
+def search_response(prob: Problem, search: BacktrackingSearch, result: str) -> Response:
+    # response for the result of BacktrackingSearch.run()
+    if result == CANCELLED:
+        return cancelled_response(prob)
+    if result == OUT_OF_BUDGET:
+        return Response(False, [Issue("solver", 0, f"Search stopped after {search.nodes} placements tried without finding a solution (BACKTRACKING_SOLVE)")], prob.allocations)
+    if result == INFEASIBLE:
+        g = search.failed_group
+        return Response(False, [Issue("group", g.id, f"Could not find placement for group with id={g.id}, whatever placements of other groups are chosen (BACKTRACKING_SOLVE)")], prob.allocations)
+    return Response(True, [], prob.allocations)
@@ -0,0 +1,96 @@
+from .utils import number_of_possible_placements, sample_placement
+from src import Problem
+from src.models import Group, Allocation
+import heapq
+
+# difficulty of a group which is already placed (as in ordered_groups_solve)
+PLACED_DIFFICULTY = 86400
+
+class DifficultyTracker:
+    # Keeps groups ordered by difficulty (number of possible placements,
+    # lowered to the minimum over the group's clusters) while they are being placed.
+    # After an allocation is booked only groups sharing a teacher, a candidate room
+    # or a cluster with the placed group are recomputed; stale heap entries are
+    # skipped lazily when popping.
+    def __init__(self, prob: Problem, groups: list[Group]):
+        self.prob = prob
+        self.remaining = {g.id: g for g in groups}
+        self.counts = {g.id: number_of_possible_placements(g, prob) for g in groups}
+
+        self.groups_by_teacher = {}
+        self.groups_by_room = {}
+        self.cluster_mates = {g.id: set() for g in groups}
+        room_index = prob.get_room_index()
+        for g in groups:
+            for t_id in g.teacher_ids:
+                self.groups_by_teacher.setdefault(t_id, set()).add(g.id)
+            for room_ids in room_index.candidates_for_group(g.labels, g.capacity):
+                for r_id in room_ids:
+                    self.groups_by_room.setdefault(r_id, set()).add(g.id)
+        for g in groups:
+            for c in prob.clusters_by_group.get(g.id, []):
+                self.cluster_mates[g.id].update(c.group_ids)
+
+        self.heap = []
+        self.versions = {}
+        # ties are resolved by the initial order of groups
+        self.order = {g.id: i for i, g in enumerate(groups)}
+        for g_id in self.remaining:
+            self.push(g_id)
+
+    def __len__(self) -> int:
+        return len(self.remaining)
+
+    def difficulty(self, g_id: int) -> int:
+        difficulty = self.counts[g_id]
+        for mate_id in self.cluster_mates[g_id]:
+            difficulty = min(difficulty, self.counts.get(mate_id, PLACED_DIFFICULTY))
+        return difficulty
+
+    def push(self, g_id: int) -> None:
+        version = self.versions.get(g_id, 0) + 1
+        self.versions[g_id] = version
+        heapq.heappush(self.heap, (self.difficulty(g_id), self.order[g_id], g_id, version))
+
+    def pop(self) -> Group | None:
+        # the most difficult remaining group, removed from the tracker
+        while self.heap:
+            _, _, g_id, version = heapq.heappop(self.heap)
+            if g_id in self.remaining and self.versions[g_id] == version:
+                del self.counts[g_id]
+                return self.remaining.pop(g_id)
+        return None
+
+    def booked(self, allocation: Allocation) -> None:
+        # update difficulties after `allocation` was added to the problem
+        g = self.prob.groups[allocation.group_id]
+
+        affected = set(self.cluster_mates.get(g.id, ()))
+        for t_id in g.teacher_ids:
+            affected |= self.groups_by_teacher.get(t_id, set())
+        for r_id in allocation.room_ids:
+            affected |= self.groups_by_room.get(r_id, set())
+        affected &= self.remaining.keys()
+
+        for g_id in affected:
+            self.counts[g_id] = number_of_possible_placements(self.remaining[g_id], self.prob)
+
+        # difficulty is shared inside clusters, so mates of recomputed groups move as well
+        to_push = set(affected)
+        for g_id in affected:
+            to_push |= self.cluster_mates[g_id]
+        for g_id in to_push & self.remaining.keys():
+            self.push(g_id)
+
+def greedy_placement(groups: list[Group], prob: Problem) -> bool:
+    # Books the groups as deep_ordered_groups_solve does (hardest first, at a random placement),
+    # but groups which cannot be placed are skipped. False if solving was cancelled meanwhile.
+    tracker = DifficultyTracker(prob, groups)
+    while len(tracker) > 0:
+        if prob.monitor.cancelled:
+            return False
+        g = tracker.pop()
+        allocation = sample_placement(g, prob)
+        if allocation is not None and prob.add_allocation_and_update_availability(allocation):
+            tracker.booked(allocation)
+    return True
@@ -0,0 +1,222 @@
+from .utils import cancelled_response, get_placements_of_groups
+from .sat import new_sat_solver
+from src import Problem
+from src.models import Group, Allocation, Cluster
+from src.communication import Response, Issue
+import random
+import time
+
+# budget of the whole search (including looking for a minimal set of conflicting groups)
+EXACT_MAX_CONFLICTS = 200000
+EXACT_TIME_LIMIT = 60.0
+# conflicts between checks of the budget and of cancellation
+EXACT_CONFLICTS_PER_CALL = 1000
+
+# results of ExactModel.solve()
+SAT = "sat"
+UNSAT = "unsat"
+UNKNOWN = "unknown"
+CANCELLED = "cancelled"
+
+class ExactModel:
+    # Encoding of the problem as boolean satisfiability. Every placement of a group
+    # (day, start and rooms) is a variable; a group takes at most one of its placements
+    # and, if its selector variable is true, at least one. Placements sharing a teacher
+    # or a room in some slot take it at most once, unless occurrence_desc of their
+    # groups lets them share it (then they are kept apart only from placements whose
+    # periods overlap theirs). Clusters depend on times of placements only: every block
+    # of a cluster's range gets a variable per position it can take, and a slot used at
+    # a time of a group of the cluster needs a block covering it (or, for an empty range,
+    # the times of its groups use every slot at most once).
+    # Selectors are assumptions, so infeasibility is proven for a chosen subset of groups
+    # and the solver names the selectors it used (see minimal_conflict).
+    def __init__(self, prob: Problem, groups: list[Group], placements: dict[int, list[Allocation]], native: bool = True):
+        self.prob = prob
+        self.solver = new_sat_solver(native)
+        self.selectors = {}
+        self.group_of_selector = {}
+        self.placement_vars = {g.id: [] for g in groups}
+        self.allocation_of = {}
+        # group id -> (day, start) -> variable true iff the group takes place then (groups of clusters only)
+        self.times = {}
+        self.conflicts = 0
+
+        # (kind, id, day, slot) -> periods (frozenset, empty for every period) -> placement variables
+        usage = {}
+        for g in groups:
+            selector = self.solver.new_var(decision=False)
+            self.selectors[g.id] = selector
+            self.group_of_selector[selector] = g.id
+            periods = frozenset(g.occurrence_desc)
+            # groups with fewer placements are decided first
+            priority = 1 / len(placements[g.id])
+            for allocation in placements[g.id]:
+                var = self.solver.new_var(phase=True, priority=priority)
+                self.placement_vars[g.id].append(var)
+                self.allocation_of[var] = allocation
+                resources = [("teacher", t_id) for t_id in g.teacher_ids] + [("room", r_id) for r_id in allocation.room_ids]
+                for kind, id in resources:
+                    for slot in allocation.slots:
+                        usage.setdefault((kind, id, allocation.day, slot), {}).setdefault(periods, []).append(var)
+            self.solver.add_clause([-selector] + self.placement_vars[g.id])
+            self.solver.add_at_most_one(self.placement_vars[g.id])
+            if prob.clusters_by_group.get(g.id):
+                self.add_times(g)
+
+        for by_periods in usage.values():
+            self.add_resource(by_periods)
+        for c in prob.clusters:
+            self.add_cluster(c)
+
+    def add_times(self, g: Group) -> None:
+        by_time = {}
+        for var in self.placement_vars[g.id]:
+            allocation = self.allocation_of[var]
+            by_time.setdefault((allocation.day, allocation.slots[0]), []).append(var)
+        self.times[g.id] = {}
+        for day_start, variables in by_time.items():
+            time_var = self.solver.new_var(decision=False)
+            self.times[g.id][day_start] = time_var
+            self.solver.add_clause([-time_var] + variables)
+            for var in variables:
+                self.solver.add_clause([-var, time_var])
+
+    def add_resource(self, by_periods: dict[frozenset, list[int]]) -> None:
+        # one teacher or room in one slot
+        if len(by_periods) == 1:
+            (variables,) = by_periods.values()
+            self.solver.add_at_most_one(variables)
+            return
+        used = {}
+        for periods, variables in by_periods.items():
+            self.solver.add_at_most_one(variables)
+            used[periods] = self.solver.new_var(decision=False)
+            for var in variables:
+                self.solver.add_clause([-var, used[periods]])
+        keys = list(by_periods)
+        for i, a in enumerate(keys):
+            for b in keys[i+1:]:
+                # as in Availability.check_occurrence_desc, no periods means every period
+                if not a or not b or a & b:
+                    self.solver.add_clause([-used[a], -used[b]])
+
+    def add_cluster(self, cluster: Cluster) -> None:
+        # (day, slot) -> time variables of groups of the cluster using it (None for established allocations)
+        slot_users = {}
+        for g_id in cluster.group_ids:
+            for allocation in self.prob.allocations_by_group.get(g_id, []):
+                for slot in allocation.slots:
+                    slot_users.setdefault((allocation.day, slot), []).append(None)
+            duration = self.prob.groups[g_id].duration
+            for (day, start), time_var in self.times.get(g_id, {}).items():
+                for slot in range(start, start + duration):
+                    slot_users.setdefault((day, slot), []).append(time_var)
+
+        if cluster.range == []:
+            for (day, slot), users in slot_users.items():
+                established = users.count(None)
+                variables = [var for var in users if var is not None]
+                if established > 1:
+                    self.solver.add_clause([])
+                elif established:
+                    for var in variables:
+                        self.solver.add_clause([-var])
+                else:
+                    self.solver.add_at_most_one(variables)
+            return
+
+        # (day, slot) -> variables of block positions covering it
+        covering = {}
+        for length in cluster.range:
+            positions = {(day, start) for day, slot in slot_users for start in range(max(slot - length + 1, 0), slot + 1)}
+            block = []
+            for day, start in positions:
+                var = self.solver.new_var()
+                block.append(var)
+                for slot in range(start, start + length):
+                    covering.setdefault((day, slot), []).append(var)
+            self.solver.add_at_most_one(block)
+        for key, users in slot_users.items():
+            for var in set(users):
+                self.solver.add_clause(([] if var is None else [-var]) + covering.get(key, []))
+
+    def solve(self, g_ids: list[int], deadline: float, max_conflicts: int) -> tuple[str, object]:
+        # (SAT, placements of the groups), (UNSAT, ids of groups which cannot all be placed)
+        # or (UNKNOWN / CANCELLED, None) for the given groups
+        assumptions = [self.selectors[g_id] for g_id in g_ids]
+        while True:
+            if self.prob.monitor.cancelled:
+                return CANCELLED, None
+            if self.conflicts >= max_conflicts or time.monotonic() > deadline:
+                return UNKNOWN, None
+            before = self.solver.conflicts
+            result = self.solver.solve(assumptions, EXACT_CONFLICTS_PER_CALL)
+            self.conflicts += self.solver.conflicts - before
+            if result is False:
+                return UNSAT, [self.group_of_selector[lit] for lit in self.solver.core()]
+            if result:
+                model = self.solver.model
+                return SAT, [
+                    next(self.allocation_of[var] for var in self.placement_vars[g_id] if var in model)
+                    for g_id in g_ids
+                ]
+
+    def minimal_conflict(self, core: list[int], deadline: float, max_conflicts: int) -> tuple[list[int], bool]:
+        # Removes groups from `core` (groups which cannot all be placed) one by one
+        # while the rest still cannot be placed. Returns the groups left and whether
+        # every one of them was proven necessary (False if the budget ran out).
+        core = list(core)
+        proven = True
+        for g_id in list(core):
+            if g_id not in core:
+                continue
+            rest = [id for id in core if id != g_id]
+            result, value = self.solve(rest, deadline, max_conflicts)
+            if result == UNSAT:
+                # the solver may name even fewer groups
+                core = [id for id in rest if id in value]
+            elif result != SAT:
+                proven = False
+        return core, proven
+
+def exact_solve(prob: Problem, max_conflicts: int = EXACT_MAX_CONFLICTS, time_limit: float = EXACT_TIME_LIMIT, native: bool = True) -> Response:
+    groups     = list(prob.groups.values())
+
+    # remove established groups from groups
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
+
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
+
+    # placements possible next to established allocations only
+    placements, failure = get_placements_of_groups(groups, prob, "EXACT_SOLVE")
+    if failure is not None:
+        return failure
+    for g in groups:
+        random.shuffle(placements[g.id])
+
+    deadline = time.monotonic() + time_limit
+    model = ExactModel(prob, groups, placements, native)
+    result, value = model.solve([g.id for g in groups], deadline, max_conflicts)
+
+    if result == CANCELLED:
+        return cancelled_response(prob)
+    if result == UNKNOWN:
+        return Response(False, [Issue("solver", 0, f"Search stopped after {model.conflicts} conflicts without finding a solution or proving there is none (EXACT_SOLVE)")], prob.allocations)
+    if result == UNSAT:
+        core, proven = model.minimal_conflict(value, deadline, max_conflicts)
+        if prob.monitor.cancelled:
+            return cancelled_response(prob)
+        ids = sorted(core)
+        note = "" if proven else " (the set may not be minimal, the search ran out of budget)"
+        issues = [
+            Issue("group", g_id, f"Groups with ids={ids} cannot all be placed, whatever placements are chosen{note} (EXACT_SOLVE)")
+            for g_id in ids
+        ]
+        return Response(False, issues, prob.allocations)
+
+    for allocation in value:
+        if not prob.add_allocation_and_update_availability(allocation):
+            return Response(False, [Issue("other", 0, "Unexpected error while looking for solution")], [])
+        prob.monitor.placed()
+    return Response(True, [], prob.allocations)
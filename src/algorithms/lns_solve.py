@@ -0,0 +1,137 @@
+from .utils import cancelled_response, get_placements_of_groups
+from .difficulty import greedy_placement
+from .backtracking_solve import BacktrackingSearch, SOLVED
+from .rating_function_solve import ScheduleRating
+from src import Problem
+from src.models import Group, Allocation
+from src.communication import Response, Issue
+import random
+import time
+
+# budget of the whole search: neighbourhoods re-solved and seconds
+LNS_MAX_ITERATIONS = 200
+LNS_TIME_LIMIT = 30.0
+# placements tried by the backtracking search in one neighbourhood
+LNS_NEIGHBOURHOOD_NODES = 1000
+
+class NeighbourhoodSearch:
+    # Large neighbourhood search. The solution is a placement of (possibly some of) the groups.
+    # Every iteration frees a neighbourhood of a group - all groups of one of its teachers,
+    # all groups of one of its clusters or all groups using one of its rooms on its day -
+    # books the rest of the solution and places the freed groups again with a small
+    # BacktrackingSearch. While some groups are not placed, the neighbourhood is taken
+    # around one of them and the search has to place it too; afterwards a random
+    # neighbourhood is re-solved and kept if it does not lower the rating (see ScheduleRating).
+    # Bookings cannot be released one by one, so the fixed part of the solution is booked
+    # again in every iteration, which costs time linear in the number of groups.
+    def __init__(self, prob: Problem, groups: list[Group], placements: dict[int, list[Allocation]]):
+        self.prob = prob
+        self.groups = {g.id: g for g in groups}
+        self.placements = placements
+        # marker of the problem with established allocations booked only
+        self.base = prob.snapshot()
+        self.solution = {}
+        self.rating = None
+        self.iterations = 0
+
+        self.groups_by_teacher = {}
+        for g in groups:
+            for t_id in g.teacher_ids:
+                self.groups_by_teacher.setdefault(t_id, set()).add(g.id)
+
+    def unplaced(self) -> list[int]:
+        return [g_id for g_id in self.groups if g_id not in self.solution]
+
+    def neighbourhood(self, g_id: int) -> set:
+        # ids of groups to place again together with the group
+        g = self.groups[g_id]
+        allocation = self.solution.get(g_id) or random.choice(self.placements[g_id])
+        kind = random.randrange(3)
+        if kind == 0 and g.teacher_ids:
+            freed = set(self.groups_by_teacher[random.choice(g.teacher_ids)])
+        elif kind == 1 and self.prob.clusters_by_group.get(g_id):
+            freed = random.choice(self.prob.clusters_by_group[g_id]).group_ids & self.groups.keys()
+        else:
+            rooms = set(allocation.room_ids)
+            freed = {
+                a.group_id for a in self.solution.values()
+                if a.day == allocation.day and rooms.intersection(a.room_ids)
+            }
+        freed.add(g_id)
+        return freed
+
+    def book(self, allocations) -> None:
+        # every subset of the solution fits, so bookings cannot fail
+        for allocation in allocations:
+            self.prob.add_allocation_and_update_availability(allocation)
+
+    def iterate(self, deadline: float) -> bool:
+        # re-solves one neighbourhood and returns True if its new placements are kept
+        unplaced = self.unplaced()
+        target = random.choice(unplaced) if unplaced else random.choice(list(self.solution))
+        freed = self.neighbourhood(target)
+        self.prob.restore(self.base)
+        self.book(a for g_id, a in self.solution.items() if g_id not in freed)
+
+        groups = [self.groups[g_id] for g_id in freed]
+        random.shuffle(groups)
+        search = BacktrackingSearch(self.prob, groups, LNS_NEIGHBOURHOOD_NODES, max(deadline - time.monotonic(), 0))
+        if search.run() != SOLVED:
+            return False
+        new = {a.group_id: a for a in self.prob.allocations if a.group_id in freed}
+
+        if self.rating is not None:
+            changes = [(self.solution[g_id], a) for g_id, a in new.items()]
+            if self.rating.change(changes) < 0:
+                self.rating.change([(a, old) for old, a in changes])
+                return False
+        self.solution.update(new)
+        if self.rating is None and not self.unplaced():
+            self.rating = ScheduleRating(self.prob, list(self.solution.values()))
+        return True
+
+    def run(self, solution: list[Allocation], max_iterations: int, time_limit: float) -> None:
+        self.solution = {a.group_id: a for a in solution}
+        if not self.unplaced():
+            self.rating = ScheduleRating(self.prob, solution)
+        deadline = time.monotonic() + time_limit
+        while self.iterations < max_iterations and not self.prob.monitor.cancelled and time.monotonic() < deadline:
+            self.iterations += 1
+            self.iterate(deadline)
+            self.prob.monitor.reset_placed(len(self.solution))
+        # leave the problem with the whole solution booked
+        self.prob.restore(self.base)
+        self.book(self.solution.values())
+
+def lns_solve(prob: Problem, max_iterations: int = LNS_MAX_ITERATIONS, time_limit: float = LNS_TIME_LIMIT) -> Response:
+    groups     = list(prob.groups.values())
+
+    # remove established groups from groups
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
+
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
+
+    # placements possible next to established allocations only
+    placements, failure = get_placements_of_groups(groups, prob, "LNS_SOLVE")
+    if failure is not None:
+        return failure
+
+    search = NeighbourhoodSearch(prob, groups, placements)
+    if not greedy_placement(groups, prob):
+        return cancelled_response(prob)
+    greedy = [a for a in prob.allocations if a.group_id in placements]
+    prob.monitor.reset_placed(len(greedy))
+
+    search.run(greedy, max_iterations, time_limit)
+    if prob.monitor.cancelled:
+        return cancelled_response(prob)
+
+    unplaced = search.unplaced()
+    if not unplaced:
+        return Response(True, [], prob.allocations)
+    issues = [
+        Issue("group", g_id, f"Could not place group with id={g_id} in {search.iterations} neighbourhoods (LNS_SOLVE)")
+        for g_id in unplaced
+    ]
+    return Response(False, issues, prob.allocations)
@@ -1,11 +1,8 @@
-from .utils import get_all_placements_for_group, number_of_possible_placements
+from .utils import cancelled_response, sample_placement, number_of_possible_placements
 from src import Problem
 from src.communication import Response, Issue
-import random
-import copy
 
 def ordered_groups_solve(prob: Problem) -> Response:
-    established_groups = [r.group_id for r in prob.allocations]
     groups     = list(prob.groups.values())
 
     # sort groups bu difficulty
@@ -24,28 +21,28 @@ def ordered_groups_solve(prob: Problem) -> Response:
     groups.sort(key=lambda g: map_group_id_difficulty[g.id])
 
     # remove established groups from groups
-    groups = [g for g in groups if g.id not in established_groups]
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
 
-    # delete user established allocations and re-add to delete availabilities
-    copy_allocations = copy.deepcopy(prob.allocations)
-    prob.allocations = []
-    for alloc in copy_allocations:
-        prob.add_allocation_and_update_availability(alloc)
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
 
     while len(groups) > 0:
+        if prob.monitor.cancelled:
+            return cancelled_response(prob)
+
         # get next group
         g = groups.pop(0)
 
-        # get all possible terms and rooms for a group
-        placements = get_all_placements_for_group(g, prob)
+        # pick a random placement without listing all of them
+        random_allocation = sample_placement(g, prob)
 
-        if len(placements) == 0:
+        if random_allocation is None:
             # not very useful msg
             return Response(False, [Issue("group", g.id, f"Could not find placement for group with id={g.id} (ORDERED_SOLVE)")], prob.allocations)
         
         # add random placement to soulution and delete availabilities
-        random_allocation = random.choice(placements) 
         if not prob.add_allocation_and_update_availability(random_allocation):
             return Response(False, [Issue("other", 0, "Unexpected error while looking for solution")], [])
+        prob.monitor.placed()
 
     return Response(True, [], prob.allocations)
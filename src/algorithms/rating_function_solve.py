@@ -1,11 +1,12 @@
-from .utils import get_all_placements_for_group, number_of_possible_placements, get_best_allocation
+from .utils import cancelled_response, get_all_placements_for_group, number_of_possible_placements, get_best_allocation
 from src import Problem
 from src.communication import Response, Issue
 from src.models import Allocation
 from typing import Callable
-import copy
+from collections import Counter
 
-def rating_function(allocation : Allocation, prob : Problem) -> int:
+def placement_rating(allocation : Allocation, prob : Problem) -> int:
+        # part of rating_function which does not depend on other allocations
         grade = 0
 
         # free seats in room
@@ -16,59 +17,99 @@ def rating_function(allocation : Allocation, prob : Problem) -> int:
             if 10 < free_seats < 20:
                 grade +=1
 
+        # even starting slot
+        if min(allocation.slots) % 2 == 0:
+            grade += 5
+
+        # not too early and not too late
+        if 10 <= min(allocation.slots) <= 17:
+            grade += 2
+
+        # TODO student votes
+
+        return grade
+
+def rating_function(allocation : Allocation, prob : Problem) -> int:
+        grade = placement_rating(allocation, prob)
+
         # days off for teacher
         for teacher_id in prob.groups[allocation.group_id].teacher_ids:
-            has_already_classes_on_this_day = False
-            for alloc in prob.allocations:
-                if teacher_id in prob.groups[allocation.group_id].teacher_ids:
-                    if alloc.day == allocation.day:
-                        has_already_classes_on_this_day = True
-                        break
+            has_already_classes_on_this_day = bool(prob.allocations_by_day.get(allocation.day, None))
 
             if has_already_classes_on_this_day:
                 grade += 2
 
         # free 1 and 5 (only if teacher has no classes already on 1 or 5)
         for teacher_id in prob.groups[allocation.group_id].teacher_ids:
-            has_already_classes_on_mon = False
-            has_already_classes_on_fri = False
-            for alloc in prob.allocations:
-                if teacher_id in prob.groups[allocation.group_id].teacher_ids:
-                    if alloc.day == 1:
-                        has_already_classes_on_mon = True
-                    if alloc.day == 5:
-                        has_already_classes_on_fri = True
+            has_already_classes_on_mon = bool(prob.allocations_by_day.get(1, None))
+            has_already_classes_on_fri = bool(prob.allocations_by_day.get(5, None))
 
             if not has_already_classes_on_mon and allocation.day != 1:
                 grade += 2
             if not has_already_classes_on_fri and allocation.day != 5:
                 grade += 2
 
-        # even starting slot
-        if min(allocation.slots) % 2 == 0:
-            grade += 5
-
-        # not too early and not too late
-        if 10 <= min(allocation.slots) <= 17:
-            grade += 2
-
-        # TODO student votes
-
         return grade
 
+class ScheduleRating:
+    # Rating of a whole schedule by the criteria of rating_function, with the teacher's
+    # criteria taken per teacher: an allocation gets 2 points per teacher who has another
+    # class on its day, and 2 points per teacher free on monday and per teacher free on friday.
+    # Teachers' classes are counted per day, so a change of allocations is rated again
+    # in time proportional to the number of teachers of the changed groups.
+    def __init__(self, prob: Problem, allocations: list[Allocation]):
+        self.prob = prob
+        self.days = {}
+        self.local = 0
+        for allocation in allocations:
+            self.local += placement_rating(allocation, prob)
+            for t_id in prob.groups[allocation.group_id].teacher_ids:
+                self.days.setdefault(t_id, Counter())[allocation.day] += 1
+        self.scores = {t_id: ScheduleRating.teacher_rating(days) for t_id, days in self.days.items()}
+        self.total = self.local + sum(self.scores.values())
+
+    @staticmethod
+    def teacher_rating(days: Counter) -> int:
+        classes = sum(days.values())
+        rating = 2 * sum(n for n in days.values() if n >= 2)
+        if not days[1]:
+            rating += 2 * classes
+        if not days[5]:
+            rating += 2 * classes
+        return rating
+
+    def change(self, changes: list[tuple[Allocation, Allocation]]) -> int:
+        # replaces old allocations with new ones and returns the change of the rating
+        delta = 0
+        teachers = set()
+        for old, new in changes:
+            delta += placement_rating(new, self.prob) - placement_rating(old, self.prob)
+            for t_id in self.prob.groups[old.group_id].teacher_ids:
+                self.days[t_id][old.day] -= 1
+                self.days[t_id][new.day] += 1
+                teachers.add(t_id)
+        self.local += delta
+        for t_id in teachers:
+            score = ScheduleRating.teacher_rating(self.days[t_id])
+            delta += score - self.scores[t_id]
+            self.scores[t_id] = score
+        self.total += delta
+        return delta
+
+def rate_solution(prob: Problem, allocations: list[Allocation]) -> int:
+    # rating of a whole schedule, used to choose the best of several solutions;
+    # the same measure annealing_solve and lns_solve optimise
+    return ScheduleRating(prob, allocations).total
+
 def rating_function_solve(prob: Problem, rating_function : Callable[[Allocation, Problem], int]=rating_function) -> Response:
 
-    established_groups = [r.group_id for r in prob.allocations]
     groups     = list(prob.groups.values())
 
     # remove established groups from groups
-    groups = [g for g in groups if g.id not in established_groups]
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
 
-    # delete established allocations and re-add to delete availabilities
-    copy_allocations = copy.deepcopy(prob.allocations)
-    prob.allocations = []
-    for alloc in copy_allocations:
-        prob.add_allocation_and_update_availability(alloc)
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
 
     # sort groups ascending by number of placements in empty timetable
     groups.sort(key=lambda g: number_of_possible_placements(g, prob))
@@ -76,6 +117,9 @@ def rating_function_solve(prob: Problem, rating_function : Callable[[Allocation,
     # maybe move clustered groups to the front
 
     while len(groups) > 0:
+        if prob.monitor.cancelled:
+            return cancelled_response(prob)
+
         # get next group
         g = groups.pop(0)
 
@@ -92,5 +136,6 @@ def rating_function_solve(prob: Problem, rating_function : Callable[[Allocation,
         # add placement to soulution and delete availabilities
         if not prob.add_allocation_and_update_availability(best_placement):
             return Response(False, [Issue("other", 0, "Unexpected error while looking for solution")], [])
+        prob.monitor.placed()
 
     return Response(True, [], prob.allocations)
@@ -0,0 +1,247 @@
+from .utils import cancelled_response, get_placements_of_groups
+from .difficulty import greedy_placement
+from src import Problem
+from src.checker import IncrementalChecker
+from src.models import Allocation, Cluster
+from src.communication import Response, Issue
+from collections import Counter
+import random
+import time
+
+# budget of the local search (see RepairSearch)
+REPAIR_MAX_STEPS = 10000
+REPAIR_TIME_LIMIT = 30.0
+# probability of trying to swap times with a conflicting group instead of moving one group
+REPAIR_SWAP_PROBABILITY = 0.2
+# probability of moving a group to a random placement (to get out of local minima)
+REPAIR_RANDOM_WALK_PROBABILITY = 0.05
+# number of steps during which a group is not moved back to the time it left
+REPAIR_TABU_TENURE = 10
+
+class ClusterCover:
+    # Slots taken by allocations of one cluster during the search, with uncover options
+    # (see Cluster.uncover_options) cached per day, as Cluster caches cover options,
+    # so a move covers again only the days it changes.
+    def __init__(self, cluster: Cluster, allocations: list[Allocation]):
+        self.cluster = cluster
+        self.uses = {}      # day -> slot -> number of allocations taking it
+        self.options = {}   # day -> uncover options of its slots (missing if it changed)
+        for allocation in allocations:
+            self.add(allocation)
+
+    def add(self, allocation: Allocation) -> None:
+        self.uses.setdefault(allocation.day, Counter()).update(allocation.slots)
+        self.options.pop(allocation.day, None)
+
+    def remove(self, allocation: Allocation) -> None:
+        uses = self.uses[allocation.day]
+        uses.subtract(allocation.slots)
+        uses = +uses
+        if uses:
+            self.uses[allocation.day] = uses
+        else:
+            del self.uses[allocation.day]
+        self.options.pop(allocation.day, None)
+
+    def options_of(self, uses: Counter) -> list[tuple[tuple, int]]:
+        if self.cluster.range == []:
+            # no blocks, every repeated use of a slot counts
+            return [((), sum(uses.values()) - len(uses))]
+        return self.cluster.uncover_options(sorted(uses))
+
+    def uncovered(self, old: Allocation = None, new: Allocation = None) -> int:
+        # Cluster.uncovered of the allocations, with `old` replaced by `new` if given
+        changed = {}
+        if old is not None:
+            changed[old.day] = self.uses[old.day] - Counter(old.slots)
+        if new is not None:
+            changed[new.day] = changed.get(new.day, self.uses.get(new.day, Counter())) + Counter(new.slots)
+        options = []
+        for day, uses in self.uses.items():
+            if day in changed:
+                continue
+            if day not in self.options:
+                self.options[day] = self.options_of(uses)
+            options.append(self.options[day])
+        options.extend(self.options_of(uses) for uses in changed.values() if uses)
+        return self.cluster.fewest_uncovered(options)
+
+class RepairSearch:
+    # Min-conflicts local search. Every group gets a placement, possibly conflicting with
+    # placements of other groups, and a random conflicting group is repeatedly moved to its
+    # placement with the fewest conflicts (or its time is swapped with a group it conflicts with)
+    # until there are no conflicts. Placements are the ones possible when only established
+    # allocations are booked; conflicts (teachers, rooms and slots of clusters which
+    # cannot be covered, see Cluster.uncovered) are counted with an IncrementalChecker
+    # and ClusterCovers, so a move costs time proportional to the size of the allocations
+    # involved (and to covering again the days of clusters it changes).
+    # A group is not moved back to the time it has just left for a few steps (tabu),
+    # unless that would remove all its conflicts.
+    def __init__(self, prob: Problem, placements: dict[int, list[Allocation]]):
+        self.prob = prob
+        self.placements = placements
+        self.by_time = {
+            g_id: {} for g_id in placements
+        }
+        for g_id, allocations in placements.items():
+            for allocation in allocations:
+                self.by_time[g_id].setdefault((allocation.day, allocation.slots[0]), []).append(allocation)
+        self.checker = IncrementalChecker(prob)
+        self.covers = {
+            cluster.id: ClusterCover(cluster, self.checker.cluster_allocations[cluster.id])
+            for cluster in prob.clusters
+        }
+        self.assignment = {}
+        self.conflicts = {}
+        self.steps = 0
+        # (group id, day, first slot) -> step until which the group cannot move there
+        self.tabu = {}
+
+    def assign(self, allocations: list[Allocation]) -> None:
+        # initial placements; groups without one get the placement with the fewest conflicts
+        for allocation in allocations:
+            self.assignment[allocation.group_id] = allocation
+            self.book(allocation)
+        for g_id in self.placements:
+            if g_id not in self.assignment:
+                best = self.best_placement(g_id)
+                self.assignment[g_id] = best
+                self.book(best)
+        for g_id in self.placements:
+            self.conflicts[g_id] = self.count_conflicts(self.assignment[g_id])
+
+    def book(self, allocation: Allocation) -> None:
+        self.checker.add(allocation)
+        for cluster in self.checker.clusters_by_group.get(allocation.group_id, []):
+            self.covers[cluster.id].add(allocation)
+
+    def unbook(self, allocation: Allocation) -> None:
+        self.checker.remove(allocation)
+        for cluster in self.checker.clusters_by_group.get(allocation.group_id, []):
+            self.covers[cluster.id].remove(allocation)
+
+    def count_conflicts(self, allocation: Allocation) -> int:
+        # the allocation must be booked
+        group = self.prob.groups[allocation.group_id]
+        conflicts = (len(self.checker.check_teacher_conflicts(allocation, group)) +
+                     len(self.checker.check_room_conflicts(allocation, group)))
+        for cluster in self.checker.clusters_by_group.get(group.id, []):
+            conflicts += self.covers[cluster.id].uncovered()
+        return conflicts
+
+    def conflicts_at(self, allocation: Allocation) -> int:
+        # conflicts of the group if it had `allocation` instead of its current placement;
+        # the checker never counts conflicts with allocations of the same group,
+        # so only clusters need the current placement replaced
+        group = self.prob.groups[allocation.group_id]
+        conflicts = (len(self.checker.check_teacher_conflicts(allocation, group)) +
+                     len(self.checker.check_room_conflicts(allocation, group)))
+        current = self.assignment.get(group.id, None)
+        for cluster in self.checker.clusters_by_group.get(group.id, []):
+            conflicts += self.covers[cluster.id].uncovered(current, allocation)
+        return conflicts
+
+    def is_tabu(self, allocation: Allocation) -> bool:
+        return self.tabu.get((allocation.group_id, allocation.day, allocation.slots[0]), 0) > self.steps
+
+    def best_placement(self, g_id: int) -> Allocation:
+        scored = [(self.conflicts_at(p), p) for p in self.placements[g_id]]
+        allowed = [(conflicts, p) for conflicts, p in scored if conflicts == 0 or not self.is_tabu(p)]
+        scored = allowed or scored
+        fewest = min(conflicts for conflicts, _ in scored)
+        return random.choice([p for conflicts, p in scored if conflicts == fewest])
+
+    def move(self, changes: dict[int, Allocation]) -> None:
+        # sets new placements of groups and counts conflicts of groups they may affect again
+        affected = set()
+        for g_id, allocation in changes.items():
+            current = self.assignment[g_id]
+            affected |= self.checker.affected_groups(current)
+            self.unbook(current)
+            self.tabu[(g_id, current.day, current.slots[0])] = self.steps + REPAIR_TABU_TENURE
+        for g_id, allocation in changes.items():
+            self.assignment[g_id] = allocation
+            self.book(allocation)
+            affected |= self.checker.affected_groups(allocation)
+        for g_id in affected:
+            if g_id in self.assignment:
+                self.conflicts[g_id] = self.count_conflicts(self.assignment[g_id])
+
+    def swap(self, g_id: int) -> bool:
+        # swaps times of the group and one of groups it conflicts with if it does not add conflicts
+        current = self.assignment[g_id]
+        partners = [id for id in self.checker.affected_groups(current) if id != g_id and id in self.assignment]
+        random.shuffle(partners)
+        for h_id in partners:
+            other = self.assignment[h_id]
+            g_options = self.by_time[g_id].get((other.day, other.slots[0]), [])
+            h_options = self.by_time[h_id].get((current.day, current.slots[0]), [])
+            if not g_options or not h_options:
+                continue
+            before = self.conflicts[g_id] + self.conflicts[h_id]
+            self.move({g_id: random.choice(g_options), h_id: random.choice(h_options)})
+            if self.conflicts[g_id] + self.conflicts[h_id] <= before:
+                return True
+            self.move({g_id: current, h_id: other})
+        return False
+
+    def conflicted(self) -> list[int]:
+        return [g_id for g_id, conflicts in self.conflicts.items() if conflicts]
+
+    def run(self, max_steps: int = REPAIR_MAX_STEPS, time_limit: float = REPAIR_TIME_LIMIT) -> bool:
+        # True if no group has conflicts
+        deadline = time.monotonic() + time_limit
+        conflicted = self.conflicted()
+        while conflicted:
+            if self.prob.monitor.cancelled or self.steps >= max_steps or time.monotonic() > deadline:
+                return False
+            self.steps += 1
+            g_id = random.choice(conflicted)
+            if random.random() < REPAIR_SWAP_PROBABILITY and self.swap(g_id):
+                pass
+            elif random.random() < REPAIR_RANDOM_WALK_PROBABILITY:
+                self.move({g_id: random.choice(self.placements[g_id])})
+            else:
+                self.move({g_id: self.best_placement(g_id)})
+            conflicted = self.conflicted()
+        return True
+
+def repair_solve(prob: Problem, max_steps: int = REPAIR_MAX_STEPS, time_limit: float = REPAIR_TIME_LIMIT) -> Response:
+    groups     = list(prob.groups.values())
+
+    # remove established groups from groups
+    groups = [g for g in groups if not prob.is_allocated(g.id)]
+
+    # re-add established allocations to delete availabilities
+    prob.book_established_allocations()
+
+    # placements possible next to established allocations only
+    placements, failure = get_placements_of_groups(groups, prob, "REPAIR_SOLVE")
+    if failure is not None:
+        return failure
+
+    marker = prob.snapshot()
+    if not greedy_placement(groups, prob):
+        return cancelled_response(prob)
+    greedy = [a for a in prob.allocations if a.group_id in placements]
+    prob.restore(marker)
+
+    search = RepairSearch(prob, placements)
+    search.assign(greedy)
+    solved = search.run(max_steps, time_limit)
+    if prob.monitor.cancelled:
+        return cancelled_response(prob)
+
+    # book placements without conflicts first, then the ones still possible
+    for g in sorted(groups, key=lambda g: search.conflicts[g.id]):
+        if prob.add_allocation_and_update_availability(search.assignment[g.id]):
+            prob.monitor.placed()
+
+    unplaced = [g for g in groups if not prob.is_allocated(g.id)]
+    if solved and not unplaced:
+        return Response(True, [], prob.allocations)
+    issues = [
+        Issue("group", g.id, f"Could not resolve conflicts of group with id={g.id} in {search.steps} steps (REPAIR_SOLVE)")
+        for g in unplaced
+    ]
+    return Response(False, issues, prob.allocations)
@@ -0,0 +1,381 @@
+import heapq
+
+# python-sat is optional; without it the pure-Python SatSolver below is used
+try:
+    from pysat.solvers import Solver as PySatSolver
+    from pysat.card import CardEnc, EncType
+except ImportError:
+    PySatSolver = None
+
+# conflicts between restarts are RESTART_BASE times the Luby sequence
+RESTART_BASE = 100
+# activities of variables decay by this factor after every conflict
+ACTIVITY_DECAY = 0.95
+
+def luby(i: int) -> int:
+    # i-th element (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power -= 1
+        i %= size
+    return 2 ** power
+
+class SatSolver:
+    # Incremental CDCL solver: two watched literals, first-UIP clause learning,
+    # VSIDS and Luby restarts. Variables are positive integers
+    # and literals are variables or their negations, as in DIMACS.
+    # At-most-one constraints are kept natively: when one of their literals becomes true
+    # the others are set false, with a binary clause built as the reason, so they
+    # take no clauses however many literals they have.
+    # solve() takes assumptions (literals which must be true); if they cannot all hold,
+    # core() returns a subset of them which cannot.
+    def __init__(self):
+        self.num_vars = 0
+        self.value = [0]        # var -> 1 (true), -1 (false) or 0 (unassigned)
+        self.level = [0]
+        # var -> clause which implied it (its first literal), None for decisions
+        # or the literal whose at-most-one constraint implied it
+        self.reason = [None]
+        self.phase = [False]
+        self.activity = [0.0]
+        self.heap = []          # (-activity, var), stale entries are skipped
+        self.queued = [None]    # var -> activity of its entry in the heap (None if it has none)
+        self.decision = [False]
+        self.var_inc = 1.0
+        self.watches = {}       # literal -> clauses watching it
+        self.amo_of = {}        # literal -> at-most-one constraints containing it
+        self.trail = []
+        self.trail_lim = []     # trail length at the start of every decision level
+        self.qhead = 0
+        self.ok = True          # False once the clauses contradict each other
+        self.conflicts = 0
+        self.restarts = 0
+        self.model = None
+        self.conflict = []
+
+    def new_var(self, phase: bool = False, priority: float = 0.0, decision: bool = True) -> int:
+        # `phase` is the value tried first, variables with higher `priority` are decided first.
+        # Variables which are not `decision` ones are only set by propagation and are false
+        # in models if nothing set them, so false must satisfy every clause they are left in.
+        self.num_vars += 1
+        var = self.num_vars
+        self.value.append(0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.phase.append(phase)
+        self.activity.append(priority)
+        self.queued.append(None)
+        self.decision.append(decision)
+        self.enqueue(var)
+        self.watches[var] = []
+        self.watches[-var] = []
+        return var
+
+    def lit_value(self, lit: int) -> int:
+        value = self.value[abs(lit)]
+        return value if lit > 0 else -value
+
+    def add_clause(self, lits: list[int]) -> bool:
+        # False if the solver became inconsistent; must be called between solve() calls
+        if not self.ok:
+            return False
+        clause = []
+        for lit in dict.fromkeys(lits):
+            if -lit in clause or self.lit_value(lit) == 1:
+                return True
+            if self.lit_value(lit) == 0:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+
+    def add_at_most_one(self, lits: list[int]) -> bool:
+        lits = list(dict.fromkeys(lits))
+        if len(lits) < 2:
+            return self.ok
+        for lit in lits:
+            self.amo_of.setdefault(lit, []).append(lits)
+            if self.lit_value(lit) == 1:
+                for other in lits:
+                    if other != lit and not self.add_clause([-other]):
+                        return False
+        return self.ok
+
+    def assign(self, lit: int, reason: list[int] | None) -> None:
+        var = abs(lit)
+        self.value[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self) -> list[int] | None:
+        # assigns implied literals and returns a conflicting clause (or None)
+        value, level, reason, trail = self.value, self.level, self.reason, self.trail
+        current = len(self.trail_lim)
+        while self.qhead < len(trail):
+            lit = trail[self.qhead]
+            self.qhead += 1
+            for amo in self.amo_of.get(lit, ()):
+                # assignments are inlined, there may be thousands of literals
+                for other in amo:
+                    var = other if other > 0 else -other
+                    v = value[var]
+                    if v == 0:
+                        value[var] = -1 if other > 0 else 1
+                        level[var] = current
+                        reason[var] = lit
+                        trail.append(-other)
+                    elif (v == 1) == (other > 0) and other != lit:
+                        return [-other, -lit]
+
+            false_lit = -lit
+            watchers = self.watches[false_lit]
+            if not watchers:
+                continue
+            kept = []
+            for i, clause in enumerate(watchers):
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                v = value[abs(first)] if first > 0 else -value[abs(first)]
+                if v == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    q = clause[k]
+                    if (value[abs(q)] if q > 0 else -value[abs(q)]) != -1:
+                        clause[1], clause[k] = q, false_lit
+                        self.watches[q].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if v == -1:
+                        kept.extend(watchers[i+1:])
+                        self.watches[false_lit] = kept
+                        return clause
+                    self.assign(first, clause)
+            self.watches[false_lit] = kept
+        return None
+
+    def enqueue(self, var: int) -> None:
+        if self.decision[var] and self.queued[var] != self.activity[var]:
+            self.queued[var] = self.activity[var]
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def bump(self, var: int) -> None:
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            for v in range(1, self.num_vars + 1):
+                self.activity[v] *= 1e-100
+            self.var_inc *= 1e-100
+            self.heap = []
+            self.queued = [None] * (self.num_vars + 1)
+            for v in range(1, self.num_vars + 1):
+                self.enqueue(v)
+        elif not self.value[var]:
+            self.enqueue(var)
+
+    def reason_clause(self, lit: int) -> list[int]:
+        # the clause which implied assigned literal `lit` (not a decision)
+        reason = self.reason[abs(lit)]
+        if isinstance(reason, int):
+            return [lit, -reason]
+        return reason
+
+    def analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        # first-UIP learnt clause (asserting literal first) and the level to jump back to
+        current = len(self.trail_lim)
+        learnt = [0]
+        seen = set()
+        counter = 0
+        index = len(self.trail) - 1
+        clause, lit = conflict, 0
+        while True:
+            for q in clause:
+                var = abs(q)
+                if q == lit or var in seen or self.level[var] == 0:
+                    continue
+                seen.add(var)
+                self.bump(var)
+                if self.level[var] == current:
+                    counter += 1
+                else:
+                    learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason_clause(lit)
+        learnt[0] = -lit
+        self.var_inc /= ACTIVITY_DECAY
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # the literal of the highest level is watched next to the asserting one
+        k = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def analyze_final(self, lit: int) -> list[int]:
+        # assumptions responsible for assumption `lit` being false
+        core = [lit]
+        if not self.trail_lim:
+            return core
+        seen = {abs(lit)}
+        for i in range(len(self.trail) - 1, self.trail_lim[0] - 1, -1):
+            var = abs(self.trail[i])
+            if var not in seen:
+                continue
+            if self.reason[var] is None:
+                core.append(self.trail[i])
+            else:
+                seen.update(abs(q) for q in self.reason_clause(self.trail[i])[1:] if self.level[abs(q)] > 0)
+        return core
+
+    def cancel_until(self, level: int) -> None:
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.value[var] = 0
+            self.reason[var] = None
+            self.enqueue(var)
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def decide(self) -> int:
+        # unassigned variable with the highest activity (0 if all are assigned)
+        while self.heap:
+            activity, var = heapq.heappop(self.heap)
+            if -activity != self.activity[var]:
+                continue
+            self.queued[var] = None
+            if not self.value[var]:
+                return var
+        return 0
+
+    def solve(self, assumptions: list[int] = (), max_conflicts: int | None = None) -> bool | None:
+        # True if satisfiable (see model), False if not (see core), None if out of conflicts
+        self.model = None
+        self.conflict = []
+        if not self.ok:
+            return False
+        budget = None if max_conflicts is None else self.conflicts + max_conflicts
+        restart_at = self.conflicts + RESTART_BASE * luby(self.restarts)
+        try:
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.conflicts += 1
+                    if not self.trail_lim:
+                        self.ok = False
+                        return False
+                    learnt, level = self.analyze(conflict)
+                    self.cancel_until(level)
+                    if len(learnt) == 1:
+                        self.assign(learnt[0], None)
+                    else:
+                        self.watches[learnt[0]].append(learnt)
+                        self.watches[learnt[1]].append(learnt)
+                        self.assign(learnt[0], learnt)
+                    continue
+
+                if budget is not None and self.conflicts >= budget:
+                    return None
+                if self.conflicts >= restart_at:
+                    self.restarts += 1
+                    restart_at = self.conflicts + RESTART_BASE * luby(self.restarts)
+                    self.cancel_until(0)
+                    continue
+
+                # assumptions take the first decision levels
+                lit = 0
+                while len(self.trail_lim) < len(assumptions):
+                    a = assumptions[len(self.trail_lim)]
+                    value = self.lit_value(a)
+                    if value == 1:
+                        self.trail_lim.append(len(self.trail))
+                    elif value == -1:
+                        self.conflict = self.analyze_final(a)
+                        return False
+                    else:
+                        lit = a
+                        break
+                if not lit:
+                    var = self.decide()
+                    if not var:
+                        self.model = {v for v in range(1, self.num_vars + 1) if self.value[v] == 1}
+                        return True
+                    lit = var if self.phase[var] else -var
+                self.trail_lim.append(len(self.trail))
+                self.assign(lit, None)
+        finally:
+            self.cancel_until(0)
+
+    def core(self) -> list[int]:
+        # assumptions which cannot hold together after solve() returned False
+        return self.conflict
+
+class NativeSatSolver:
+    # The interface of SatSolver on top of a solver from python-sat (if installed).
+    # At-most-one constraints are encoded with a sequential counter.
+    def __init__(self, name: str = "glucose4"):
+        self.solver = PySatSolver(name=name)
+        self.num_vars = 0
+        self.model = None
+
+    def new_var(self, phase: bool = False, priority: float = 0.0, decision: bool = True) -> int:
+        self.num_vars += 1
+        return self.num_vars
+
+    def add_clause(self, lits: list[int]) -> bool:
+        self.solver.add_clause(lits)
+        return True
+
+    def add_at_most_one(self, lits: list[int]) -> bool:
+        if len(lits) < 2:
+            return True
+        encoding = CardEnc.atmost(lits=lits, bound=1, top_id=self.num_vars, encoding=EncType.seqcounter)
+        self.num_vars = max(self.num_vars, encoding.nv)
+        for clause in encoding.clauses:
+            self.solver.add_clause(clause)
+        return True
+
+    def solve(self, assumptions: list[int] = (), max_conflicts: int | None = None) -> bool | None:
+        self.model = None
+        if max_conflicts is None:
+            result = self.solver.solve(assumptions=list(assumptions))
+        else:
+            self.solver.conf_budget(max_conflicts)
+            result = self.solver.solve_limited(assumptions=list(assumptions))
+        if result:
+            self.model = {lit for lit in self.solver.get_model() if lit > 0}
+        return result
+
+    def core(self) -> list[int]:
+        return self.solver.get_core() or []
+
+    @property
+    def conflicts(self) -> int:
+        return self.solver.accum_stats().get("conflicts", 0)
+
+def new_sat_solver(native: bool = True) -> SatSolver | NativeSatSolver:
+    # a solver from python-sat if it is installed (and `native`), SatSolver otherwise
+    if native and PySatSolver is not None:
+        return NativeSatSolver()
+    return SatSolver()
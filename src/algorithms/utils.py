@@ -1,5 +1,6 @@
-from src.models import Group, Allocation, Availability
+from src.models import Group, Allocation, Availability, DAYS
 from src import Problem
+from src.communication import Response, Issue
 from itertools import product
 import random
 
@@ -7,34 +8,32 @@ def covers(slots: list[int], start: int, duration: int) -> bool:
     # true if [start, start+duration) is in slots
     return all(h in slots for h in range(start, start + duration))
 
-def get_all_placements_for_group(g: Group, prob: Problem) -> list[Allocation]:
-
-    def unwrap(placements: list) -> list[Allocation]:
-        unwrapped = []
-        for p in placements:
-            group_id, all_rooms, day, slot = p
-            for combo in product(*all_rooms):
-                combo = list(combo)
-                unwrapped.append(Allocation(group_id, combo, day, slot))
-        return unwrapped
-
-    solutions = []
-    days = list(g.availability.slots.keys())
-
-    for day in days:
-        av_slots = list(g.availability.slots[day])
-
-        for start in av_slots:
-            if not covers(av_slots, start, g.duration):
-                continue
+def iter_placement_candidates(g: Group, prob: Problem):
+    # Lazy enumeration core shared by placement listing, counting and sampling.
+    # Yields (day, start, ok_rooms) for every start at which the group can take place,
+    # where ok_rooms holds, per labels clause, the rooms usable at that time.
+    # Every combination of one room per clause is a valid placement.
+
+    # rooms passing the static (labels and capacity) filters, per labels clause
+    candidate_rooms = prob.get_room_index().candidates_for_group(g.labels, g.capacity)
+    # starts left to the group by propagation before solving (see DomainPropagation)
+    domain = prob.domains.get(g.id)
+
+    for day in DAYS:
+        # intersect masks of valid starting slots of the group and all its teachers
+        starts = g.availability.starts_mask(day, g.duration)
+        for teacher_id in g.teacher_ids:
+            starts &= prob.teachers[teacher_id].availability.starts_mask(day, g.duration)
+        if domain is not None:
+            starts &= domain.get(day, 0)
+
+        for start in Availability.mask_to_slots(starts):
             time_suits_teachers = True
-            if g.teacher_ids:
-                for teacher_id in g.teacher_ids:
-                    teacher = prob.teachers[teacher_id]
-                    t_slots = teacher.availability.slots.get(day, [])
-                    if not covers(t_slots, start, g.duration) or not Availability.check_occurrence_desc(g.occurrence_desc, teacher.availability.taken_periods.get((day, start), [])):
-                        time_suits_teachers = False
-                        break
+            for teacher_id in g.teacher_ids:
+                teacher = prob.teachers[teacher_id]
+                if not Availability.check_occurrence_desc(g.occurrence_desc, teacher.availability.taken_periods.get((day, start), [])):
+                    time_suits_teachers = False
+                    break
 
             if not time_suits_teachers:
                 continue
@@ -44,54 +43,57 @@ def get_all_placements_for_group(g: Group, prob: Problem) -> list[Allocation]:
             # if we have labels [[a,b], [c]]
             # then if the result is [[1,2,3,7],[7,10]]
             # [1,2,3,7] are satisfaing labels 'a' and 'b and [7,10] are satisfyig 'c'.
-            # if no labels (labels = []) then we mark rooms_needed=False
-            rooms_needed  = True
+            # if no labels (labels = []) then ok_rooms = [] and no room is needed
             ok_rooms = []
-            if not g.labels: # group does not need any room
-                rooms_needed = False
-            else:
-                for labels_DNF in g.labels:
-                    rooms_for_labels = []
-                    for room in prob.rooms.values():
-                        if room.id in rooms_for_labels:
-                            #do not add same room twice
-                            continue
-
-                        if not covers(room.availability.slots.get(day, []), start, g.duration):
-                            continue
-                        
-                        # Check if all labels in l are present in room.labels
-                        if not room.satisfies_labels_DNF(labels_DNF):
-                            continue
-
-                        if room.capacity < g.capacity:
-                            continue
-
-                        if not Availability.check_occurrence_desc(g.occurrence_desc, room.availability.taken_periods.get((day, start), [])):
-                            continue
-
-                        rooms_for_labels.append(room.id)
-                    ok_rooms.append(rooms_for_labels)
-
             found_rooms = True
-            if rooms_needed:
-                for rooms in ok_rooms:
-                    if not rooms:
-                        found_rooms = False
-                        break
+            for room_ids in candidate_rooms:
+                rooms_for_labels = []
+                for room_id in room_ids:
+                    availability = prob.rooms[room_id].availability
+
+                    if not availability.covers(day, start, g.duration):
+                        continue
+
+                    if not Availability.check_occurrence_desc(g.occurrence_desc, availability.taken_periods.get((day, start), [])):
+                        continue
+
+                    rooms_for_labels.append(room_id)
+
+                if not rooms_for_labels:
+                    found_rooms = False
+                    break
+                ok_rooms.append(rooms_for_labels)
+
+            if not found_rooms:
+                continue
 
             clusters_satisfied = True
-            if found_rooms:
-                for c in prob.clusters:
-                    if g.id in c.group_ids:
-                        if not c.can_use_slots(day, list(range(start, start+g.duration))):
-                            clusters_satisfied = False
-                            break
+            for c in prob.clusters_by_group.get(g.id, []):
+                if not c.can_use_slots(day, list(range(start, start+g.duration))):
+                    clusters_satisfied = False
+                    break
 
-            if clusters_satisfied and found_rooms:
-                solutions.append((g.id, ok_rooms, day, list(range(start, start+g.duration))))
+            if clusters_satisfied:
+                yield day, start, ok_rooms
 
-    return unwrap(solutions)
+def get_all_placements_for_group(g: Group, prob: Problem) -> list[Allocation]:
+    placements = []
+    for day, start, ok_rooms in iter_placement_candidates(g, prob):
+        slots = list(range(start, start+g.duration))
+        for combo in product(*ok_rooms):
+            placements.append(Allocation(g.id, list(combo), day, slots))
+    return placements
+
+def get_placements_of_groups(groups: list[Group], prob: Problem, algorithm: str) -> tuple[dict[int, list[Allocation]], Response | None]:
+    # Placements of the groups next to allocations already booked (e.g. established ones),
+    # by group id. Ones taking a room twice (for two sets of labels) could never be booked.
+    # If a group has none, also returns the failure Response of `algorithm` (e.g. "REPAIR_SOLVE").
+    placements = {}
+    for g in groups:
+        placements[g.id] = [a for a in get_all_placements_for_group(g, prob) if len(set(a.room_ids)) == len(a.room_ids)]
+        if not placements[g.id]:
+            return placements, Response(False, [Issue("group", g.id, f"Could not find placement for group with id={g.id} ({algorithm})")], prob.allocations)
+    return placements, None
 
 def get_best_allocation(allocations: list[Allocation], prob: Problem, rating_function) -> Allocation:
     scored = [(r, rating_function(r, prob)) for r in allocations]
@@ -101,4 +103,37 @@ def get_best_allocation(allocations: list[Allocation], prob: Problem, rating_fun
 
 
 def number_of_possible_placements(g: Group, prob: Problem) -> int:
-    return len(get_all_placements_for_group(g, prob))
+    # same as len(get_all_placements_for_group(g, prob)) but without building Allocations
+    count = 0
+    for _, _, ok_rooms in iter_placement_candidates(g, prob):
+        count += number_of_room_combinations(ok_rooms)
+    return count
+
+def number_of_room_combinations(ok_rooms: list[list[int]]) -> int:
+    combos = 1
+    for rooms in ok_rooms:
+        combos *= len(rooms)
+    return combos
+
+def sample_placement(g: Group, prob: Problem) -> Allocation | None:
+    # Uniformly random element of get_all_placements_for_group(g, prob) (None if it is empty),
+    # chosen by weighted reservoir sampling over the lazy candidates,
+    # so the cartesian product of rooms is never built.
+    chosen = None
+    total = 0
+    for day, start, ok_rooms in iter_placement_candidates(g, prob):
+        weight = number_of_room_combinations(ok_rooms)
+        total += weight
+        if random.randrange(total) < weight:
+            chosen = (day, start, ok_rooms)
+
+    if chosen is None:
+        return None
+
+    day, start, ok_rooms = chosen
+    room_ids = [random.choice(rooms) for rooms in ok_rooms]
+    return Allocation(g.id, room_ids, day, list(range(start, start+g.duration)))
+
+def cancelled_response(prob: Problem) -> Response:
+    # algorithms check prob.monitor.cancelled between placements and return this
+    return Response(False, [Issue("solver", 0, "Solving was cancelled")], prob.allocations)
@@ -0,0 +1,179 @@
+from src.models import Allocation, Group, Cluster
+from src.communication import Issue
+
+def occurrences_conflict(occurrence_desc: list[int], other_occurrence_desc: list[int]) -> bool:
+    # groups held every period conflict with all groups, others only if they share a period
+    return not occurrence_desc or not other_occurrence_desc or not set(occurrence_desc).isdisjoint(other_occurrence_desc)
+
+class IncrementalChecker:
+    # Constraint checking of a Problem's allocations without scanning all of them per group.
+    # Keeps which allocations take each (teacher, day, slot) and (room, day, slot),
+    # so conflicts of an allocation are found by looking up only its own slots,
+    # and caches whether each cluster is satisfied until its allocations change.
+    # add() and remove() update it in O(size of the allocation).
+    def __init__(self, problem):
+        self.problem = problem
+        self.teacher_slots = {}
+        self.room_slots = {}
+        self.allocations_by_group = {}
+        self.clusters_by_group = problem.clusters_by_group
+        self.cluster_allocations = {cluster.id: [] for cluster in problem.clusters}
+        # cluster id -> whether it is satisfied; missing if it has to be checked again
+        self.cluster_satisfied = {}
+        for allocation in problem.allocations:
+            self.add(allocation)
+
+    def add(self, allocation: Allocation) -> None:
+        self.allocations_by_group.setdefault(allocation.group_id, []).append(allocation)
+        for cluster in self.clusters_by_group.get(allocation.group_id, []):
+            # like Cluster.add_allocation, equal allocations are taken once
+            if allocation not in self.cluster_allocations[cluster.id]:
+                self.cluster_allocations[cluster.id].append(allocation)
+                self.cluster_satisfied.pop(cluster.id, None)
+        group = self.problem.groups.get(allocation.group_id, None)
+        if group is None:
+            return
+        for slot in allocation.slots:
+            for teacher_id in group.teacher_ids:
+                self.teacher_slots.setdefault((teacher_id, allocation.day, slot), []).append(allocation)
+            for room_id in allocation.room_ids:
+                self.room_slots.setdefault((room_id, allocation.day, slot), []).append(allocation)
+
+    def remove(self, allocation: Allocation) -> None:
+        IncrementalChecker.remove_identical(self.allocations_by_group.get(allocation.group_id, []), allocation)
+        for cluster in self.clusters_by_group.get(allocation.group_id, []):
+            if IncrementalChecker.remove_identical(self.cluster_allocations[cluster.id], allocation):
+                self.cluster_satisfied.pop(cluster.id, None)
+        group = self.problem.groups.get(allocation.group_id, None)
+        if group is None:
+            return
+        for slot in allocation.slots:
+            for teacher_id in group.teacher_ids:
+                IncrementalChecker.remove_identical(self.teacher_slots.get((teacher_id, allocation.day, slot), []), allocation)
+            for room_id in allocation.room_ids:
+                IncrementalChecker.remove_identical(self.room_slots.get((room_id, allocation.day, slot), []), allocation)
+
+    @staticmethod
+    def remove_identical(allocations: list[Allocation], allocation: Allocation) -> bool:
+        for i in range(len(allocations) - 1, -1, -1):
+            if allocations[i] is allocation:
+                del allocations[i]
+                return True
+        return False
+
+    def get_allocation(self, group_id: int) -> Allocation | None:
+        # the last allocation of the group, as Problem.get_allocation
+        allocations = self.allocations_by_group.get(group_id, None)
+        return allocations[-1] if allocations else None
+
+    def overlapping(self, resource_slots: dict, resource_id: int, allocation: Allocation) -> list[Allocation]:
+        # allocations of other groups taking the resource at any slot of `allocation`
+        others = []
+        for slot in allocation.slots:
+            for other in resource_slots.get((resource_id, allocation.day, slot), ()):
+                if other.group_id != allocation.group_id and not any(other is o for o in others):
+                    others.append(other)
+        return others
+
+    def affected_groups(self, allocation: Allocation) -> set:
+        # ids of groups whose issues may change when `allocation` is added or removed:
+        # its group, its cluster mates and groups sharing its teachers or rooms at the same time
+        affected = {allocation.group_id}
+        for cluster in self.clusters_by_group.get(allocation.group_id, []):
+            affected.update(cluster.group_ids)
+        group = self.problem.groups.get(allocation.group_id, None)
+        teacher_ids = group.teacher_ids if group is not None else []
+        for slot in allocation.slots:
+            for teacher_id in teacher_ids:
+                affected.update(other.group_id for other in self.teacher_slots.get((teacher_id, allocation.day, slot), ()))
+            for room_id in allocation.room_ids:
+                affected.update(other.group_id for other in self.room_slots.get((room_id, allocation.day, slot), ()))
+        return affected
+
+    def check_teacher_conflicts(self, allocation: Allocation, group: Group) -> list[Issue]:
+        """Ensure the teacher has no other class at the time"""
+        issues = []
+        for teacher_id in group.teacher_ids:
+            for other in self.overlapping(self.teacher_slots, teacher_id, allocation):
+                if occurrences_conflict(group.occurrence_desc, self.problem.groups[other.group_id].occurrence_desc):
+                    issues.append(Issue("teacher", teacher_id, f"Teacher with id={teacher_id} has conflicting classes on {allocation.day}"))
+        return issues
+
+    def check_room_conflicts(self, allocation: Allocation, group: Group) -> list[Issue]:
+        """Ensure no overlapping use of the same room."""
+        issues = []
+        for room_id in dict.fromkeys(allocation.room_ids):
+            for other in self.overlapping(self.room_slots, room_id, allocation):
+                if occurrences_conflict(group.occurrence_desc, self.problem.groups[other.group_id].occurrence_desc):
+                    issues.append(Issue("room", room_id, f"At least two groups (id={group.id}, id={other.group_id}) use room with id={room_id} at the same time on {allocation.day} in slots {allocation.slots}"))
+        return issues
+
+    def is_cluster_satisfied(self, cluster: Cluster) -> bool:
+        satisfied = self.cluster_satisfied.get(cluster.id, None)
+        if satisfied is None:
+            satisfied = cluster.satisfied_by(self.cluster_allocations[cluster.id])
+            self.cluster_satisfied[cluster.id] = satisfied
+        return satisfied
+
+    def check_cluster_constraints(self, allocation: Allocation, group: Group) -> list[Issue]:
+        """Ensure clusters meet day/slot range constraints."""
+        issues = []
+        for cluster in self.clusters_by_group.get(group.id, []):
+            if not self.is_cluster_satisfied(cluster):
+                group_ids_str = ", ".join(str(id) for id in sorted(cluster.group_ids))
+                issues.append(Issue("cluster", cluster.id, f"Cluster connecting groups with ids {group_ids_str} is not satisfied"))
+        return issues
+
+    def check_constraints(self, allocation: Allocation, group: Group, full_check: bool) -> list[Issue]:
+        fails = []
+        if not group:
+            issue = Issue("allocation", allocation.group_id, f"allocation with group_id {allocation.group_id} exists, but ther is no group with such id.")
+            return [issue]
+
+        problem = self.problem
+        checks_to_do = [
+            problem.check_group_availability,
+            problem.check_teacher_availability,
+            self.check_teacher_conflicts,
+            problem.check_room_availability,
+            self.check_room_conflicts,
+            problem.check_room_labels,
+            problem.check_room_capacity,
+            self.check_cluster_constraints,
+            problem.check_cluster_slots
+        ]
+        for fun in checks_to_do:
+            issues = fun(allocation, group)
+            if issues:
+                if full_check:
+                    fails.extend(issues)
+                else:
+                    return issues
+
+        return fails
+
+    def check_group(self, group_id: int) -> list[Issue]:
+        # all issues (as with full_check) of one group
+        group = self.problem.groups[group_id]
+        allocation = self.get_allocation(group_id)
+        if allocation is None:
+            return [Issue("group", group.id, f"Group with id={group.id} is not present in solution")]
+        return self.check_constraints(allocation, group, True)
+
+    def check(self, full_check: bool) -> list[Issue]:
+        failed_constraints = []
+        for group in self.problem.groups.values():
+            allocation = self.get_allocation(group.id)
+            if allocation is None:
+                issue = Issue("group", group.id, f"Group with id={group.id} is not present in solution")
+                if not full_check:
+                    return [issue]
+                failed_constraints.append(issue)
+                continue
+
+            issues = self.check_constraints(allocation, group, full_check)
+            if issues:
+                if not full_check:
+                    return issues
+                failed_constraints.extend(issues)
+        return failed_constraints
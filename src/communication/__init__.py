@@ -1,2 +1,2 @@
 from .query import Query
-from .response import Response, Issue, ISSUE_TYPES
+from .response import Response, DeltaResponse, Issue, ISSUE_TYPES
@@ -1,4 +1,8 @@
 class Query:
-    def __init__(self, problem, method: str):
+    def __init__(self, problem, method: str, restarts: int = 1, workers: int = 1, select: str = "first", deadline: float = None):
         self.problem = problem
         self.method = method
+        self.restarts = restarts
+        self.workers = workers
+        self.select = select
+        self.deadline = deadline
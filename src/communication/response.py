@@ -13,31 +13,39 @@ ISSUE_TYPES = [
     "parser",
     "problem",
     "solver",
+    "busy",
+    "timeout",
     "other"
 ]
 
 class Issue:
-    def __init__(self, type: str, id: int, msg: str):
+    def __init__(self, type: str, id: int, msg: str, path: str = None):
         if type not in ISSUE_TYPES:
             type = "other"
         self.type = type
         self.id = id
         self.msg = msg
+        # JSON path of the invalid value in the request, if the issue is about one
+        self.path = path
+
+    def to_dict(self) -> dict:
+        error = {
+            "type": self.type,
+            "id": self.id,
+            "msg:" : self.msg
+        }
+        if self.path is not None:
+            error["path"] = self.path
+        return error
 
 # msg can be both string and a list of strings
 class Response:
-    def __init__(self, success: bool, issues: list[Issue], solution: list[Allocation]):
+    def __init__(self, success: bool, issues: list[Issue], solution: list[Allocation], stats: dict = None):
         self.success = success
-        self.errors = []
-        for issue in issues:
-            self.errors.append(
-                {
-                    "type": issue.type,
-                    "id": issue.id,
-                    "msg:" : issue.msg
-                }
-            )
+        self.errors = [issue.to_dict() for issue in issues]
         self.solution = solution
+        # extra information about solving (e.g. timing of attempts)
+        self.stats = stats if stats is not None else {}
 
     def __repr__(self) -> str:
         sorted_solution = sorted(self.solution, key=lambda r: r.group_id)
@@ -52,3 +60,13 @@ class Response:
             f"{solution_str}\n" 
             f"])"
         )
+
+class DeltaResponse:
+    # Response to a change of allocations in an editing session:
+    # only issues the change created or resolved, and whether any issues remain
+    def __init__(self, session_id: str, success: bool, created: list[Issue], resolved: list[Issue], remaining: int):
+        self.session_id = session_id
+        self.success = success
+        self.created = [issue.to_dict() for issue in created]
+        self.resolved = [issue.to_dict() for issue in resolved]
+        self.remaining = remaining
@@ -0,0 +1,73 @@
+from src.communication import Response, Issue
+from src.monitor import Monitor
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable
+import asyncio
+import os
+
+EXECUTOR_KINDS = ["thread", "process"]
+
+class Dispatcher:
+    # Runs CPU-bound request handling (parsing, checking, solving) in an executor,
+    # so the asyncio event loop keeps serving other requests meanwhile.
+    # At most `max_workers` calls run at once and at most `max_queue` wait for a worker;
+    # calls over that limit get a "busy" Response right away. A call which does not finish
+    # within `timeout` seconds gets a "timeout" Response and its `monitor` (if any) is cancelled,
+    # so the algorithm stops at its next check and frees the worker. Work without a monitor, or run
+    # in a process (which gets a copy of the monitor), keeps its worker until it finishes.
+    def __init__(self, max_workers: int = 1, max_queue: int = 0, timeout: float = None, executor: str = "thread"):
+        if executor not in EXECUTOR_KINDS:
+            kinds_str = ", ".join(f"'{a}'" for a in EXECUTOR_KINDS)
+            raise ValueError(f"Executor kind must be one of: {kinds_str}. Sent '{executor}'.")
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError(f"Dispatcher needs at least one worker and non-negative queue size. Sent max_workers={max_workers}, max_queue={max_queue}.")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor_kind = executor
+        self.executor = None
+        # calls submitted and not finished yet (running or waiting for a worker)
+        self.pending = 0
+
+    @staticmethod
+    def from_env(prefix: str, max_workers: int = 1, max_queue: int = 0, timeout: float = None) -> 'Dispatcher':
+        # Reads {prefix}_WORKERS, {prefix}_MAX_QUEUE, {prefix}_TIMEOUT and {prefix}_EXECUTOR
+        # environment variables, falling back to given defaults.
+        timeout = os.environ.get(f"{prefix}_TIMEOUT", timeout)
+        return Dispatcher(
+            max_workers=int(os.environ.get(f"{prefix}_WORKERS", max_workers)),
+            max_queue=int(os.environ.get(f"{prefix}_MAX_QUEUE", max_queue)),
+            timeout=float(timeout) if timeout is not None else None,
+            executor=os.environ.get(f"{prefix}_EXECUTOR", "thread")
+        )
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.executor_kind == "process":
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def release(self, _) -> None:
+        self.pending -= 1
+
+    async def run(self, fn: Callable[..., Response], *args, monitor: Monitor = None) -> Response:
+        if self.pending >= self.max_workers + self.max_queue:
+            return Response(False, [Issue("busy", 0, f"Service is busy ({self.pending} requests in progress). Try again later.")], [])
+
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self.get_executor(), fn, *args)
+        future.add_done_callback(self.release)
+        try:
+            # shield, so that timing out does not cancel the future before it releases its slot
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            if monitor is not None:
+                monitor.cancel()
+            return Response(False, [Issue("timeout", 0, f"Request did not finish within {self.timeout} seconds.")], [])
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
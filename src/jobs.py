@@ -0,0 +1,133 @@
+from src.communication import Response
+from src.monitor import Monitor
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable
+from abc import ABC, abstractmethod
+import threading
+import time
+import uuid
+
+JOB_STATUSES = ["queued", "running", "done", "cancelled", "failed"]
+
+class Job:
+    def __init__(self, request: dict):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.status = "queued"
+        self.monitor = Monitor()
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ["done", "cancelled", "failed"]
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.monitor.progress(),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+class JobStore(ABC):
+    # Where jobs are kept between requests. Implement to keep them elsewhere than in memory.
+    @abstractmethod
+    def add(self, job: Job) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        pass
+
+    @abstractmethod
+    def remove(self, job_id: str) -> None:
+        pass
+
+class InMemoryJobStore(JobStore):
+    # Keeps at most `max_finished` finished jobs; the oldest ones are forgotten first.
+    def __init__(self, max_finished: int = 1000):
+        self.jobs = {}
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in finished[:max(0, len(finished) - self.max_finished)]:
+                del self.jobs[old.id]
+
+    def get(self, job_id: str) -> Job | None:
+        with self.lock:
+            return self.jobs.get(job_id, None)
+
+    def remove(self, job_id: str) -> None:
+        with self.lock:
+            self.jobs.pop(job_id, None)
+
+class JobManager:
+    # Runs requests in background threads. `run` gets the request and the job's Monitor,
+    # which the algorithms use to report progress and to notice cancellation.
+    # At most `max_workers` jobs run at once and at most `max_queue` wait for a worker;
+    # jobs over that limit are not accepted.
+    def __init__(self, run: Callable[[dict, Monitor], Response], store: JobStore = None, max_workers: int = 1, max_queue: int = 16):
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError(f"JobManager needs at least one worker and non-negative queue size. Sent max_workers={max_workers}, max_queue={max_queue}.")
+        self.run = run
+        self.store = store if store is not None else InMemoryJobStore()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_jobs = max_workers + max_queue
+        # jobs submitted and not finished yet (running or queued)
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, request: dict) -> Job | None:
+        # None if the queue is full
+        with self.lock:
+            if self.pending >= self.max_jobs:
+                return None
+            self.pending += 1
+        job = Job(request)
+        self.store.add(job)
+        job.future = self.executor.submit(self.execute, job)
+        job.future.add_done_callback(lambda future: self.on_done(job, future))
+        return job
+
+    def execute(self, job: Job) -> Response:
+        job.status = "running"
+        return self.run(job.request, job.monitor)
+
+    def on_done(self, job: Job, future: Future) -> None:
+        with self.lock:
+            self.pending -= 1
+        if future.cancelled() or job.monitor.cancelled:
+            job.status = "cancelled"
+        elif future.exception() is not None:
+            job.status = "failed"
+            job.error = str(future.exception())
+        else:
+            job.status = "done"
+        if not future.cancelled() and future.exception() is None:
+            job.result = future.result()
+        job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        job = self.store.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.monitor.cancel()
+        # queued jobs never start, running ones stop before their next placement
+        job.future.cancel()
+        return job
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -8,21 +8,27 @@ class Allocation:
             room_ids : list[int],
             day : int,
             slots : list[int],
+            validate : bool = True
             ):
         self.group_id = group_id
         self.room_ids = room_ids
-        if not day in DAYS:
+        if validate and not day in DAYS:
             days_str = ", ".join(f"'{a}'" for a in DAYS)
             raise ValueError(f"Field 'day' value in Allocation must be one of: {days_str}. Sent '{day}'.")
         self.day = day
-        if not isinstance(slots, list) or not all(isinstance(slot, int) for slot in slots) or not all(slot >= 0 for slot in slots):
+        if validate and (not isinstance(slots, list) or not all(isinstance(slot, int) for slot in slots) or not all(slot >= 0 for slot in slots)):
             raise ValueError(f"Field 'slots' value in Allocation must be a list of non-negtive integers. Sent '{slots}'.")
         self.slots = slots
 
     @staticmethod
     def from_json(json_str: str) -> 'Allocation':
+        return Allocation.from_dict(json.loads(json_str))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Allocation':
         REQUIRED_FIELDS = ['group_id', 'room_ids', 'day', 'slots']
-        data = json.loads(json_str)
+        if not validate:
+            return Allocation(data['group_id'], data['room_ids'], data['day'], data['slots'], validate=False)
         missing = [field for field in REQUIRED_FIELDS if field not in data]
         if missing:
             missing_str = ", ".join(f"'{a}'" for a in missing)
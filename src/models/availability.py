@@ -1,20 +1,42 @@
 import json
+from collections.abc import Mapping
 
 DAYS = [1, 2, 3, 4, 5, 6, 7]
 
+class SlotsView(Mapping):
+    # Read-only view presenting per-day bitmasks as ascending lists of slots,
+    # so code written against the old dict-of-lists representation keeps working.
+    def __init__(self, masks: dict[int, int]):
+        self._masks = masks
+
+    def __getitem__(self, day: int) -> list[int]:
+        return Availability.mask_to_slots(self._masks[day])
+
+    def __iter__(self):
+        return iter(self._masks)
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
 class Availability:
-    def __init__(self, dir : dict, taken_periods = None):
-        invalid_keys = set(dir.keys()) - set(DAYS)
-        if invalid_keys:
-            inv_keys_str = ", ".join(f"'{a}'" for a in invalid_keys)
-            raise KeyError(f"Invalid keys in availability data: {inv_keys_str}")
-        filtered = {}
+    def __init__(self, dir : dict, taken_periods = None, validate: bool = True):
+        # validate=False skips checks of data already checked by src.validation
+        if validate:
+            invalid_keys = set(dir.keys()) - set(DAYS)
+            if invalid_keys:
+                inv_keys_str = ", ".join(f"'{a}'" for a in invalid_keys)
+                raise KeyError(f"Invalid keys in availability data: {inv_keys_str}")
+        masks = {}
         for day in DAYS:
             slots = dir.get(day, [])
-            if not all(isinstance(slot, int) and 0 <= slot for slot in slots):
+            if validate and not all(isinstance(slot, int) and 0 <= slot for slot in slots):
                 raise ValueError(f"Slots in Availability must be non-negative integers. Sent '{slots}'.")
-            filtered[day] = slots
-        self.slots = filtered
+            masks[day] = Availability.slots_to_mask(slots)
+        # Each day is stored as an integer bitmask: bit `s` is set iff slot `s` is free.
+        self.masks = masks
         
         # Taken periods does not happen in practice since user can set occurence_desc only for Groups.
         # Taken periods are added to Teachers and Rooms availabilities via their book_time_slot() function
@@ -36,17 +58,30 @@ class Availability:
         
         self.taken_periods = taken_periods
 
+    def copy(self) -> 'Availability':
+        clone = Availability({}, validate=False)
+        clone.masks = dict(self.masks)
+        clone.taken_periods = {key: list(periods) for key, periods in self.taken_periods.items()}
+        return clone
+
     @staticmethod
     def from_json(json_string : str) -> 'Availability':
-        data = json.loads(json_string)
-        invalid_keys = set(int(k) for k in data.keys()) - set(DAYS)
+        return Availability.from_dict(json.loads(json_string))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Availability':
+        # days are strings in JSON, but integers are accepted too
+        days = {int(day): slots for day, slots in data.items()}
+        if not validate:
+            return Availability(days, validate=False)
+        invalid_keys = set(days) - set(DAYS)
         if invalid_keys:
             inv_keys_str = ", ".join(f"'{a}'" for a in invalid_keys)
             inv_days_str = ", ".join(f"'{a}'" for a in DAYS)
             raise ValueError(f"Invalid keys in availability data: {inv_keys_str}. Each key must be one of: {inv_days_str}")
         filtered = {}
         for day in DAYS:
-            slots = data.get(str(day), [])
+            slots = days.get(day, [])
             for slot in slots:
                 if not isinstance(slot, int):
                     raise ValueError(f"Slots in Availaility must be non-negative integers. Sent '{slot}'.")
@@ -61,9 +96,54 @@ class Availability:
                 return False
         return True
 
+    @staticmethod
+    def slots_to_mask(slots: list[int]) -> int:
+        mask = 0
+        for slot in slots:
+            mask |= 1 << slot
+        return mask
+
+    @staticmethod
+    def mask_to_slots(mask: int) -> list[int]:
+        slots = []
+        while mask:
+            lowest = mask & -mask
+            slots.append(lowest.bit_length() - 1)
+            mask ^= lowest
+        return slots
+
+    @staticmethod
+    def span_mask(start: int, duration: int) -> int:
+        # bits set for every slot in [start, start+duration)
+        if duration <= 0:
+            return 0
+        return ((1 << duration) - 1) << start
+
+    @property
+    def slots(self) -> SlotsView:
+        return SlotsView(self.masks)
+
+    def is_available(self, day: int, slot: int) -> bool:
+        return bool(self.masks.get(day, 0) >> slot & 1)
+
+    def covers(self, day: int, start: int, duration: int) -> bool:
+        # true if every slot of [start, start+duration) is free on given day
+        span = Availability.span_mask(start, duration)
+        return self.masks.get(day, 0) & span == span
+
+    def starts_mask(self, day: int, duration: int) -> int:
+        # bit `s` is set iff [s, s+duration) is free and `s` itself is free
+        mask = self.masks.get(day, 0)
+        starts = mask
+        for shift in range(1, duration):
+            starts &= mask >> shift
+        return starts
+
     def remove(self, day: int, slot: int, mask: list[int]) -> bool:
+        bit = 1 << slot
+
         # Check if slot exists for the given day
-        if slot not in self.slots[day]:
+        if not self.masks.get(day, 0) & bit:
             return False
         
         # Check if the mask conflicts with already taken periods
@@ -72,7 +152,7 @@ class Availability:
         
         # If no mask, remove the slot completely
         if not mask:
-            self.slots[day].remove(slot)
+            self.masks[day] &= ~bit
             # Also remove from taken_periods if it exists
             if (day, slot) in self.taken_periods:
                 del self.taken_periods[(day, slot)]
@@ -83,3 +163,19 @@ class Availability:
             self.taken_periods[(day, slot)] = []
         self.taken_periods[(day, slot)].extend(mask)
         return True
+
+    def slot_state(self, day: int, slot: int) -> tuple[bool, list[int] | None]:
+        # Everything remove(day, slot, ...) may change, for restore_slot_state()
+        taken = self.taken_periods.get((day, slot), None)
+        return self.is_available(day, slot), list(taken) if taken is not None else None
+
+    def restore_slot_state(self, day: int, slot: int, state: tuple[bool, list[int] | None]) -> None:
+        available, taken = state
+        if available:
+            self.masks[day] |= 1 << slot
+        else:
+            self.masks[day] &= ~(1 << slot)
+        if taken is None:
+            self.taken_periods.pop((day, slot), None)
+        else:
+            self.taken_periods[(day, slot)] = taken
@@ -1,23 +1,43 @@
 import json
-from itertools import permutations
-from collections import deque
+from bisect import bisect_left, insort
+from collections import Counter
 from src.models import Allocation
 
 class Cluster:
-    def __init__(self, id: int, range: list[int], group_ids: list[int]):
-        if not isinstance(id, int):
+    def __init__(self, id: int, range: list[int], group_ids: list[int], validate: bool = True):
+        if validate and not isinstance(id, int):
             raise ValueError(f"Field 'id' value in cluster must be an integer. Sent '{id}'.")
         self.id = id
-        if not all(isinstance(el, int) for el in range):
+        if validate and not all(isinstance(el, int) for el in range):
             raise ValueError(f"Field 'range' value in cluster must be a list of integers. Sent '{range}'.")
         self.range = range
-        self.group_ids = group_ids
+        if validate and not all(isinstance(el, int) for el in group_ids):
+            raise ValueError(f"Field 'group_ids' value in cluster must be a list of integers. Sent '{group_ids}'.")
+        # set, as it is mostly used to check if a group belongs to the cluster
+        self.group_ids = set(group_ids)
         self.allocations = []
+        # Slots of the allocations, kept up to date by add_allocation and remove_allocation,
+        # so check() and can_use_slots() do not collect them from all allocations every time.
+        # Blocks cannot span days, so ways to cover each day are cached separately
+        # and only the changed day is covered again.
+        lengths = sorted(Counter(range).items())
+        self.blocks = [length for length, _ in lengths]
+        self.block_counts = tuple(n for _, n in lengths)
+        self.slot_counts = Counter()  # (day, slot) -> number of allocations using it
+        self.day_slots = {}           # day -> sorted slots used on that day
+        self.day_options = {}         # day -> cover_options of its slots (missing if it changed)
+        self.overlaps = 0             # slots used by more than one allocation
+        self.satisfied = None         # cached check() (None if allocations changed)
 
     @staticmethod
     def from_json(json_string : str) -> 'Cluster':
+        return Cluster.from_dict(json.loads(json_string))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Cluster':
         REQUIRED_FIELDS = ['id', 'range', 'group_ids']
-        data = json.loads(json_string)
+        if not validate:
+            return Cluster(data['id'], data['range'], data['group_ids'], validate=False)
         missing = [field for field in REQUIRED_FIELDS if field not in data]
         if missing:
             missing_str = ", ".join(f"'{a}'" for a in missing)
@@ -28,13 +48,54 @@ class Cluster:
         group_ids = data.get('group_ids')
         return Cluster(id, range, group_ids)
     
-    def add_allocation(self, alloc: Allocation) -> None:
+    def add_allocation(self, alloc: Allocation) -> bool:
+        # returns True if `alloc` was added
         if (alloc.group_id in self.group_ids and
             alloc not in self.allocations):
-            self.allocations.append(alloc)
+            self.append_allocation(alloc)
+            return True
+        return False
 
-    def do_not_overlap(self, extra_day=None, extra_slots=None) -> bool:
-        slots_used_per_alloc = [[slot + alloc.day*86400 for slot in alloc.slots] for alloc in self.allocations]
+    def append_allocation(self, alloc: Allocation) -> None:
+        # adds `alloc` without checking its group (e.g. when a removal is undone)
+        self.allocations.append(alloc)
+        for slot in alloc.slots:
+            key = (alloc.day, slot)
+            self.slot_counts[key] += 1
+            if self.slot_counts[key] == 1:
+                insort(self.day_slots.setdefault(alloc.day, []), slot)
+            elif self.slot_counts[key] == 2:
+                self.overlaps += 1
+        self.day_options.pop(alloc.day, None)
+        self.satisfied = None
+
+    def remove_allocation(self, alloc: Allocation) -> bool:
+        # returns True if `alloc` (by identity) was removed
+        for i in range(len(self.allocations) - 1, -1, -1):
+            if self.allocations[i] is alloc:
+                del self.allocations[i]
+                break
+        else:
+            return False
+        for slot in alloc.slots:
+            key = (alloc.day, slot)
+            self.slot_counts[key] -= 1
+            if self.slot_counts[key] == 0:
+                del self.slot_counts[key]
+                slots = self.day_slots[alloc.day]
+                del slots[bisect_left(slots, slot)]
+                if not slots:
+                    del self.day_slots[alloc.day]
+            elif self.slot_counts[key] == 1:
+                self.overlaps -= 1
+        self.day_options.pop(alloc.day, None)
+        self.satisfied = None
+        return True
+
+    def do_not_overlap(self, extra_day=None, extra_slots=None, allocations=None) -> bool:
+        if allocations is None:
+            allocations = self.allocations
+        slots_used_per_alloc = [[slot + alloc.day*86400 for slot in alloc.slots] for alloc in allocations]
         if extra_day:
             slots_used_per_alloc.append([extra_day*86400 + s for s in extra_slots])
         s = set()
@@ -45,11 +106,13 @@ class Cluster:
                 s.add(el)
         return True
     
-    def get_slots_ascending(self, extra_day=None, extra_slots=None) -> list[int]:
+    def get_slots_ascending(self, extra_day=None, extra_slots=None, allocations=None) -> list[int]:
+        if allocations is None:
+            allocations = self.allocations
         slots_set = set()
         slots = [
             slot + alloc.day * 86400
-            for alloc in self.allocations
+            for alloc in allocations
             for slot in alloc.slots
         ]
         if extra_day:
@@ -61,36 +124,151 @@ class Cluster:
         slots_list.sort()
         return slots_list
 
-    def try_to_delete_slots_with_blocks(self, slots: deque[int], blocks: list[int]) -> list[int]:
-        # slots must be sorted ascending and with no repetitions
-        if not slots or not blocks:
-            return slots
-        else:
-            earliest_slot = slots[0]
-            for h in range(earliest_slot, earliest_slot+blocks[0]):
-                if slots:
-                    if slots[0] == h:
-                        slots.popleft()
-                else:
-                    return slots
-            return self.try_to_delete_slots_with_blocks(slots, blocks[1:])
+    def can_cover(self, slots: list[int]) -> bool:
+        # Whether blocks with lengths from `range` (each used at most once) cover all `slots`
+        # (sorted ascending and with no repetitions). A block can always be moved to start at
+        # the earliest slot not covered yet, so the only choice is which block goes next.
+        # Memoized over (first uncovered slot, counts of unused blocks of every length),
+        # instead of trying every order of the blocks.
+        lengths = sorted(Counter(self.range).items())
+        blocks = [length for length, _ in lengths]
+        failed = set()
 
-    def check(self) -> bool:
+        def cover(i: int, counts: tuple) -> bool:
+            if i == len(slots):
+                return True
+            # a block of length b covers at most b slots
+            if sum(b * n for b, n in zip(blocks, counts)) < len(slots) - i or (i, counts) in failed:
+                return False
+            for k, length in enumerate(blocks):
+                if counts[k]:
+                    rest = counts[:k] + (counts[k] - 1,) + counts[k+1:]
+                    if cover(bisect_left(slots, slots[i] + length, i), rest):
+                        return True
+            failed.add((i, counts))
+            return False
+
+        return cover(0, tuple(n for _, n in lengths))
+
+    def uncovered(self, allocations: list[Allocation]) -> int:
+        # How far `allocations` are from satisfying the cluster: the fewest of their slots
+        # left uncovered by blocks (or the number of overlapping slots if range is empty).
+        # It is 0 exactly when satisfied_by(allocations) is True.
         if self.range == []:
-            return self.do_not_overlap()
-        
-        for perm in permutations(self.range):
-            slots = deque(self.get_slots_ascending())
-            if not self.try_to_delete_slots_with_blocks(slots, perm):
+            return sum(len(alloc.slots) for alloc in allocations) - len(self.get_slots_ascending(allocations=allocations))
+        slots_per_day = {}
+        for alloc in allocations:
+            slots_per_day.setdefault(alloc.day, set()).update(alloc.slots)
+        return self.fewest_uncovered([self.uncover_options(sorted(slots)) for slots in slots_per_day.values()])
+
+    def uncover_options(self, slots: list[int]) -> list[tuple[tuple, int]]:
+        # Ways to cover as many `slots` of one day (sorted ascending and with no repetitions)
+        # as possible: pairs of numbers of blocks of each length (as in self.blocks) and the fewest
+        # slots left uncovered with them. Pairs using more blocks to leave as many slots are dropped.
+        best = {}    # blocks used -> fewest slots left uncovered
+        visited = {}
+
+        def uncover(i: int, used: tuple, left: int) -> None:
+            if visited.get((i, used), len(slots) + 1) <= left:
+                return
+            visited[(i, used)] = left
+            if i == len(slots):
+                best[used] = min(best.get(used, left), left)
+                return
+            uncover(i + 1, used, left + 1)
+            for k, length in enumerate(self.blocks):
+                if used[k] < self.block_counts[k]:
+                    uncover(bisect_left(slots, slots[i] + length, i), used[:k] + (used[k] + 1,) + used[k+1:], left)
+
+        uncover(0, (0,) * len(self.blocks), 0)
+        return [(used, left) for used, left in best.items()
+                if not any(other != used and other_left <= left and all(a <= b for a, b in zip(other, used))
+                           for other, other_left in best.items())]
+
+    def fewest_uncovered(self, options_per_day: list[list[tuple[tuple, int]]]) -> int:
+        # fewest slots left uncovered choosing one of uncover_options of every day
+        # without using more blocks than there are
+        totals = {(0,) * len(self.blocks): 0}
+        for options in options_per_day:
+            combined = {}
+            for used, left in totals.items():
+                for option, option_left in options:
+                    total = tuple(a + b for a, b in zip(used, option))
+                    if all(t <= n for t, n in zip(total, self.block_counts)):
+                        combined[total] = min(combined.get(total, left + option_left), left + option_left)
+            totals = combined
+        return min(totals.values())
+
+    def cover_options(self, slots: list[int]) -> list[tuple]:
+        # Minimal numbers of blocks of each length (as in self.blocks) which cover `slots`
+        # of one day (sorted ascending and with no repetitions), as in can_cover.
+        options = []
+        visited = set()
+
+        def cover(i: int, used: tuple) -> None:
+            if (i, used) in visited:
+                return
+            visited.add((i, used))
+            if i == len(slots):
+                options.append(used)
+                return
+            left = sum(b * (n - u) for b, n, u in zip(self.blocks, self.block_counts, used))
+            if left < len(slots) - i:
+                return
+            for k, length in enumerate(self.blocks):
+                if used[k] < self.block_counts[k]:
+                    cover(bisect_left(slots, slots[i] + length, i), used[:k] + (used[k] + 1,) + used[k+1:])
+
+        cover(0, (0,) * len(self.blocks))
+        return [used for used in options
+                if not any(other != used and all(a <= b for a, b in zip(other, used)) for other in options)]
+
+    def options_for_day(self, day: int) -> list[tuple]:
+        options = self.day_options.get(day, None)
+        if options is None:
+            options = self.cover_options(self.day_slots[day])
+            self.day_options[day] = options
+        return options
+
+    def fits(self, options_per_day: list[list[tuple]]) -> bool:
+        # whether one option of every day can be chosen without using more blocks than there are
+        options_per_day = sorted(options_per_day, key=len)
+        failed = set()
+
+        def fit(k: int, used: tuple) -> bool:
+            if k == len(options_per_day):
                 return True
-        return False
-    
+            if (k, used) in failed:
+                return False
+            for option in options_per_day[k]:
+                total = tuple(a + b for a, b in zip(used, option))
+                if all(t <= n for t, n in zip(total, self.block_counts)) and fit(k + 1, total):
+                    return True
+            failed.add((k, used))
+            return False
+
+        return fit(0, (0,) * len(self.blocks))
+
+    def check(self) -> bool:
+        if self.satisfied is None:
+            if self.range == []:
+                self.satisfied = self.overlaps == 0
+            else:
+                self.satisfied = self.fits([self.options_for_day(day) for day in self.day_slots])
+        return self.satisfied
+
+    def satisfied_by(self, allocations: list[Allocation]) -> bool:
+        # check() for given allocations instead of the cluster's own
+        if self.range == []:
+            return self.do_not_overlap(allocations=allocations)
+        return self.can_cover(self.get_slots_ascending(allocations=allocations))
+
     def can_use_slots(self, day: int, slots: list[int]) -> bool:
+        # Only the cover of `day` is computed again, other days' are cached.
         if self.range == []:
-            return self.do_not_overlap(day, slots)
-        
-        for perm in permutations(self.range):
-            slots = deque(self.get_slots_ascending(day, slots))
-            if not self.try_to_delete_slots_with_blocks(slots, perm):
-                return True
-        return False
+            return (self.overlaps == 0 and len(set(slots)) == len(slots) and
+                    all(self.slot_counts[(day, slot)] == 0 for slot in slots))
+        day_slots = sorted(set(self.day_slots.get(day, [])).union(slots))
+        options = [self.options_for_day(d) for d in self.day_slots if d != day]
+        options.append(self.cover_options(day_slots))
+        return self.fits(options)
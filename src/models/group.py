@@ -12,17 +12,18 @@ class Group:
             availability : Availability,
             labels : list[list],
             teacher_ids : list[int],
-            occurrence_desc : list[int]
+            occurrence_desc : list[int],
+            validate : bool = True
             ):
         self.id = id
-        if not isinstance(duration, int):
+        if validate and not isinstance(duration, int):
             raise ValueError(f"Field 'duration' value in Group must be an integer. Sent '{duration}'.")
         self.duration = duration
-        if not isinstance(capacity, int):
+        if validate and not isinstance(capacity, int):
             raise ValueError(f"Field 'capacity' value in Group must be an integer. Sent '{capacity}'.")
         self.capacity = capacity
         self.availability = availability
-        if not Group.are_labels_valid(labels):
+        if validate and not Group.are_labels_valid(labels):
             raise ValueError(f"Labels '{labels}' passed to the Group with id={id} have incorrect format. Refer to the documentation.")
         self.labels = labels
         self.teacher_ids = teacher_ids
@@ -30,8 +31,18 @@ class Group:
 
     @staticmethod
     def from_json(json_string : str) -> 'Group':
+        return Group.from_dict(json.loads(json_string))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Group':
         REQUIRED_FIELDS = ['id', 'duration', 'capacity', 'availability']
-        data = json.loads(json_string)
+        if not validate:
+            return Group(
+                data['id'], data['duration'], data['capacity'],
+                Availability.from_dict(data['availability'], validate=False),
+                data.get('labels', []), data.get('teacher_ids', []), data.get('occurrence_desc', []),
+                validate=False
+            )
         missing = [field for field in REQUIRED_FIELDS if field not in data]
         if missing:
             missing_str = ", ".join(f"'{a}'" for a in missing)
@@ -41,7 +52,7 @@ class Group:
         duration = data.get('duration')
         capacity = data.get('capacity')
         availability_data = data.get("availability")
-        avail = Availability.from_json(json.dumps(availability_data))
+        avail = Availability.from_dict(availability_data)
         labels = data.get('labels', [])
         teacher_ids = data.get('teacher_ids', [])
         if not teacher_ids and Group.THROW_IF_NO_TEACHER:
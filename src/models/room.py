@@ -7,18 +7,25 @@ class Room:
             id : int,
             capacity : int,
             availability : Availability,
-            labels : list[list]):
+            labels : list[list],
+            validate : bool = True):
         self.id = id
         self.capacity = capacity
-        if not isinstance(capacity, int):
+        if validate and not isinstance(capacity, int):
             raise ValueError(f"Field 'capacity' value in Room must be an integer. Sent '{capacity}'.")
         self.availability = availability
         self.labels = labels
 
     @staticmethod
     def from_json(json_string : str) -> 'Room':
+        return Room.from_dict(json.loads(json_string))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Room':
         REQUIRED_FIELDS = ['id', 'capacity', 'availability', 'labels']
-        data = json.loads(json_string)
+        if not validate:
+            availability = Availability.from_dict(data['availability'], validate=False)
+            return Room(data['id'], data['capacity'], availability, data['labels'], validate=False)
         missing = [field for field in REQUIRED_FIELDS if field not in data]
         if missing:
             req_fields_str = ", ".join(f"'{a}'" for a in missing)
@@ -27,7 +34,7 @@ class Room:
         id = data.get('id')
         capacity = data.get('capacity')
         availability_data = data.get("availability")
-        availability = Availability.from_json(json.dumps(availability_data))
+        availability = Availability.from_dict(availability_data)
         labels = data.get('labels', [])
         
         return Room(id, capacity, availability, labels)
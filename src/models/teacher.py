@@ -11,15 +11,20 @@ class Teacher:
 
     @staticmethod
     def from_json(json_string: str) -> 'Teacher':
+        return Teacher.from_dict(json.loads(json_string))
+
+    @staticmethod
+    def from_dict(data: dict, validate: bool = True) -> 'Teacher':
         REQUIRED_FIELDS = ['id', 'availability']
-        data = json.loads(json_string)
+        if not validate:
+            return Teacher(data['id'], Availability.from_dict(data['availability'], validate=False))
         missing = [field for field in REQUIRED_FIELDS if field not in data]
         if missing:
             missing_str = ", ".join(f"'{a}'" for a in missing)
             raise ValueError(f"Teacher is missing required fields: {missing_str}")
         
         availability_data = data.get("availability")
-        avail = Availability.from_json(json.dumps(availability_data))
+        avail = Availability.from_dict(availability_data)
             
         return Teacher(
             id=data.get('id'),
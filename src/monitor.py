@@ -0,0 +1,63 @@
+import threading
+import time
+
+class Monitor:
+    # Shared between a running algorithm and whoever waits for it (e.g. a job).
+    # Algorithms report placed groups and stop between placements once cancelled.
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.algorithm = None
+        self.groups_total = 0
+        self.groups_placed = 0
+        self.started_at = None
+
+    def start(self, algorithm: str, groups_total: int) -> None:
+        self.algorithm = algorithm
+        self.groups_total = groups_total
+        self.groups_placed = 0
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+
+    def placed(self) -> None:
+        self.groups_placed += 1
+
+    def unplaced(self) -> None:
+        # a placement was undone (e.g. by backtracking)
+        self.groups_placed -= 1
+
+    def reset_placed(self, count: int) -> None:
+        # placements were redone (e.g. by large neighbourhood search)
+        self.groups_placed = count
+
+    def attempt_finished(self, placed: int) -> None:
+        # attempts run in other processes count placements on their own copy,
+        # so their progress is only known once they finish
+        self.groups_placed = max(self.groups_placed, placed)
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def progress(self) -> dict:
+        return {
+            "algorithm": self.algorithm,
+            "groups_placed": self.groups_placed,
+            "groups_total": self.groups_total,
+            "elapsed": time.monotonic() - self.started_at if self.started_at is not None else 0.0
+        }
+
+    # Events cannot be pickled; a copy sent to another process gets its own one
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["cancel_event"] = self.cancelled
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        cancelled = state.pop("cancel_event")
+        self.__dict__.update(state)
+        self.cancel_event = threading.Event()
+        if cancelled:
+            self.cancel_event.set()
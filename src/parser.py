@@ -1,34 +1,77 @@
 from src.models import Room, Group, Teacher, Cluster, Allocation
-from src import Problem, CHECK_OPTIONS, ALGORITHMS_AVAILABLE
+from src import Problem, CHECK_OPTIONS, ALGORITHMS_AVAILABLE, SELECT_OPTIONS, PORTFOLIO_METHOD
+from src.solver import MAX_RESTARTS, MAX_WORKERS
 from src.communication import Query
+from src.validation import compile_schema, request_schema, positive_int, ValidationError
+from src.problem_cache import ProblemCache, STATIC_FIELDS
 import json
 
+# Requests are validated as a whole against the schemas in src.validation, compiled once here.
+# Models are then built without repeating per-element checks.
+SCHEDULE_VALIDATOR = compile_schema(request_schema(
+    [*ALGORITHMS_AVAILABLE, PORTFOLIO_METHOD],
+    {
+        "restarts": {**positive_int(), "max": MAX_RESTARTS},
+        "workers": {**positive_int(), "max": MAX_WORKERS},
+        "select": {"type": "str", "enum": SELECT_OPTIONS},
+        "deadline": {"type": "number", "exclusive_min": 0, "nullable": True}
+    }
+))
+CHECK_VALIDATOR = compile_schema(request_schema(CHECK_OPTIONS, {}))
+
 class Parser:
+    def __init__(self, cache: ProblemCache = None):
+        # with a cache, requests with the same rooms, teachers, groups and clusters
+        # share one parsed (and validated) base Problem
+        self.cache = cache
+
     def parse(self, json_data: str, check_request=False) -> Query:
-        problem = Problem()
-        data = json.loads(json_data)
+        return self.parse_dict(json.loads(json_data), check_request)
 
-        method = data.get("method", None)
-        if check_request:
-            if method not in CHECK_OPTIONS and method:
-                check_opt_str = ", ".join(f"'{a}'" for a in CHECK_OPTIONS)
-                raise ValueError(f"field 'method' value in Request to '/check' endpoint must be one of the following: {check_opt_str}. Sent '{method}'.")
+    def parse_dict(self, data: dict, check_request=False) -> Query:
+        # same as parse, but for a request which is already decoded
+        validate = CHECK_VALIDATOR if check_request else SCHEDULE_VALIDATOR
+        base = None
+        if self.cache is not None and isinstance(data, dict):
+            key, size = ProblemCache.key(data)
+            base = self.cache.get(key)
+
+        if base is None:
+            issues = validate(data)
         else:
-            if method not in ALGORITHMS_AVAILABLE and method:
-                alg_opt_str = ", ".join(f"'{a}'" for a in ALGORITHMS_AVAILABLE)
-                raise ValueError(f"field 'method' value in Request to '/schedule' endpoint must be one of the following: {alg_opt_str}. Sent '{method}'.")
-        
+            # the static part was already validated when the base was built
+            issues = validate({field: value for field, value in data.items() if field not in STATIC_FIELDS})
+        if issues:
+            raise ValidationError(issues)
+
+        method = data.get("method", None)
+        restarts = data.get("restarts", 1)
+        workers = data.get("workers", 1)
+        select = data.get("select", "first")
+        deadline = data.get("deadline", None)
+
+        if base is None:
+            base = self.parse_base(data)
+            if self.cache is not None:
+                self.cache.put(key, base, size)
+        problem = base.clone() if self.cache is not None else base
+
+        established = data.get("allocations", [])
+        for allocation in established:
+            problem.add_allocation(Allocation.from_dict(allocation, validate=False))
+
+        return Query(problem, method, restarts, workers, select, deadline)
+
+    def parse_base(self, data: dict) -> Problem:
+        # Problem without allocations from already validated data
+        problem = Problem()
         for room in data.get('rooms', []):
-            problem.add_room(Room.from_json(json.dumps(room)))
+            problem.add_room(Room.from_dict(room, validate=False))
         for group in data.get('groups', []):
-            problem.add_group(Group.from_json(json.dumps(group)))
+            problem.add_group(Group.from_dict(group, validate=False))
         for teacher in data.get('teachers', []):
-            problem.add_teacher(Teacher.from_json(json.dumps(teacher)))
+            problem.add_teacher(Teacher.from_dict(teacher, validate=False))
         for cluster in data.get('clusters', []):
-            problem.add_cluster(Cluster.from_json(json.dumps(cluster)))
-        
-        established = data.get("allocations", [])
-        for allocation in established:
-            problem.add_allocation(Allocation.from_json(json.dumps(allocation)))
-
-        return Query(problem, method)
+            problem.add_cluster(Cluster.from_dict(cluster, validate=False))
+        problem.get_room_index()
+        return problem
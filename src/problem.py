@@ -1,5 +1,8 @@
-from . import Teacher, Room, Group, Cluster, Allocation
+from . import Teacher, Room, Group, Cluster, Allocation, Availability
 from src.communication import Issue
+from .room_index import RoomIndex
+from .checker import IncrementalChecker
+from .monitor import Monitor
 
 CHECK_OPTIONS = ["full_check", "simple_check"]
 
@@ -16,7 +19,90 @@ class Problem:
         self.rooms    = rooms    if rooms    is not None else {}
         self.groups   = groups   if groups   is not None else {}
         self.clusters = clusters if clusters is not None else []
+        self.clusters_by_id = {}
+        self.clusters_by_group = {}
+        for cluster in self.clusters:
+            self.index_cluster(cluster)
+        # allocations indexed by group, teacher, room and day (see index_allocation)
+        self.allocations_by_group = {}
+        self.allocations_by_teacher = {}
+        self.allocations_by_room = {}
+        self.allocations_by_day = {}
+        # built on first check_group and kept up to date by index_allocation / unindex_allocation
+        self.checker = None
         self.allocations = allocations if allocations  is not None else []
+        self.room_index = None
+        # Every mutation done while booking allocations is recorded here,
+        # so it can be undone with restore() in O(number of changes)
+        self.trail = []
+        # progress reporting and cancellation of algorithms solving this problem
+        self.monitor = Monitor()
+        # group id -> day -> mask of starts left to the group by propagation (see Solver.solve)
+        self.domains = {}
+
+    def clone(self) -> 'Problem':
+        # Independent copy for checking or solving with other allocations.
+        # Groups and the room index are shared, as booking allocations never changes them;
+        # teachers' and rooms' availabilities and clusters are copied.
+        teachers = {id: Teacher(t.id, t.availability.copy()) for id, t in self.teachers.items()}
+        rooms = {id: Room(r.id, r.capacity, r.availability.copy(), r.labels, validate=False) for id, r in self.rooms.items()}
+        clusters = [Cluster(c.id, c.range, c.group_ids, validate=False) for c in self.clusters]
+        problem = Problem(teachers, rooms, dict(self.groups), clusters)
+        problem.room_index = self.room_index
+        problem.domains = self.domains
+        for allocation in self.allocations:
+            problem.add_allocation(allocation)
+        problem.trail = []
+        return problem
+
+    @property
+    def allocations(self) -> list[Allocation]:
+        # Do not modify this list in place, use add_allocation / remove_allocation
+        # or assign a new list, so the indexes stay up to date.
+        return self._allocations
+
+    @allocations.setter
+    def allocations(self, allocations: list[Allocation]) -> None:
+        self._allocations = allocations
+        self.allocations_by_group = {}
+        self.allocations_by_teacher = {}
+        self.allocations_by_room = {}
+        self.allocations_by_day = {}
+        self.checker = None
+        for allocation in allocations:
+            self.index_allocation(allocation)
+
+    def index_allocation(self, allocation: Allocation) -> None:
+        self.allocations_by_group.setdefault(allocation.group_id, []).append(allocation)
+        self.allocations_by_day.setdefault(allocation.day, []).append(allocation)
+        for room_id in allocation.room_ids:
+            self.allocations_by_room.setdefault(room_id, []).append(allocation)
+        group = self.groups.get(allocation.group_id, None)
+        if group is not None:
+            for teacher_id in group.teacher_ids:
+                self.allocations_by_teacher.setdefault(teacher_id, []).append(allocation)
+        if self.checker is not None:
+            self.checker.add(allocation)
+
+    def unindex_allocation(self, allocation: Allocation) -> None:
+        Problem.remove_identical(self.allocations_by_group[allocation.group_id], allocation)
+        Problem.remove_identical(self.allocations_by_day[allocation.day], allocation)
+        for room_id in allocation.room_ids:
+            Problem.remove_identical(self.allocations_by_room[room_id], allocation)
+        group = self.groups.get(allocation.group_id, None)
+        if group is not None:
+            for teacher_id in group.teacher_ids:
+                Problem.remove_identical(self.allocations_by_teacher[teacher_id], allocation)
+        if self.checker is not None:
+            self.checker.remove(allocation)
+
+    @staticmethod
+    def remove_identical(allocations: list[Allocation], allocation: Allocation) -> None:
+        # allocations are usually removed in reverse order of adding, so search from the end
+        for i in range(len(allocations) - 1, -1, -1):
+            if allocations[i] is allocation:
+                del allocations[i]
+                return
 
     def add_teacher(self, teacher: Teacher) -> None:
         if teacher.id in self.teachers:
@@ -27,110 +113,158 @@ class Problem:
         if room.id in self.rooms:
             raise ValueError(f"Rooms should have unique ids. Id '{room.id}' repeats.")
         self.rooms[room.id] = room
+        self.room_index = None
+
+    def get_room_index(self) -> RoomIndex:
+        if self.room_index is None:
+            self.room_index = RoomIndex(self.rooms)
+        return self.room_index
+
+    def get_checker(self) -> IncrementalChecker:
+        if self.checker is None:
+            self.checker = IncrementalChecker(self)
+        return self.checker
 
     def add_group(self, group: Group) -> None:
         if group.id in self.groups:
             raise ValueError(f"Groups should have unique ids. Id '{group.id}' repeats.")
         self.groups[group.id] = group
+        # allocations added before their group are indexed by teacher now
+        for allocation in self.allocations_by_group.get(group.id, []):
+            for teacher_id in group.teacher_ids:
+                self.allocations_by_teacher.setdefault(teacher_id, []).append(allocation)
+        self.checker = None
     
+    def index_cluster(self, cluster: Cluster) -> None:
+        self.clusters_by_id[cluster.id] = cluster
+        for group_id in cluster.group_ids:
+            self.clusters_by_group.setdefault(group_id, []).append(cluster)
+
     def add_cluster(self, cluster: Cluster) -> None:
-        exisiting_cluster_ids = [c.id for c in self.clusters]
-        if cluster.id in exisiting_cluster_ids:
+        if cluster.id in self.clusters_by_id:
             raise ValueError(f"Clusters should have unique ids. Id '{cluster.id}' repeats.")
         self.clusters.append(cluster)
-        for alloc in self.allocations:
-            if alloc.group_id in cluster.group_ids:
+        self.index_cluster(cluster)
+        for group_id in cluster.group_ids:
+            for alloc in self.allocations_by_group.get(group_id, []):
                 cluster.add_allocation(alloc)
+        self.checker = None
 
     def add_allocation(self, allocation: Allocation) -> None:
         # TODO: check if group exists?
-        self.allocations.append(allocation)
-        for cluster in self.clusters:
-            if allocation.group_id in cluster.group_ids:
-                cluster.add_allocation(allocation)
+        self._allocations.append(allocation)
+        self.index_allocation(allocation)
+        self.trail.append(("allocation",))
+        for cluster in self.clusters_by_group.get(allocation.group_id, []):
+            if cluster.add_allocation(allocation):
+                self.trail.append(("cluster", cluster, allocation))
+
+    def remove_allocation(self, allocation: Allocation) -> None:
+        # Removes the allocation (by identity) without releasing anything it booked,
+        # as check() does not need availabilities updated.
+        index = next(i for i, a in enumerate(self._allocations) if a is allocation)
+        del self._allocations[index]
+        self.unindex_allocation(allocation)
+        clusters = []
+        for cluster in self.clusters_by_group.get(allocation.group_id, []):
+            if cluster.remove_allocation(allocation):
+                clusters.append(cluster)
+        self.trail.append(("removal", index, allocation, clusters))
+
+    def get_allocation(self, group_id: int) -> Allocation | None:
+        # the last allocation of the group, as in check()
+        allocations = self.allocations_by_group.get(group_id, None)
+        return allocations[-1] if allocations else None
+
+    def is_allocated(self, group_id: int) -> bool:
+        return bool(self.allocations_by_group.get(group_id, None))
+
+    def book_time_slot(self, availability: Availability, day: int, slot: int, mask: list[int]) -> bool:
+        state = availability.slot_state(day, slot)
+        if not availability.remove(day, slot, mask):
+            return False
+        self.trail.append(("slot", availability, day, slot, state))
+        return True
 
     def add_allocation_and_update_availability(self, allocation : Allocation) -> bool:
         day, slots, mask = allocation.day, allocation.slots, self.groups[allocation.group_id].occurrence_desc
+        marker = self.snapshot()
 
         for t_id in self.groups[allocation.group_id].teacher_ids:
             for h in slots:
-                if not self.teachers[t_id].book_time_slot(day, h, mask):
+                if not self.book_time_slot(self.teachers[t_id].availability, day, h, mask):
+                    self.restore(marker)
                     return False
                 
         for r_id in allocation.room_ids:
             for h in slots:
-                if not self.rooms[r_id].book_time_slot(day, h, mask):
+                if not self.book_time_slot(self.rooms[r_id].availability, day, h, mask):
+                    self.restore(marker)
                     return False
         
-        for c in self.clusters:
-            c.add_allocation(allocation)
+        # only clusters of the group can change
+        for c in self.clusters_by_group.get(allocation.group_id, []):
+            if c.add_allocation(allocation):
+                self.trail.append(("cluster", c, allocation))
             if not c.check():
+                self.restore(marker)
                 return False
                 
         # I think it is not necessery to update group availability
         # as we want look at it anymore after adding an allocation
-        self.allocations.append(allocation)
+        self._allocations.append(allocation)
+        self.index_allocation(allocation)
+        self.trail.append(("allocation",))
         return True
-    
-    def check_constraints(self, allocation: Allocation, group: Group, full_check: bool) -> list[Issue]:
-            fails = []
-            if not group:
-                issue = Issue("allocation", allocation.group_id, f"allocation with group_id {allocation.group_id} exists, but ther is no group with such id.")
-                return [issue]
-
-            checks_to_do = [
-                self.check_group_availability,
-                self.check_teacher_availability,
-                self.check_teacher_conflicts,
-                self.check_room_availability,
-                self.check_room_conflicts,
-                self.check_room_labels,
-                self.check_room_capacity,
-                self.check_cluster_constraints,
-                self.check_cluster_slots
-            ]
-            for fun in checks_to_do:
-                issues = fun(allocation, group)
-                if issues:
-                    if full_check:
-                        fails.extend(issues)
-                    else:
-                        return issues
-                
-            return fails
 
-    def check(self, method="simple_check") -> list[Issue]:        
-        full_check = method == "full_check"
-        failed_constraints = []
-        
-        for group in self.groups.values():
-
-            allocation = None
-            for rec in self.allocations:
-                if rec.group_id == group.id:
-                    allocation = rec
-
-            if not allocation:
-                issue = Issue("group", group.id, f"Group with id={group.id} is not present in solution")
-                if full_check:
-                    failed_constraints.append(issue)
-                else:
-                    return [issue]
-            
-            issues = self.check_constraints(allocation, group, full_check)
-            if issues:
-                if full_check:
-                        failed_constraints.extend(issues)
-                else:
-                    return issues
-            
-        return failed_constraints
+    def book_established_allocations(self) -> None:
+        # Re-add allocations given by the user so that they take
+        # teachers and rooms availabilities before solving
+        established = self.allocations
+        self.allocations = []
+        self.trail.append(("allocations", established))
+        for alloc in established:
+            self.add_allocation_and_update_availability(alloc)
+
+    def snapshot(self) -> int:
+        return len(self.trail)
+
+    def restore(self, marker: int) -> None:
+        # Undo all changes recorded after snapshot() returned `marker`.
+        # Note that allocations added since then are popped from self.allocations in place.
+        while len(self.trail) > marker:
+            change = self.trail.pop()
+            kind = change[0]
+            if kind == "slot":
+                _, availability, day, slot, state = change
+                availability.restore_slot_state(day, slot, state)
+            elif kind == "cluster":
+                _, cluster, allocation = change
+                cluster.remove_allocation(allocation)
+            elif kind == "allocation":
+                self.unindex_allocation(self._allocations.pop())
+            elif kind == "allocations":
+                self.allocations = change[1]
+            elif kind == "removal":
+                _, index, allocation, clusters = change
+                self._allocations.insert(index, allocation)
+                self.index_allocation(allocation)
+                for cluster in clusters:
+                    cluster.append_allocation(allocation)
     
+    def check(self, method="simple_check") -> list[Issue]:
+        return IncrementalChecker(self).check(method == "full_check")
+
+    def check_group(self, group_id: int) -> list[Issue]:
+        # all issues (as with full_check) of one group
+        return self.get_checker().check_group(group_id)
+
     def precheck(self) -> list[Issue]:
+        checker = IncrementalChecker(self)
         failed_constraints = []
         for allocation in self.allocations:
             group = self.groups.get(allocation.group_id, None)
-            issues = self.check_constraints(allocation, group, True)
+            issues = checker.check_constraints(allocation, group, True)
             if issues:
                 failed_constraints.extend(issues)
         return failed_constraints
@@ -140,56 +274,19 @@ class Problem:
         issues = []
         for teacher_id in group.teacher_ids:
             teacher = self.teachers[teacher_id]
-            if not all(s in teacher.availability.slots[allocation.day] for s in allocation.slots):
+            if not all(teacher.availability.is_available(allocation.day, s) for s in allocation.slots):
                 issues.append(Issue("teacher", teacher_id, f"Teacher with id={teacher.id} is not available on {allocation.day} in each slot out of {allocation.slots}"))
         return issues
 
-    def check_teacher_conflicts(self, allocation: Allocation, group: Group) -> list[Issue]:
-        """Ensure the teacher has no other class at the time"""
-        issues = []
-        for teacher_id in group.teacher_ids:
-            for other in self.allocations:
-                if other.group_id == allocation.group_id or other.day != allocation.day:
-                    continue
-
-                if teacher_id in self.groups[other.group_id].teacher_ids:
-                    if any(other_s in allocation.slots for other_s in other.slots):
-                        if (len(list(set(self.groups[other.group_id].occurrence_desc) & set(self.groups[group.id].occurrence_desc))) > 0 or
-                            not self.groups[other.group_id].occurrence_desc or
-                            not self.groups[group.id].occurrence_desc):
-                            issues.append(Issue("teacher", teacher_id, f"Teacher with id={teacher_id} has conflicting classes on {allocation.day}"))
-        return issues
-
     def check_room_availability(self, allocation: Allocation, group: Group) -> list[Issue]:
         issues = []
         for room_id in allocation.room_ids:
-            room_avail = self.rooms[room_id].availability.slots[allocation.day]
+            room_avail = self.rooms[room_id].availability
             for slot in allocation.slots:
-                if slot not in room_avail:
+                if not room_avail.is_available(allocation.day, slot):
                     issues.append(Issue("room", room_id, f"Room with id={room_id} is not available on {allocation.day} in slots {allocation.slots}"))
         return issues
 
-    def check_room_conflicts(self, allocation: Allocation, group: Group) -> list[Issue]:
-        """Ensure no overlapping use of the same room."""
-        issues = []
-        room_ids = allocation.room_ids
-        allocation_rooms = set(room_ids)
-
-        for other in self.allocations:
-            if other.group_id == allocation.group_id or other.day != allocation.day:
-                continue
-
-            # Shared room?
-            shared_rooms = list(allocation_rooms & set(other.room_ids))
-            for room_id in shared_rooms:
-                # Overlapping time?
-                if any(other_s in allocation.slots for other_s in other.slots):
-                    if (len(set(self.groups[other.group_id].occurrence_desc) & set(self.groups[group.id].occurrence_desc)) > 0 or
-                            not self.groups[other.group_id].occurrence_desc or
-                            not self.groups[group.id].occurrence_desc):
-                        issues.append(Issue("room", room_id, f"At least two groups (id={group.id}, id={other.group_id}) use room with id={room_id} at the same time on {allocation.day} in slots {allocation.slots}"))
-        return issues
-
     def check_room_labels(self, allocation: Allocation, group: Group) -> list[Issue]:
         """Ensure assigned rooms have required labels."""
         issues = []
@@ -207,19 +304,9 @@ class Problem:
                 issues.append(Issue("room", room_id, f"Group with id={group.id} has capacity={group.capacity} but has assigned room (id={room_id}) with capacity={self.rooms[room_id].capacity}"))
         return issues
 
-    def check_cluster_constraints(self, allocation: Allocation, group: Group) -> list[Issue]:
-        """Ensure clusters meet day/slot range constraints."""
-        issues = []
-        for cluster in self.clusters:
-            if group.id in cluster.group_ids:
-                if not cluster.check():
-                    group_ids_str = ", ".join(str(id) for id in sorted(cluster.group_ids))
-                    issues.append(Issue("cluster", cluster.id, f"Cluster connecting groups with ids {group_ids_str} is not satisfied"))
-        return issues
-                
     def check_group_availability(self, allocation: Allocation, group: Group) -> list[Issue]:
         for slot in allocation.slots:
-            if slot not in group.availability.slots[allocation.day]:
+            if not group.availability.is_available(allocation.day, slot):
                 return [Issue("allocation", group.id, f"Group with id={group.id} cannot take place on {allocation.day} in slots {allocation.slots}")]
     
     def check_cluster_slots(self, allocation: Allocation, group: Group) -> list[Issue]:
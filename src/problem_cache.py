@@ -0,0 +1,60 @@
+from src.problem import Problem
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+# request fields defining the part of a Problem which does not depend on allocations
+STATIC_FIELDS = ["rooms", "teachers", "groups", "clusters"]
+
+class ProblemCache:
+    # LRU cache of Problems built from the static part of requests, keyed by a hash of its
+    # canonical JSON. Cached Problems have no allocations and are never modified;
+    # requests get a Problem.clone() of them. Entries are weighed by the size of their
+    # canonical JSON and the least recently used ones are evicted over `max_bytes`.
+    def __init__(self, max_bytes: int = 64 * 2**20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def from_env(prefix: str, max_bytes: int = 64 * 2**20) -> 'ProblemCache':
+        # Reads {prefix}_MAX_BYTES environment variable, falling back to given default.
+        return ProblemCache(int(os.environ.get(f"{prefix}_MAX_BYTES", max_bytes)))
+
+    @staticmethod
+    def key(data: dict) -> tuple[str, int]:
+        # hash and size of the canonical JSON of the static part of the request
+        static = {field: data.get(field, []) for field in STATIC_FIELDS}
+        canonical = json.dumps(static, sort_keys=True, separators=(",", ":")).encode()
+        return hashlib.sha256(canonical).hexdigest(), len(canonical)
+
+    def get(self, key: str) -> Problem | None:
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, problem: Problem, size: int) -> None:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (problem, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def __len__(self) -> int:
+        return len(self.entries)
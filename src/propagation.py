@@ -0,0 +1,102 @@
+from src.models import Group, Availability
+from src.communication import Issue
+from src.checker import occurrences_conflict
+from src.algorithms.utils import iter_placement_candidates
+
+class DomainPropagation:
+    # Times (day and start) at which every group without an established allocation can
+    # take place, computed once before solving. Groups sharing a teacher, or a room which is
+    # the only one they can use for some labels, cannot overlap (unless their periods are
+    # disjoint), so a time of a group is dropped when every time left to such a group overlaps
+    # it (arc consistency, AC-3). A group left with a single time is forced to take it and
+    # a group left with none makes the problem infeasible.
+    # The domains are kept as per day bitmasks of starts, like Availability.starts_mask,
+    # and iter_placement_candidates lists only starts in them (see Problem.domains).
+    def __init__(self, prob):
+        self.prob = prob
+        self.groups = [g for g in prob.groups.values() if not prob.is_allocated(g.id)]
+        self.times = {}          # group id -> set of (day, start)
+        self.resources = {}      # group id -> teachers and rooms the group always uses
+        self.forced = {}         # group id -> its only (day, start)
+
+    def collect(self) -> None:
+        # times and resources next to established allocations
+        marker = self.prob.snapshot()
+        self.prob.book_established_allocations()
+        for g in self.groups:
+            self.times[g.id] = set()
+            rooms = [set() for _ in g.labels]
+            for day, start, ok_rooms in iter_placement_candidates(g, self.prob):
+                self.times[g.id].add((day, start))
+                for used, room_ids in zip(rooms, ok_rooms):
+                    used.update(room_ids)
+            self.resources[g.id] = {("teacher", t_id) for t_id in g.teacher_ids}
+            self.resources[g.id] |= {("room", next(iter(used))) for used in rooms if len(used) == 1}
+        self.prob.restore(marker)
+
+    def arcs(self) -> dict[int, set]:
+        # group id -> ids of groups which cannot overlap it
+        by_resource = {}
+        for g in self.groups:
+            for resource in self.resources[g.id]:
+                by_resource.setdefault(resource, []).append(g)
+        neighbours = {g.id: set() for g in self.groups}
+        for groups in by_resource.values():
+            for i, g in enumerate(groups):
+                for h in groups[i+1:]:
+                    if occurrences_conflict(g.occurrence_desc, h.occurrence_desc):
+                        neighbours[g.id].add(h.id)
+                        neighbours[h.id].add(g.id)
+        return neighbours
+
+    @staticmethod
+    def overlap(time: tuple[int, int], duration: int, other: tuple[int, int], other_duration: int) -> bool:
+        return time[0] == other[0] and time[1] < other[1] + other_duration and other[1] < time[1] + duration
+
+    def revise(self, g: Group, h: Group) -> bool:
+        # drops times of g overlapping every time of h, returns True if any was dropped
+        h_times = self.times[h.id]
+        removed = {
+            time for time in self.times[g.id]
+            if all(DomainPropagation.overlap(time, g.duration, other, h.duration) for other in h_times)
+        }
+        self.times[g.id] -= removed
+        return bool(removed)
+
+    def run(self) -> list[Issue]:
+        # issues of groups which cannot take place at any time (empty if there are none)
+        self.collect()
+        issues = [
+            Issue("group", g.id, f"No placement is possible for group with id={g.id}: there is no time when the group, its teachers and rooms suiting it are all available (PROPAGATION)")
+            for g in self.groups if not self.times[g.id]
+        ]
+        if issues:
+            return issues
+
+        neighbours = self.arcs()
+        queue = [(g_id, h_id) for g_id in neighbours for h_id in neighbours[g_id]]
+        queued = set(queue)
+        while queue:
+            g_id, h_id = queue.pop()
+            queued.discard((g_id, h_id))
+            if not self.revise(self.prob.groups[g_id], self.prob.groups[h_id]):
+                continue
+            if not self.times[g_id]:
+                return [Issue("group", g_id, f"No placement is possible for group with id={g_id}: every time left to it overlaps all times left to group with id={h_id}, which needs the same teacher or room (PROPAGATION)")]
+            for k_id in neighbours[g_id]:
+                if k_id != h_id and (k_id, g_id) not in queued:
+                    queue.append((k_id, g_id))
+                    queued.add((k_id, g_id))
+
+        self.forced = {g_id: next(iter(times)) for g_id, times in self.times.items() if len(times) == 1}
+        return []
+
+    def domains(self) -> dict[int, dict[int, int]]:
+        # group id -> day -> bitmask of starts
+        domains = {}
+        for g_id, times in self.times.items():
+            masks = {}
+            for day, start in times:
+                masks[day] = masks.get(day, 0) | Availability.slots_to_mask([start])
+            domains[g_id] = masks
+        return domains
@@ -0,0 +1,31 @@
+from src.models import Room
+
+class RoomIndex:
+    # Static part of room matching: which rooms satisfy a labels clause and
+    # have enough seats. Built once per Problem, so during placement search
+    # only the time-dependent availability tests have to run per slot.
+    def __init__(self, rooms: dict[int, Room]):
+        self.rooms = rooms
+        self.room_labels = {room.id: frozenset(room.labels) for room in rooms.values()}
+        self.candidates_cache = {}
+
+    @staticmethod
+    def clause_key(labels_DNF: list[list[str]]) -> frozenset:
+        return frozenset(frozenset(label_set) for label_set in labels_DNF)
+
+    def candidates(self, labels_DNF: list[list[str]], capacity: int) -> list[int]:
+        # ids of rooms satisfying `labels_DNF` with capacity at least `capacity`
+        key = (RoomIndex.clause_key(labels_DNF), capacity)
+        room_ids = self.candidates_cache.get(key, None)
+        if room_ids is None:
+            label_sets = key[0]
+            room_ids = [
+                room.id
+                for room in self.rooms.values()
+                if room.capacity >= capacity and any(ls <= self.room_labels[room.id] for ls in label_sets)
+            ]
+            self.candidates_cache[key] = room_ids
+        return room_ids
+
+    def candidates_for_group(self, labels: list[list[list[str]]], capacity: int) -> list[list[int]]:
+        return [self.candidates(labels_DNF, capacity) for labels_DNF in labels]
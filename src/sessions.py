@@ -0,0 +1,164 @@
+from src.models import Allocation
+from src.problem import Problem
+from src.parser import Parser
+from src.communication import DeltaResponse, Issue
+from src.validation import compile_schema, list_of, ALLOCATION_SCHEMA, ValidationError
+from collections import Counter, OrderedDict
+import threading
+import uuid
+
+OPERATIONS = ["add", "move", "remove"]
+
+def operation_has_arguments(operation: dict) -> list[tuple[tuple, str]]:
+    if operation["op"] == "remove" and "group_id" not in operation:
+        return [(("group_id",), "Operation 'remove' needs field 'group_id'.")]
+    if operation["op"] != "remove" and "allocation" not in operation:
+        return [(("allocation",), f"Operation '{operation['op']}' needs field 'allocation'.")]
+    return []
+
+# body of PATCH /sessions/{id}/allocations
+OPERATIONS_VALIDATOR = compile_schema({
+    "type": "object",
+    "name": "parser",
+    "required": ["operations"],
+    "fields": {
+        "operations": list_of({
+            "type": "object",
+            "name": "parser",
+            "required": ["op"],
+            "fields": {
+                "op": {"type": "str", "enum": OPERATIONS},
+                "group_id": {"type": "id"},
+                "allocation": ALLOCATION_SCHEMA
+            },
+            "checks": [operation_has_arguments]
+        })
+    }
+})
+
+def issue_difference(issues: list[Issue], others: list[Issue]) -> list[Issue]:
+    # issues not in others (as multisets, comparing type, id and message)
+    counts = Counter((issue.type, issue.id, issue.msg) for issue in others)
+    difference = []
+    for issue in issues:
+        key = (issue.type, issue.id, issue.msg)
+        if counts[key]:
+            counts[key] -= 1
+        else:
+            difference.append(issue)
+    return difference
+
+class Session:
+    # Problem edited one allocation at a time. Issues are kept per group and after
+    # a change only groups it may affect are checked again (see IncrementalChecker.affected_groups).
+    def __init__(self, problem: Problem):
+        self.id = uuid.uuid4().hex
+        self.problem = problem
+        self.lock = threading.Lock()
+
+        for allocation in problem.allocations:
+            self.check_references(allocation)
+
+        self.issues = {group_id: problem.check_group(group_id) for group_id in problem.groups}
+        self.remaining = sum(len(issues) for issues in self.issues.values())
+
+    def all_issues(self) -> list[Issue]:
+        return [issue for issues in self.issues.values() for issue in issues]
+
+    def check_references(self, allocation: Allocation) -> None:
+        if allocation.group_id not in self.problem.groups:
+            raise ValueError(f"Allocation refers to group with id={allocation.group_id} which does not exist.")
+        for room_id in allocation.room_ids:
+            if room_id not in self.problem.rooms:
+                raise ValueError(f"Allocation of group with id={allocation.group_id} refers to room with id={room_id} which does not exist.")
+
+    def apply_operation(self, operation: dict) -> set:
+        problem = self.problem
+        if operation["op"] == "remove":
+            group_id = operation["group_id"]
+            old = problem.get_allocation(group_id)
+            if old is None:
+                raise ValueError(f"Group with id={group_id} has no allocation to remove.")
+            affected = problem.get_checker().affected_groups(old)
+            problem.remove_allocation(old)
+            return affected
+
+        allocation = Allocation.from_dict(operation["allocation"], validate=False)
+        self.check_references(allocation)
+        old = problem.get_allocation(allocation.group_id)
+        if operation["op"] == "add" and old is not None:
+            raise ValueError(f"Group with id={allocation.group_id} already has an allocation. Use 'move' to change it.")
+        if operation["op"] == "move" and old is None:
+            raise ValueError(f"Group with id={allocation.group_id} has no allocation to move. Use 'add' to create it.")
+
+        affected = set()
+        if old is not None:
+            affected = problem.get_checker().affected_groups(old)
+            problem.remove_allocation(old)
+        problem.add_allocation(allocation)
+        return affected | problem.get_checker().affected_groups(allocation)
+
+    def apply(self, operations: list[dict]) -> DeltaResponse:
+        # Applies all operations or none of them (if one is invalid)
+        # and returns issues they created and resolved.
+        with self.lock:
+            problem = self.problem
+            marker = problem.snapshot()
+            affected = set()
+            try:
+                for operation in operations:
+                    affected |= self.apply_operation(operation)
+                # clusters may list ids of groups which are not defined
+                issues = {group_id: problem.check_group(group_id) for group_id in affected if group_id in problem.groups}
+            except BaseException:
+                problem.restore(marker)
+                raise
+            # changes are never undone after they were applied
+            del problem.trail[marker:]
+
+            created, resolved = [], []
+            for group_id, new in issues.items():
+                old = self.issues[group_id]
+                created.extend(issue_difference(new, old))
+                resolved.extend(issue_difference(old, new))
+                self.issues[group_id] = new
+                self.remaining += len(new) - len(old)
+            return DeltaResponse(self.id, self.remaining == 0, created, resolved, self.remaining)
+
+class SessionManager:
+    # Keeps at most `max_sessions` sessions; the least recently used ones are forgotten first.
+    def __init__(self, parser: Parser, max_sessions: int = 100):
+        self.parser = parser
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create(self, request: dict) -> DeltaResponse:
+        # Starts a session with a /check request. All its issues are reported as created.
+        problem = self.parser.parse_dict(request, check_request=True).problem
+        session = Session(problem)
+        with self.lock:
+            self.sessions[session.id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return DeltaResponse(session.id, session.remaining == 0, session.all_issues(), [], session.remaining)
+
+    def get(self, session_id: str) -> Session | None:
+        with self.lock:
+            session = self.sessions.get(session_id, None)
+            if session is not None:
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def apply(self, session_id: str, request: dict) -> DeltaResponse | None:
+        session = self.get(session_id)
+        if session is None:
+            return None
+        issues = OPERATIONS_VALIDATOR(request)
+        if issues:
+            raise ValidationError(issues)
+        return session.apply(request["operations"])
+
+    def remove(self, session_id: str) -> bool:
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
@@ -1,22 +1,89 @@
 from src.problem import Problem
-from src.algorithms import random_solve, ordered_groups_solve, rating_function_solve, deep_ordered_groups_solve
+from src.algorithms import random_solve, ordered_groups_solve, rating_function_solve, deep_ordered_groups_solve, backtracking_solve, repair_solve, annealing_solve, lns_solve, exact_solve, rate_solution
 from src.communication import Response, Issue
-import copy
+from src.monitor import Monitor
+from src.propagation import DomainPropagation
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+import os
+import queue
+import random
+import time
 
 ALGORITHMS_AVAILABLE = {
     "probabilistic_alg": random_solve,
     "ordered_groups_alg": ordered_groups_solve,
     "rating_function_alg": rating_function_solve,
-    "deep_ordered_groups_alg": deep_ordered_groups_solve
+    "deep_ordered_groups_alg": deep_ordered_groups_solve,
+    "backtracking_alg": backtracking_solve,
+    "repair_alg": repair_solve,
+    "annealing_alg": annealing_solve,
+    "lns_alg": lns_solve,
+    "exact_alg": exact_solve
 }
 
+# how to choose among several attempts (see Solver.solve)
+SELECT_OPTIONS = ["first", "best"]
+
+# method racing the algorithms below against each other (see Solver.solve_portfolio)
+PORTFOLIO_METHOD = "portfolio"
+PORTFOLIO = ["probabilistic_alg", "ordered_groups_alg", "deep_ordered_groups_alg", "rating_function_alg"]
+
+# Solving runs in threads of the service (see Dispatcher, JobManager); forking a process with
+# other threads holding locks can deadlock the child, so worker processes are started fresh
+MP_CONTEXT = multiprocessing.get_context("forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# most attempts and worker processes one request may ask for (see Solver.solve)
+MAX_RESTARTS = 64
+MAX_WORKERS = os.cpu_count() or 1
+
+# how often (seconds) waiting for worker processes checks if solving was cancelled
+CANCEL_POLL_INTERVAL = 0.1
+
+# Problem shared by all attempts run in one worker process
+_worker_problem = None
+
+def _init_worker(problem: Problem, cancel_event) -> None:
+    # attempts of the worker stop once the parent sets `cancel_event`
+    global _worker_problem
+    _worker_problem = problem
+    _worker_problem.monitor.cancel_event = cancel_event
+
+def _run_attempt_in_worker(method: str, seed: int) -> tuple[Response, float]:
+    random.seed(seed)
+    return Solver.run_attempt(_worker_problem, method)
+
+def _run_portfolio_member(problem: Problem, method: str, results: multiprocessing.Queue) -> None:
+    # every member gets its own independent seed rather than one passed down by the parent
+    random.seed()
+    response, elapsed = Solver.run_attempt(problem, method)
+    results.put((method, response, elapsed))
+
 class Solver:
     problem : Problem
 
     def __init__(self):
         self.problem = None
 
-    def solve(self, problem : Problem, method : str) -> Response:
+    @staticmethod
+    def run_attempt(problem: Problem, method: str) -> tuple[Response, float]:
+        # Runs the algorithm once and returns its response and running time in seconds.
+        # The algorithm works on the problem itself; all bookings it does
+        # are rolled back afterwards, so the problem can be solved again
+        start = time.perf_counter()
+        problem.monitor.start(method, len(problem.groups) - len(problem.allocations))
+        marker = problem.snapshot()
+        try:
+            response = ALGORITHMS_AVAILABLE[method](problem)
+            response.solution = list(response.solution)
+        finally:
+            problem.restore(marker)
+        return response, time.perf_counter() - start
+
+    def solve(self, problem : Problem, method : str, restarts: int = 1, workers: int = 1, select: str = "first", deadline: float = None, monitor: Monitor = None) -> Response:
+        if monitor is not None:
+            problem.monitor = monitor
+
         failed_constraints = problem.precheck()
         if failed_constraints:
             precheck = f"Failed precheck. Given assignments do not satisfy constraints."
@@ -24,16 +91,45 @@ class Solver:
             return Response(False, failed_constraints, [])
         
         self.problem = problem
-        if method not in ALGORITHMS_AVAILABLE:
+        if method not in ALGORITHMS_AVAILABLE and method != PORTFOLIO_METHOD:
             raise ValueError(f"Not a valid method! ({method})")
+        if select not in SELECT_OPTIONS:
+            raise ValueError(f"Not a valid select option! ({select})")
+        if method == PORTFOLIO_METHOD and (restarts > 1 or workers > 1):
+            raise ValueError(f"Portfolio runs each of its algorithms once, in its own process. It cannot be combined with restarts or workers (restarts={restarts}, workers={workers}).")
+        # requests are validated against these limits; others are clamped to them
+        restarts = min(restarts, MAX_RESTARTS)
+        workers = min(workers, MAX_WORKERS)
         
-        response = ALGORITHMS_AVAILABLE[method](copy.deepcopy(problem))
+        # domains are reduced once here and used by every algorithm (and attempt) below
+        propagation = DomainPropagation(problem)
+        issues = propagation.run()
+        if issues:
+            return Response(False, issues, problem.allocations)
+        problem.domains = propagation.domains()
+        try:
+            if method == PORTFOLIO_METHOD:
+                response = self.solve_portfolio(problem, select, deadline)
+            elif restarts <= 1:
+                response, _ = Solver.run_attempt(problem, method)
+            else:
+                response = self.solve_with_restarts(problem, method, restarts, workers, select)
+        finally:
+            problem.domains = {}
+        if propagation.forced:
+            response.stats["forced"] = [
+                {"group_id": g_id, "day": day, "start": start}
+                for g_id, (day, start) in sorted(propagation.forced.items())
+            ]
 
         if not response.success:
             return response
         
+        solution_by_group = {}
+        for r in response.solution:
+            solution_by_group.setdefault(r.group_id, []).append(r)
         for r in problem.allocations:
-            if r not in response.solution:
+            if r not in solution_by_group.get(r.group_id, []):
                 raise RuntimeError(f"Solver has a bug! User established allocations were affected while looking for a solution with method={method}. Please raise an issue.")
         
         problem.allocations = response.solution
@@ -42,3 +138,123 @@ class Solver:
             raise RuntimeError(f"Solver has a bug! Solving with method={method} created solution which does not pass Problem.check. Please raise an issue.")
         
         return response
+
+    def solve_with_restarts(self, problem: Problem, method: str, restarts: int, workers: int, select: str) -> Response:
+        # Runs `restarts` independent randomized attempts, in `workers` processes if workers > 1.
+        # With select="first" the first successful attempt is returned and pending ones are cancelled,
+        # with select="best" all attempts are run and the successful one with the highest rating is returned.
+        # If no attempt succeeds, the one which placed the most groups is returned.
+        attempts = []
+
+        def finished(index: int, response: Response, elapsed: float) -> bool:
+            attempts.append((index, response))
+            response.stats = {"attempt": index, "success": response.success, "time": elapsed}
+            if workers > 1:
+                problem.monitor.attempt_finished(len(response.solution) - len(problem.allocations))
+            return response.success and select == "first"
+
+        if workers <= 1:
+            for index in range(restarts):
+                if problem.monitor.cancelled:
+                    break
+                response, elapsed = Solver.run_attempt(problem, method)
+                if finished(index, response, elapsed):
+                    break
+        else:
+            # attempts still running when the winner is found (or solving is cancelled) are stopped through it
+            cancel_event = MP_CONTEXT.Event()
+            problem.monitor.start(method, len(problem.groups) - len(problem.allocations))
+            executor = ProcessPoolExecutor(max_workers=min(workers, restarts), initializer=_init_worker, initargs=(problem, cancel_event), mp_context=MP_CONTEXT)
+            try:
+                futures = {
+                    executor.submit(_run_attempt_in_worker, method, random.randrange(2**32)): index
+                    for index in range(restarts)
+                }
+                running = set(futures)
+                while running and not problem.monitor.cancelled:
+                    done, running = wait(running, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    if any(finished(futures[f], *f.result()) for f in done):
+                        break
+            finally:
+                cancel_event.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if not attempts:
+            return Response(False, [Issue("solver", 0, "Solving was cancelled")], [])
+
+        successful = [(index, r) for index, r in attempts if r.success]
+        if successful:
+            if select == "best":
+                winner, response = max(successful, key=lambda a: rate_solution(problem, a[1].solution))
+            else:
+                winner, response = successful[0]
+        else:
+            winner, response = max(attempts, key=lambda a: len(a[1].solution))
+
+        response.stats = {
+            "winner": winner,
+            "attempts": [r.stats for _, r in sorted(attempts, key=lambda a: a[0])]
+        }
+        return response
+
+    def solve_portfolio(self, problem: Problem, select: str, deadline: float = None) -> Response:
+        # Runs every algorithm from PORTFOLIO in its own process.
+        # With select="first" the first successful algorithm wins and the others are terminated,
+        # with select="best" the successful solution with the highest rating wins.
+        # Algorithms still running after `deadline` seconds are terminated.
+        results = MP_CONTEXT.Queue()
+        processes = {
+            method: MP_CONTEXT.Process(target=_run_portfolio_member, args=(problem, method, results), daemon=True)
+            for method in PORTFOLIO
+        }
+        start = time.perf_counter()
+        problem.monitor.start(PORTFOLIO_METHOD, len(problem.groups) - len(problem.allocations))
+        for process in processes.values():
+            process.start()
+
+        finished = {}
+        try:
+            while len(finished) < len(processes) and not problem.monitor.cancelled:
+                timeout = CANCEL_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = deadline - (time.perf_counter() - start)
+                    if remaining <= 0:
+                        break
+                    timeout = min(timeout, remaining)
+                try:
+                    method, response, elapsed = results.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                finished[method] = (response, elapsed)
+                problem.monitor.attempt_finished(len(response.solution) - len(problem.allocations))
+                if response.success and select == "first":
+                    break
+        finally:
+            stopped_at = time.perf_counter() - start
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        members = []
+        for method in PORTFOLIO:
+            if method in finished:
+                members.append({"algorithm": method, "success": finished[method][0].success, "time": finished[method][1]})
+            else:
+                members.append({"algorithm": method, "success": None, "time": stopped_at})
+
+        successful = [(method, r) for method, (r, _) in finished.items() if r.success]
+        if successful:
+            if select == "best":
+                winner, response = max(successful, key=lambda m: rate_solution(problem, m[1].solution))
+            else:
+                winner, response = successful[0]
+        elif finished:
+            winner, response = max(((method, r) for method, (r, _) in finished.items()), key=lambda m: len(m[1].solution))
+        elif problem.monitor.cancelled:
+            winner, response = None, Response(False, [Issue("solver", 0, "Solving was cancelled")], [])
+        else:
+            winner, response = None, Response(False, [Issue("solver", 0, f"No algorithm finished within the deadline of {deadline} seconds")], [])
+
+        response.stats = {"winner": winner, "members": members}
+        return response
@@ -0,0 +1,295 @@
+from src.models import Group, DAYS
+from src.communication import Issue
+
+# Declarative description of requests (see docs/request_fields.md).
+# A schema is a dict with "type" being one of:
+#   "any", "int", "number", "str", - scalars ("id" being an integer or a string);
+#   "id"                             "min" / "max" / "exclusive_min" bound numbers,
+#                                    "enum" lists allowed values, "nullable" allows null
+#   "list"                         - "items" schema, optional "min_items" and "unique_by" (field of items)
+#   "dict"                         - "keys" (allowed keys) and "values" schema
+#   "object"                       - "name", "fields" (field -> schema), "required" fields,
+#                                    "id" field used in issues and "checks" run on valid objects
+# compile_schema turns it into a function returning the list of all Issues found in a value.
+
+def non_negative_int() -> dict:
+    return {"type": "int", "min": 0}
+
+def positive_int() -> dict:
+    return {"type": "int", "min": 1}
+
+def list_of(items: dict, **options) -> dict:
+    return {"type": "list", "items": items, **options}
+
+AVAILABILITY_SCHEMA = {"type": "dict", "keys": [str(day) for day in DAYS], "values": list_of(non_negative_int())}
+
+def group_has_teacher(group: dict) -> list[tuple[tuple, str]]:
+    if Group.THROW_IF_NO_TEACHER and not group.get("teacher_ids", []):
+        return [(("teacher_ids",), f"Group has to have at least one teacher assigned. The group with id {group.get('id')} has no teachers.")]
+    return []
+
+TEACHER_SCHEMA = {
+    "type": "object",
+    "name": "teacher",
+    "id": "id",
+    "required": ["id", "availability"],
+    "fields": {
+        "id": {"type": "any"},
+        "availability": AVAILABILITY_SCHEMA
+    }
+}
+
+ROOM_SCHEMA = {
+    "type": "object",
+    "name": "room",
+    "id": "id",
+    "required": ["id", "capacity", "availability", "labels"],
+    "fields": {
+        "id": {"type": "any"},
+        "capacity": {"type": "int"},
+        "availability": AVAILABILITY_SCHEMA,
+        "labels": list_of({"type": "str"})
+    }
+}
+
+GROUP_SCHEMA = {
+    "type": "object",
+    "name": "group",
+    "id": "id",
+    "required": ["id", "duration", "capacity", "availability"],
+    "fields": {
+        "id": {"type": "any"},
+        "duration": positive_int(),
+        "capacity": {"type": "int"},
+        "availability": AVAILABILITY_SCHEMA,
+        # one DNF formula of labels per room
+        "labels": list_of(list_of(list_of({"type": "str"}, min_items=1), min_items=1)),
+        "teacher_ids": list_of({"type": "any"}),
+        "occurrence_desc": list_of({"type": "int"})
+    },
+    "checks": [group_has_teacher]
+}
+
+CLUSTER_SCHEMA = {
+    "type": "object",
+    "name": "cluster",
+    "id": "id",
+    "required": ["id", "range", "group_ids"],
+    "fields": {
+        "id": {"type": "int"},
+        "range": list_of(positive_int()),
+        "group_ids": list_of({"type": "int"})
+    }
+}
+
+ALLOCATION_SCHEMA = {
+    "type": "object",
+    "name": "allocation",
+    "id": "group_id",
+    "required": ["group_id", "room_ids", "day", "slots"],
+    "fields": {
+        "group_id": {"type": "id"},
+        "room_ids": list_of({"type": "id"}),
+        "day": {"type": "int", "enum": DAYS},
+        "slots": list_of(non_negative_int(), min_items=1)
+    }
+}
+
+def request_schema(methods: list[str], schedule_options: dict) -> dict:
+    # `methods` allowed for the endpoint, `schedule_options` are extra fields accepted by it
+    return {
+        "type": "object",
+        "name": "parser",
+        "fields": {
+            "method": {"type": "str", "enum": methods, "nullable": True},
+            **schedule_options,
+            "teachers": list_of(TEACHER_SCHEMA, unique_by="id"),
+            "rooms": list_of(ROOM_SCHEMA, unique_by="id"),
+            "groups": list_of(GROUP_SCHEMA, unique_by="id"),
+            "clusters": list_of(CLUSTER_SCHEMA, unique_by="id"),
+            "allocations": list_of(ALLOCATION_SCHEMA)
+        }
+    }
+
+class ValidationError(ValueError):
+    # all issues found in a request at once
+    def __init__(self, issues: list[Issue]):
+        self.issues = issues
+        super().__init__("\n".join(f"{issue.path}: {issue.msg}" for issue in issues))
+
+def json_path(parts: tuple) -> str:
+    path = "$"
+    for part in parts:
+        if isinstance(part, int):
+            path += f"[{part}]"
+        elif part.isidentifier():
+            path += f".{part}"
+        else:
+            path += f"['{part}']"
+    return path
+
+def compile_schema(schema: dict):
+    check = compile_node(schema)
+
+    def validate(value) -> list[Issue]:
+        # errors are (path, message, type, id); type and id come from the innermost object
+        return [
+            Issue(type or "parser", id if id is not None else 0, msg, json_path(path))
+            for path, msg, type, id in check(value)
+        ]
+    return validate
+
+# Every compiled node returns a list of errors (path, message, type, id) with paths relative to the
+# node. Valid values, the common case, return NO_ERRORS without building any paths or messages.
+NO_ERRORS = ()
+
+def error(value, expected: str) -> list[tuple]:
+    return [((), f"Must be {expected}. Sent '{value}'.", None, None)]
+
+def compile_node(schema: dict):
+    kind = schema["type"]
+    if kind == "list":
+        return compile_list(schema)
+    if kind == "dict":
+        return compile_dict(schema)
+    if kind == "object":
+        return compile_object(schema)
+
+    accepts, expected = compile_scalar(schema)
+    def check(value):
+        if accepts(value):
+            return NO_ERRORS
+        return error(value, expected)
+    return check
+
+def compile_scalar(schema: dict):
+    # returns a predicate and a description of accepted values
+    kind = schema["type"]
+    nullable = schema.get("nullable", False)
+    if kind == "any":
+        return (lambda value: True), "anything"
+
+    types = {"int": (int,), "number": (int, float), "str": (str,), "id": (int, str)}[kind]
+    expected = {"int": "an integer", "number": "a number", "str": "a string", "id": "an integer or a string"}[kind]
+    conditions = []
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+        conditions.append(lambda value: value in allowed)
+        expected = "one of: " + ", ".join(f"'{a}'" for a in schema["enum"])
+    if "min" in schema:
+        low = schema["min"]
+        conditions.append(lambda value: value >= low)
+        expected += " " + {0: "not less than 0", 1: "greater than 0"}.get(low, f"not less than {low}")
+    if "max" in schema:
+        high = schema["max"]
+        conditions.append(lambda value: value <= high)
+        expected += f" not greater than {high}"
+    if "exclusive_min" in schema:
+        low = schema["exclusive_min"]
+        conditions.append(lambda value: value > low)
+        expected += f" greater than {low}"
+
+    def accepts(value) -> bool:
+        if value is None:
+            return nullable
+        # type() rather than isinstance() so that booleans are not taken for integers
+        return type(value) in types and all(condition(value) for condition in conditions)
+    return accepts, expected
+
+def compile_list(schema: dict):
+    items = schema["items"]
+    min_items = schema.get("min_items", 0)
+    unique_by = schema.get("unique_by", None)
+    check_item = compile_node(items)
+    bulk = compile_bulk(items)
+
+    def check(value):
+        if type(value) is not list:
+            return error(value, "a list")
+        errors = []
+        if len(value) < min_items:
+            errors.extend(error(value, f"a list of at least {min_items} element(s)"))
+        if bulk is None or not bulk(value):
+            for index, item in enumerate(value):
+                for path, msg, type_, id in check_item(item):
+                    errors.append(((index,) + path, msg, type_, id))
+        if unique_by is not None and not errors:
+            errors.extend(check_unique(value, unique_by))
+        return errors or NO_ERRORS
+    return check
+
+def compile_bulk(items: dict):
+    # Checks whole lists of scalars at once (the usual case being slots);
+    # element-wise checks only run to locate the errors when it fails.
+    kind = items["type"]
+    if kind == "any":
+        return lambda values: True
+    if kind == "int" and set(items) <= {"type", "min"}:
+        low = items.get("min", None)
+        def bulk(values: list) -> bool:
+            if not values:
+                return True
+            if set(map(type, values)) != {int}:
+                return False
+            return low is None or min(values) >= low
+        return bulk
+    if kind == "str" and set(items) == {"type"}:
+        return lambda values: not values or set(map(type, values)) == {str}
+    return None
+
+def check_unique(value: list, field: str) -> list[tuple]:
+    seen = set()
+    errors = []
+    for index, item in enumerate(value):
+        key = item.get(field, None)
+        try:
+            if key in seen:
+                errors.append(((index, field), f"Ids must be unique. Id '{key}' repeats.", None, key))
+            seen.add(key)
+        except TypeError:
+            errors.append(((index, field), f"Must be an integer or a string. Sent '{key}'.", None, None))
+    return errors
+
+def compile_dict(schema: dict):
+    allowed = set(schema["keys"])
+    allowed_str = ", ".join(f"'{a}'" for a in schema["keys"])
+    check_value = compile_node(schema["values"])
+
+    def check(value):
+        if type(value) is not dict:
+            return error(value, "an object")
+        errors = []
+        for key, item in value.items():
+            if key not in allowed:
+                errors.append(((key,), f"Invalid key '{key}'. Each key must be one of: {allowed_str}.", None, None))
+                continue
+            for path, msg, type_, id in check_value(item):
+                errors.append(((key,) + path, msg, type_, id))
+        return errors or NO_ERRORS
+    return check
+
+def compile_object(schema: dict):
+    name = schema["name"]
+    id_field = schema.get("id", None)
+    required = schema.get("required", [])
+    fields = [(field, compile_node(node)) for field, node in schema["fields"].items()]
+    checks = schema.get("checks", [])
+
+    def check(value):
+        if type(value) is not dict:
+            return error(value, "an object")
+        id = value.get(id_field, None) if id_field is not None else None
+        errors = []
+        for field in required:
+            if field not in value:
+                errors.append(((field,), f"{name.capitalize()} is missing required field '{field}'.", name, id))
+        for field, check_field in fields:
+            if field in value:
+                for path, msg, type_, inner_id in check_field(value[field]):
+                    errors.append(((field,) + path, msg, type_ or name, inner_id if type_ else id))
+        if not errors:
+            for extra_check in checks:
+                for path, msg in extra_check(value):
+                    errors.append((path, msg, name, id))
+        return errors or NO_ERRORS
+    return check
@@ -0,0 +1,73 @@
+from src.algorithms.annealing_solve import Annealing
+from src.algorithms.rating_function_solve import ScheduleRating, rate_solution
+from src.algorithms.utils import get_all_placements_for_group
+from src import Parser, Problem, Solver
+from src.models import Group, Teacher, Room, Availability, Allocation
+from collections import Counter
+import unittest
+import random
+import os
+
+class TestAnnealing(unittest.TestCase):
+    def make_problem(self) -> Problem:
+        problem = Problem()
+        days = {day: list(range(8, 18)) for day in [1, 2, 3, 4, 5]}
+        problem.add_teacher(Teacher(1, Availability(days)))
+        problem.add_room(Room(101, 35, Availability(days), ["lab"]))
+        problem.add_room(Room(102, 60, Availability(days), ["lab"]))
+        for g_id in [1, 2, 3]:
+            problem.add_group(Group(g_id, 2, 30, Availability(days), [[["lab"]]], [1], []))
+        return problem
+
+    def test_teacher_rating(self):
+        # 3 classes, two of them on tuesday, none on friday
+        self.assertEqual(ScheduleRating.teacher_rating(Counter({1: 1, 2: 2})), 2 * 2 + 2 * 3)
+
+    def test_change_should_agree_with_rating_from_scratch(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, "big_problem.json"), "r") as f:
+            problem = Parser().parse(f.read()).problem
+        random.seed(0)
+        groups = list(problem.groups.values())[:20]
+        allocations = {g.id: random.choice(get_all_placements_for_group(g, problem)) for g in groups}
+        rating = ScheduleRating(problem, list(allocations.values()))
+
+        for _ in range(50):
+            g = random.choice(groups)
+            new = random.choice(get_all_placements_for_group(g, problem))
+            rating.change([(allocations[g.id], new)])
+            allocations[g.id] = new
+            self.assertEqual(rating.total, ScheduleRating(problem, list(allocations.values())).total)
+
+    def test_solutions_should_be_ranked_by_schedule_rating(self):
+        problem = self.make_problem()
+        solution = [Allocation(g_id, [101], g_id, [10, 11]) for g_id in [1, 2, 3]]
+
+        self.assertEqual(rate_solution(problem, solution), ScheduleRating(problem, solution).total)
+        # unlike a sum of rating_function, it does not depend on the order of allocations
+        self.assertEqual(rate_solution(problem, solution), rate_solution(problem, solution[::-1]))
+
+    def test_should_not_lower_rating_of_starting_solution(self):
+        random.seed(1)
+        problem = self.make_problem()
+        placements = {g.id: get_all_placements_for_group(g, problem) for g in problem.groups.values()}
+        # odd starts, early, all on monday in the bigger room
+        solution = [Allocation(g_id, [102], 1, [2 * g_id + 7, 2 * g_id + 8]) for g_id in [1, 2, 3]]
+        start = ScheduleRating(problem, solution).total
+
+        annealing = Annealing(problem, placements, solution)
+        annealing.run(300, 10.0)
+
+        self.assertGreater(annealing.best_rating, start)
+        self.assertEqual(annealing.best_rating, ScheduleRating(problem, list(annealing.best.values())).total)
+
+    def test_solution_should_pass_check(self):
+        random.seed(2)
+        problem = self.make_problem()
+
+        # Solver rejects solutions which do not pass Problem.check
+        result = Solver().solve(problem, "annealing_alg")
+
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.solution), 3)
+        self.assertEqual(problem.check(), [])
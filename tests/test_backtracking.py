@@ -0,0 +1,34 @@
+from src.algorithms.backtracking_solve import backtracking_solve, BacktrackingSearch, SOLVED, INFEASIBLE
+from src import Problem
+from src.models import Group, Teacher, Availability
+import unittest
+
+class TestBacktracking(unittest.TestCase):
+    def make_problem(self, durations: list[int]) -> Problem:
+        # groups of one teacher who is available in slots 10-13 only
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        for g_id, duration in enumerate(durations, start=1):
+            problem.add_group(Group(g_id, duration, 30, Availability({1: [10, 11, 12, 13]}), [], [1], []))
+        return problem
+
+    def test_should_report_group_which_cannot_be_placed(self):
+        problem = self.make_problem([2, 2, 1])
+        search = BacktrackingSearch(problem, list(problem.groups.values()))
+
+        self.assertEqual(search.run(), INFEASIBLE)
+        self.assertIn(search.failed_group.id, [1, 2, 3])
+        self.assertEqual(problem.allocations, [])
+
+        result = backtracking_solve(self.make_problem([2, 2, 1]))
+        self.assertFalse(result.success)
+        self.assertEqual(result.errors[0]["type"], "group")
+        self.assertIn("whatever placements of other groups", result.errors[0]["msg:"])
+
+    def test_should_stop_when_out_of_nodes(self):
+        problem = self.make_problem([2, 2])
+
+        result = backtracking_solve(problem, max_nodes=0)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.errors[0]["type"], "solver")
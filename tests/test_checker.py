@@ -0,0 +1,82 @@
+from src.checker import IncrementalChecker
+from src import Parser, Problem
+from src.models import Group, Teacher, Availability, Room, Cluster, Allocation
+import random
+import unittest
+import os
+
+def issue_keys(issues):
+    return sorted((issue.type, issue.id, issue.msg) for issue in issues)
+
+class TestIncrementalChecker(unittest.TestCase):
+    def make_problem(self) -> Problem:
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [8, 9, 10, 11]})))
+        problem.add_room(Room(101, 30, Availability({1: [8, 9, 10, 11]}), ["lab"]))
+        problem.add_group(Group(1, 2, 20, Availability({1: [8, 9, 10, 11]}), [[["lab"]]], [1], []))
+        problem.add_group(Group(2, 2, 20, Availability({1: [8, 9, 10, 11]}), [[["lab"]]], [1], []))
+        problem.add_group(Group(3, 2, 20, Availability({1: [8, 9, 10, 11]}), [[["lab"]]], [1], [1]))
+        return problem
+
+    def test_conflicts_follow_add_and_remove(self):
+        problem = self.make_problem()
+        checker = IncrementalChecker(problem)
+        a1 = Allocation(1, [101], 1, [8, 9])
+        a2 = Allocation(2, [101], 1, [9, 10])
+
+        checker.add(a1)
+        checker.add(a2)
+        self.assertEqual(issue_keys(checker.check_group(1)), [
+            ("room", 101, "At least two groups (id=1, id=2) use room with id=101 at the same time on 1 in slots [8, 9]"),
+            ("teacher", 1, "Teacher with id=1 has conflicting classes on 1")
+        ])
+        self.assertEqual(checker.affected_groups(a1), {1, 2})
+
+        checker.remove(a2)
+        self.assertEqual(checker.check_group(1), [])
+        self.assertEqual(checker.get_allocation(2), None)
+
+    def test_cluster_state_is_recomputed_after_change(self):
+        problem = self.make_problem()
+        problem.add_cluster(Cluster(7, [], [1, 3]))
+        checker = IncrementalChecker(problem)
+        a1 = Allocation(1, [], 1, [8, 9])
+        a3 = Allocation(3, [], 1, [9, 10])
+
+        checker.add(a1)
+        checker.add(a3)
+        self.assertEqual([issue.type for issue in checker.check_cluster_constraints(a1, problem.groups[1])], ["cluster"])
+        self.assertFalse(checker.cluster_satisfied[7])
+        self.assertEqual(checker.affected_groups(a1), {1, 3})
+
+        checker.remove(a3)
+        self.assertNotIn(7, checker.cluster_satisfied)
+        self.assertEqual(checker.check_cluster_constraints(a1, problem.groups[1]), [])
+
+    def test_incremental_updates_match_fresh_checker(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, "big_problem.json"), "r") as f:
+            problem = Parser().parse(f.read()).problem
+        rng = random.Random(5)
+        checker = IncrementalChecker(problem)
+        room_ids = list(problem.rooms)
+
+        for _ in range(60):
+            group = rng.choice(list(problem.groups.values()))
+            old = checker.get_allocation(group.id)
+            if old is not None and rng.random() < 0.3:
+                problem.remove_allocation(old)
+                checker.remove(old)
+                continue
+            start = rng.randrange(8, 16)
+            allocation = Allocation(group.id, rng.sample(room_ids, len(group.labels)), rng.randrange(1, 6), list(range(start, start + group.duration)))
+            if old is not None:
+                problem.remove_allocation(old)
+                checker.remove(old)
+            problem.add_allocation(allocation)
+            checker.add(allocation)
+
+        fresh = IncrementalChecker(problem)
+        self.assertEqual(issue_keys(checker.check(True)), issue_keys(fresh.check(True)))
+        for group_id in problem.groups:
+            self.assertEqual(issue_keys(checker.check_group(group_id)), issue_keys(fresh.check_group(group_id)))
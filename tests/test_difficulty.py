@@ -0,0 +1,73 @@
+from src.algorithms.difficulty import DifficultyTracker
+from src.algorithms.utils import number_of_possible_placements, sample_placement
+from src import Parser, Problem
+from src.models import Group, Teacher, Availability, Room, Cluster, Allocation
+import unittest
+import os
+
+class TestDifficultyTracker(unittest.TestCase):
+    def test_pop_should_return_groups_with_least_placements_first(self):
+        problem = Problem()
+        g1 = Group(1,1,30,Availability({1:[10,11,12,13]}), [], [2], [])
+        g2 = Group(2,1,30,Availability({1:[10]}), [], [3], [])
+        g3 = Group(3,1,30,Availability({1:[10,11]}), [], [4], [])
+        for g in [g1, g2, g3]:
+            problem.add_group(g)
+        for t_id in [2, 3, 4]:
+            problem.add_teacher(Teacher(t_id, Availability({1:[10,11,12,13]})))
+
+        tracker = DifficultyTracker(problem, [g1, g2, g3])
+
+        self.assertEqual([tracker.pop().id for _ in range(3)], [2, 3, 1])
+        self.assertIsNone(tracker.pop())
+
+    def test_cluster_members_should_share_lowest_difficulty(self):
+        problem = Problem()
+        g1 = Group(1,1,30,Availability({1:[10,11,12,13]}), [], [2], [])
+        g2 = Group(2,1,30,Availability({1:[10,11]}), [], [3], [])
+        g3 = Group(3,1,30,Availability({1:[10]}), [], [4], [])
+        for g in [g1, g2, g3]:
+            problem.add_group(g)
+        for t_id in [2, 3, 4]:
+            problem.add_teacher(Teacher(t_id, Availability({1:[10,11,12,13]})))
+        problem.add_cluster(Cluster(1, [], [1, 3]))
+
+        tracker = DifficultyTracker(problem, [g1, g2, g3])
+
+        self.assertEqual(tracker.difficulty(1), 1)
+        self.assertEqual([tracker.pop().id for _ in range(3)], [1, 3, 2])
+
+    def test_booked_should_update_groups_sharing_teacher(self):
+        problem = Problem()
+        g1 = Group(1,1,30,Availability({1:[10,11,12]}), [], [2], [])
+        g2 = Group(2,1,30,Availability({1:[10,11,12]}), [], [2], [])
+        g3 = Group(3,1,30,Availability({1:[10]}), [], [3], [])
+        for g in [g1, g2, g3]:
+            problem.add_group(g)
+        problem.add_teacher(Teacher(2, Availability({1:[10,11,12]})))
+        problem.add_teacher(Teacher(3, Availability({1:[10,11,12]})))
+
+        tracker = DifficultyTracker(problem, [g1, g2, g3])
+        self.assertEqual(tracker.pop().id, 3)
+        tracker.pop()
+        allocation = Allocation(1, [], 1, [10])
+        problem.add_allocation_and_update_availability(allocation)
+        tracker.booked(allocation)
+
+        self.assertEqual(tracker.counts[2], 2)
+
+    def test_incremental_counts_should_match_full_recount(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, "big_problem.json"), "r") as f:
+            problem = Parser().parse(f.read()).problem
+
+        tracker = DifficultyTracker(problem, list(problem.groups.values()))
+        for _ in range(15):
+            g = tracker.pop()
+            allocation = sample_placement(g, problem)
+            if allocation is None or not problem.add_allocation_and_update_availability(allocation):
+                break
+            tracker.booked(allocation)
+
+            for g_id, count in tracker.counts.items():
+                self.assertEqual(count, number_of_possible_placements(problem.groups[g_id], problem))
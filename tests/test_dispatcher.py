@@ -0,0 +1,88 @@
+from src import Dispatcher, Response, Monitor
+import asyncio
+import threading
+import unittest
+
+def succeed(value):
+    return Response(True, [], [value])
+
+def wait_for_event(event):
+    event.wait(5)
+    return Response(True, [], [])
+
+def wait_for_cancel(monitor):
+    monitor.cancel_event.wait(5)
+    return Response(False, [], [])
+
+class TestDispatcher(unittest.TestCase):
+    def test_run_returns_function_result(self):
+        dispatcher = Dispatcher(max_workers=2)
+
+        response = asyncio.run(dispatcher.run(succeed, 7))
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.solution, [7])
+        self.assertEqual(dispatcher.pending, 0)
+        dispatcher.shutdown()
+
+    def test_run_over_queue_limit_returns_busy(self):
+        dispatcher = Dispatcher(max_workers=1, max_queue=1)
+        event = threading.Event()
+
+        async def scenario():
+            first = asyncio.ensure_future(dispatcher.run(wait_for_event, event))
+            second = asyncio.ensure_future(dispatcher.run(wait_for_event, event))
+            await asyncio.sleep(0.05)
+            third = await dispatcher.run(succeed, 1)
+            event.set()
+            return third, await first, await second
+
+        third, first, second = asyncio.run(scenario())
+
+        self.assertFalse(third.success)
+        self.assertEqual(third.errors[0]["type"], "busy")
+        self.assertTrue(first.success)
+        self.assertTrue(second.success)
+        dispatcher.shutdown()
+
+    def test_run_too_long_returns_timeout_and_keeps_slot_until_done(self):
+        dispatcher = Dispatcher(max_workers=1, timeout=0.05)
+        event = threading.Event()
+
+        async def scenario():
+            response = await dispatcher.run(wait_for_event, event)
+            pending = dispatcher.pending
+            event.set()
+            await asyncio.sleep(0.1)
+            return response, pending
+
+        response, pending = asyncio.run(scenario())
+
+        self.assertFalse(response.success)
+        self.assertEqual(response.errors[0]["type"], "timeout")
+        self.assertEqual(pending, 1)
+        self.assertEqual(dispatcher.pending, 0)
+        dispatcher.shutdown()
+
+    def test_run_too_long_cancels_monitor_and_frees_slot(self):
+        dispatcher = Dispatcher(max_workers=1, timeout=0.05)
+        monitor = Monitor()
+
+        async def scenario():
+            response = await dispatcher.run(wait_for_cancel, monitor, monitor=monitor)
+            await asyncio.sleep(0.1)
+            return response, await dispatcher.run(succeed, 1)
+
+        response, next_response = asyncio.run(scenario())
+
+        self.assertEqual(response.errors[0]["type"], "timeout")
+        self.assertTrue(monitor.cancelled)
+        self.assertEqual(dispatcher.pending, 0)
+        self.assertTrue(next_response.success)
+        dispatcher.shutdown()
+
+    def test_bad_executor_kind_throws(self):
+        with self.assertRaises(ValueError) as err:
+            Dispatcher(executor="fiber")
+
+        self.assertIn("fiber", str(err.exception))
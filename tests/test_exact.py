@@ -0,0 +1,91 @@
+from src.algorithms.exact_solve import exact_solve
+from src.algorithms.sat import SatSolver
+from src import Problem, Solver
+from src.models import Group, Teacher, Room, Availability, Cluster
+import unittest
+import random
+
+class TestSatSolver(unittest.TestCase):
+    def test_should_find_model(self):
+        solver = SatSolver()
+        a, b, c = solver.new_var(), solver.new_var(), solver.new_var()
+        solver.add_clause([a, b])
+        solver.add_clause([-a, c])
+        solver.add_clause([-c])
+
+        self.assertTrue(solver.solve())
+        self.assertEqual(solver.model, {b})
+
+    def test_should_prove_pigeonhole_unsatisfiable(self):
+        # 3 pigeons, 2 holes
+        solver = SatSolver()
+        holes = [[solver.new_var() for _ in range(2)] for _ in range(3)]
+        for pigeon in holes:
+            solver.add_clause(pigeon)
+        for hole in range(2):
+            solver.add_at_most_one([pigeon[hole] for pigeon in holes])
+
+        self.assertFalse(solver.solve())
+
+    def test_should_return_assumptions_which_cannot_hold(self):
+        solver = SatSolver()
+        a, b, c = solver.new_var(), solver.new_var(), solver.new_var()
+        solver.add_at_most_one([a, b])
+
+        self.assertFalse(solver.solve([c, a, b]))
+        self.assertEqual(sorted(solver.core()), sorted([a, b]))
+        # assumptions are not kept between calls
+        self.assertTrue(solver.solve([c, a]))
+        self.assertEqual(solver.model, {a, c})
+
+class TestExact(unittest.TestCase):
+    def test_should_report_minimal_set_of_conflicting_groups(self):
+        # groups 1-3 take five slots of teacher 1, who has four;
+        # group 4 of another teacher can be placed whatever the others do
+        problem = Problem()
+        for t_id in [1, 2]:
+            problem.add_teacher(Teacher(t_id, Availability({1: [10, 11, 12, 13]})))
+        for g_id, duration, t_id in [(1, 2, 1), (2, 2, 1), (3, 1, 1), (4, 1, 2)]:
+            problem.add_group(Group(g_id, duration, 30, Availability({1: [10, 11, 12, 13]}), [], [t_id], []))
+
+        result = exact_solve(problem, native=False)
+
+        self.assertFalse(result.success)
+        self.assertEqual(sorted(e["id"] for e in result.errors), [1, 2, 3])
+        self.assertIn("ids=[1, 2, 3] cannot all be placed", result.errors[0]["msg:"])
+        self.assertNotIn("may not be minimal", result.errors[0]["msg:"])
+
+    def test_should_share_slots_between_groups_of_different_periods(self):
+        def make_problem(periods: list[int]) -> Problem:
+            problem = Problem()
+            problem.add_teacher(Teacher(1, Availability({1: [10]})))
+            problem.add_room(Room(101, 50, Availability({1: [10]}), ["lab"]))
+            problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [[["lab"]]], [1], [1, 3]))
+            problem.add_group(Group(2, 1, 30, Availability({1: [10]}), [[["lab"]]], [1], periods))
+            return problem
+
+        result = Solver().solve(make_problem([2, 4]), "exact_alg")
+        self.assertTrue(result.success)
+
+        result = exact_solve(make_problem([3, 4]), native=False)
+        self.assertFalse(result.success)
+        self.assertEqual(sorted(e["id"] for e in result.errors), [1, 2])
+
+    def test_should_place_groups_of_cluster_in_its_blocks(self):
+        for seed in range(5):
+            random.seed(seed)
+            problem = Problem()
+            days = {1: list(range(8, 18)), 2: list(range(8, 18))}
+            for t_id in [1, 2, 3]:
+                problem.add_teacher(Teacher(t_id, Availability(days)))
+                problem.add_group(Group(t_id, 2, 30, Availability(days), [], [t_id], []))
+            # one block of 4 slots: groups take place in parallel or one after another
+            problem.add_cluster(Cluster(1, [4], [1, 2, 3]))
+
+            # Solver checks the solution
+            result = Solver().solve(problem, "exact_alg")
+
+            self.assertTrue(result.success)
+            self.assertEqual(len({a.day for a in result.solution}), 1)
+            starts = [a.slots[0] for a in result.solution]
+            self.assertLessEqual(max(starts) - min(starts), 2)
@@ -0,0 +1,120 @@
+from src import JobManager, JobStore, InMemoryJobStore, Response
+from src.communication import Issue
+import threading
+import time
+import unittest
+
+def wait_until_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def place_until_cancelled(request, monitor):
+    # stands in for a solver: places groups until cancelled
+    monitor.start("test_alg", request["groups"])
+    while not monitor.cancelled:
+        if monitor.groups_placed < request["groups"]:
+            monitor.placed()
+        time.sleep(0.01)
+    return Response(False, [Issue("solver", 0, "Solving was cancelled")], [])
+
+class TestJobManager(unittest.TestCase):
+    def test_submit_returns_result(self):
+        manager = JobManager(lambda request, monitor: Response(True, [], [request["value"]]))
+
+        job = manager.submit({"value": 7})
+        wait_until_finished(job)
+
+        self.assertEqual(manager.get(job.id), job)
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.result.solution, [7])
+        self.assertIsNotNone(job.finished_at)
+        manager.shutdown()
+
+    def test_progress_and_cancel(self):
+        manager = JobManager(place_until_cancelled)
+
+        job = manager.submit({"groups": 3})
+        deadline = time.monotonic() + 5
+        while job.monitor.groups_placed < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        status = job.to_dict()
+        self.assertEqual(status["status"], "running")
+        self.assertEqual(status["progress"]["algorithm"], "test_alg")
+        self.assertEqual(status["progress"]["groups_placed"], 3)
+
+        manager.cancel(job.id)
+        wait_until_finished(job)
+
+        self.assertEqual(job.status, "cancelled")
+        self.assertFalse(job.result.success)
+        manager.shutdown()
+
+    def test_cancel_queued_job(self):
+        event = threading.Event()
+        manager = JobManager(lambda request, monitor: Response(event.wait(5), [], []), max_workers=1)
+
+        running = manager.submit({})
+        queued = manager.submit({})
+        manager.cancel(queued.id)
+        event.set()
+        wait_until_finished(running)
+        wait_until_finished(queued)
+
+        self.assertEqual(running.status, "done")
+        self.assertEqual(queued.status, "cancelled")
+        self.assertIsNone(queued.result)
+        manager.shutdown()
+
+    def test_rejects_jobs_over_queue_limit(self):
+        event = threading.Event()
+        manager = JobManager(lambda request, monitor: Response(event.wait(5), [], []), max_workers=1, max_queue=1)
+
+        running = manager.submit({})
+        queued = manager.submit({})
+
+        self.assertIsNone(manager.submit({}))
+        event.set()
+        wait_until_finished(running)
+        wait_until_finished(queued)
+        self.assertIsNotNone(manager.submit({}))
+        manager.shutdown()
+
+    def test_failed_job(self):
+        def fail(request, monitor):
+            raise RuntimeError("broken")
+        manager = JobManager(fail)
+
+        job = manager.submit({})
+        wait_until_finished(job)
+
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "broken")
+        manager.shutdown()
+
+    def test_unknown_job(self):
+        manager = JobManager(lambda request, monitor: Response(True, [], []))
+
+        self.assertIsNone(manager.get("missing"))
+        self.assertIsNone(manager.cancel("missing"))
+        manager.shutdown()
+
+class TestInMemoryJobStore(unittest.TestCase):
+    def test_job_store_is_abstract(self):
+        with self.assertRaises(TypeError):
+            JobStore()
+
+
+    def test_evicts_oldest_finished_jobs(self):
+        manager = JobManager(lambda request, monitor: Response(True, [], []), store=InMemoryJobStore(max_finished=1))
+
+        first = manager.submit({})
+        wait_until_finished(first)
+        second = manager.submit({})
+        wait_until_finished(second)
+        third = manager.submit({})
+        wait_until_finished(third)
+
+        self.assertIsNone(manager.get(first.id))
+        manager.shutdown()
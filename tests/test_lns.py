@@ -0,0 +1,42 @@
+from src.algorithms.lns_solve import lns_solve, NeighbourhoodSearch
+from src.algorithms.annealing_solve import ScheduleRating
+from src.algorithms.utils import get_all_placements_for_group
+from src import Problem
+from src.models import Group, Teacher, Room, Availability, Allocation
+import unittest
+import random
+
+class TestLNS(unittest.TestCase):
+    def test_should_report_groups_which_were_not_placed(self):
+        # five slots of groups, four slots of their teacher
+        random.seed(0)
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        for g_id, duration in [(1, 2), (2, 2), (3, 1)]:
+            problem.add_group(Group(g_id, duration, 30, Availability({1: [10, 11, 12, 13]}), [], [1], []))
+
+        result = lns_solve(problem, max_iterations=20)
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.errors[0]["type"], "group")
+        self.assertIn("in 20 neighbourhoods", result.errors[0]["msg:"])
+
+    def test_should_not_lower_rating_of_starting_solution(self):
+        random.seed(1)
+        problem = Problem()
+        days = {day: list(range(8, 18)) for day in [1, 2, 3, 4, 5]}
+        problem.add_teacher(Teacher(1, Availability(days)))
+        problem.add_room(Room(101, 35, Availability(days), ["lab"]))
+        for g_id in [1, 2, 3]:
+            problem.add_group(Group(g_id, 2, 30, Availability(days), [[["lab"]]], [1], []))
+        groups = list(problem.groups.values())
+        placements = {g.id: get_all_placements_for_group(g, problem) for g in groups}
+        # odd starts, early, all on monday
+        solution = [Allocation(g_id, [101], 1, [2 * g_id + 7, 2 * g_id + 8]) for g_id in [1, 2, 3]]
+        start = ScheduleRating(problem, solution).total
+
+        search = NeighbourhoodSearch(problem, groups, placements)
+        search.run(solution, 50, 10.0)
+
+        self.assertGreater(search.rating.total, start)
+        self.assertEqual(search.rating.total, ScheduleRating(problem, list(search.solution.values())).total)
@@ -1,5 +1,8 @@
 from src import Parser
 from src.models import Group
+from src.solver import MAX_RESTARTS, MAX_WORKERS
+import json
+import os
 import unittest
 
 class TestParser(unittest.TestCase):
@@ -109,7 +112,7 @@ class TestParser(unittest.TestCase):
         c1 = problem.clusters[0]
         self.assertEqual(c1.id, 1)
         self.assertEqual(c1.range, [2])
-        self.assertEqual(c1.group_ids, [1, 2])
+        self.assertEqual(c1.group_ids, {1, 2})
 
         # Rooms
         self.assertEqual(len(problem.rooms), 1)
@@ -225,3 +228,61 @@ class TestParser(unittest.TestCase):
             parser.parse(data)
 
         self.assertIn("teacher", str(err.exception))
+
+    def test_parsing_restarts_and_workers(self):
+        parser = Parser()
+        request = parser.parse(f'{{"method": "ordered_groups_alg", "restarts": 8, "workers": {MAX_WORKERS}, "select": "best"}}')
+
+        self.assertEqual(request.restarts, 8)
+        self.assertEqual(request.workers, MAX_WORKERS)
+        self.assertEqual(request.select, "best")
+
+        request = parser.parse('{"method": "ordered_groups_alg"}')
+        self.assertEqual(request.restarts, 1)
+        self.assertEqual(request.workers, 1)
+        self.assertEqual(request.select, "first")
+
+    def test_parsing_bad_restarts_throws(self):
+        parser = Parser()
+        with self.assertRaises(ValueError) as err:
+            parser.parse('{"method": "ordered_groups_alg", "restarts": 0}')
+
+        self.assertIn("restarts", str(err.exception))
+
+    def test_parsing_too_many_restarts_or_workers_throws(self):
+        parser = Parser()
+        for field, limit in [("restarts", MAX_RESTARTS), ("workers", MAX_WORKERS)]:
+            with self.subTest(field):
+                with self.assertRaises(ValueError) as err:
+                    parser.parse(f'{{"method": "ordered_groups_alg", "{field}": {limit + 1}}}')
+
+                self.assertIn(field, str(err.exception))
+                self.assertIn(f"not greater than {limit}", str(err.exception))
+
+    def test_parsing_portfolio_with_deadline(self):
+        parser = Parser()
+        request = parser.parse('{"method": "portfolio", "deadline": 2.5}')
+
+        self.assertEqual(request.method, "portfolio")
+        self.assertEqual(request.deadline, 2.5)
+
+        with self.assertRaises(ValueError) as err:
+            parser.parse('{"method": "portfolio", "deadline": -1}')
+        self.assertIn("deadline", str(err.exception))
+
+    def test_parse_dict_same_as_parse(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, "big_problem.json")) as f:
+            data = f.read()
+
+        from_string = Parser().parse(data)
+        from_dict = Parser().parse_dict(json.loads(data))
+
+        self.assertEqual(from_dict.method, from_string.method)
+        self.assertEqual(str(from_dict.problem), str(from_string.problem))
+        for group_id, group in from_string.problem.groups.items():
+            other = from_dict.problem.groups[group_id]
+            self.assertEqual(other.availability.masks, group.availability.masks)
+            self.assertEqual(other.labels, group.labels)
+            self.assertEqual(other.teacher_ids, group.teacher_ids)
+        self.assertEqual(from_dict.problem.allocations, from_string.problem.allocations)
@@ -360,6 +360,21 @@ class TestProblem(unittest.TestCase):
         self.assertEqual(prob.clusters[0].allocations[0].group_id, 31)
         self.assertEqual(len(prob.clusters[0].allocations), 1)
 
+    def test_clusters_should_be_indexed_by_id_and_group(self):
+        c1 = Cluster(1, [2,2], [31,32])
+        c2 = Cluster(2, [], [32,33])
+        prob = Problem(clusters=[c1])
+        prob.add_cluster(c2)
+
+        self.assertIs(prob.clusters_by_id[2], c2)
+        self.assertEqual(prob.clusters_by_group[31], [c1])
+        self.assertEqual(prob.clusters_by_group[32], [c1, c2])
+        self.assertNotIn(34, prob.clusters_by_group)
+
+        prob.add_allocation(Allocation(33, [], 1, [8]))
+        self.assertEqual(c1.allocations, [])
+        self.assertEqual(len(c2.allocations), 1)
+
     def test_adding_clusters_with_same_id_should_trow(self):
         problem = Problem()
         c1 = Cluster(8, [], [1,2])
@@ -399,3 +414,97 @@ class TestProblem(unittest.TestCase):
 
         failed_constraints = p.check(method="full_check")
         self.assertEqual(len(failed_constraints), 8)
+
+    def test_restore_should_undo_bookings(self):
+        problem = Problem()
+        teacher = Teacher(1, Availability({1: [10, 11, 12]}))
+        room = Room(101, 50, Availability({1: [10, 11, 12]}), ["LAB"])
+        problem.add_teacher(teacher)
+        problem.add_room(room)
+        problem.add_group(Group(5, 2, 30, Availability({1: [10, 11, 12]}), [[["LAB"]]], [1], []))
+        problem.add_group(Group(6, 1, 30, Availability({1: [10, 11, 12]}), [[["LAB"]]], [1], [2]))
+        problem.add_cluster(Cluster(1, [], [5, 6]))
+
+        marker = problem.snapshot()
+        self.assertTrue(problem.add_allocation_and_update_availability(Allocation(5, [101], 1, [10, 11])))
+        self.assertTrue(problem.add_allocation_and_update_availability(Allocation(6, [101], 1, [12])))
+        problem.restore(marker)
+
+        self.assertEqual(problem.allocations, [])
+        self.assertEqual(problem.clusters[0].allocations, [])
+        self.assertEqual(teacher.availability.slots[1], [10, 11, 12])
+        self.assertEqual(room.availability.slots[1], [10, 11, 12])
+        self.assertEqual(teacher.availability.taken_periods, {})
+        self.assertEqual(room.availability.taken_periods, {})
+
+    def test_allocation_indexes_should_follow_changes(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12], 2: [10, 11, 12]})))
+        problem.add_room(Room(101, 50, Availability({1: [10, 11, 12], 2: [10, 11, 12]}), ["LAB"]))
+        problem.add_group(Group(5, 1, 30, Availability({1: [10, 11, 12], 2: [10, 11, 12]}), [[["LAB"]]], [1], []))
+        problem.add_group(Group(6, 1, 30, Availability({1: [10, 11, 12], 2: [10, 11, 12]}), [[["LAB"]]], [1], []))
+        a5 = Allocation(5, [101], 1, [10])
+        a6 = Allocation(6, [101], 2, [11])
+        problem.allocations = [a5]
+
+        self.assertIs(problem.get_allocation(5), a5)
+        self.assertIsNone(problem.get_allocation(6))
+        self.assertFalse(problem.is_allocated(6))
+
+        marker = problem.snapshot()
+        problem.book_established_allocations()
+        self.assertTrue(problem.add_allocation_and_update_availability(a6))
+        self.assertIs(problem.get_allocation(6), a6)
+        self.assertEqual(problem.allocations_by_teacher[1], [a5, a6])
+        self.assertEqual(problem.allocations_by_room[101], [a5, a6])
+        self.assertEqual(problem.allocations_by_day[2], [a6])
+
+        problem.remove_allocation(a5)
+        self.assertFalse(problem.is_allocated(5))
+        self.assertEqual(problem.allocations_by_teacher[1], [a6])
+
+        problem.restore(marker)
+        self.assertEqual(problem.allocations, [a5])
+        self.assertIs(problem.get_allocation(5), a5)
+        self.assertFalse(problem.is_allocated(6))
+        self.assertEqual(problem.allocations_by_room[101], [a5])
+        self.assertEqual(problem.allocations_by_day.get(2, []), [])
+
+    def test_allocation_added_before_group_should_be_indexed_by_teacher(self):
+        problem = Problem()
+        allocation = Allocation(5, [101], 1, [10])
+        problem.add_allocation(allocation)
+        problem.add_group(Group(5, 1, 30, Availability({1: [10]}), [[["LAB"]]], [1], []))
+        self.assertEqual(problem.allocations_by_teacher[1], [allocation])
+
+    def test_failed_add_allocation_and_update_availability_should_not_leave_bookings(self):
+        problem = Problem()
+        teacher = Teacher(1, Availability({1: [10, 11, 12]}))
+        room = Room(101, 50, Availability({1: [10]}), ["LAB"])
+        problem.add_teacher(teacher)
+        problem.add_room(room)
+        problem.add_group(Group(5, 2, 30, Availability({1: [10, 11, 12]}), [[["LAB"]]], [1], []))
+
+        # teacher can be booked, but room is not available in slot 11
+        self.assertFalse(problem.add_allocation_and_update_availability(Allocation(5, [101], 1, [10, 11])))
+
+        self.assertEqual(teacher.availability.slots[1], [10, 11, 12])
+        self.assertEqual(room.availability.slots[1], [10])
+
+    def test_check_group_should_keep_checker_up_to_date(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        problem.add_group(Group(5, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+        problem.add_group(Group(6, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+        problem.add_allocation(Allocation(5, [], 1, [10]))
+        self.assertEqual(problem.check_group(5), [])
+        checker = problem.checker
+
+        marker = problem.snapshot()
+        problem.add_allocation(Allocation(6, [], 1, [10]))
+        self.assertIs(problem.checker, checker)
+        self.assertEqual([i.msg for i in problem.check_group(5)], ["Teacher with id=1 has conflicting classes on 1"])
+
+        problem.restore(marker)
+        self.assertEqual(problem.check_group(5), [])
+        self.assertEqual(problem.check_group(6)[0].msg, "Group with id=6 is not present in solution")
@@ -0,0 +1,85 @@
+from src import Parser, ProblemCache
+import json
+import os
+import unittest
+
+def load_big_problem() -> dict:
+    here = os.path.dirname(__file__)
+    with open(os.path.join(here, "big_problem.json")) as f:
+        return json.load(f)
+
+class TestProblemCache(unittest.TestCase):
+    def test_repeated_request_reuses_base_problem(self):
+        data = load_big_problem()
+        parser = Parser(ProblemCache())
+
+        first = parser.parse_dict(data).problem
+        second = parser.parse_dict(data).problem
+
+        self.assertEqual(parser.cache.hits, 1)
+        self.assertEqual(parser.cache.misses, 1)
+        self.assertIsNot(first, second)
+        self.assertIs(first.room_index, second.room_index)
+        self.assertEqual(set(first.groups), set(second.groups))
+
+    def test_changing_allocations_hits_cache(self):
+        data = load_big_problem()
+        parser = Parser(ProblemCache())
+        parser.parse_dict(data)
+
+        data["allocations"] = []
+        data["method"] = "ordered_groups_alg"
+        request = parser.parse_dict(data)
+
+        self.assertEqual(parser.cache.hits, 1)
+        self.assertEqual(request.problem.allocations, [])
+        self.assertEqual(request.method, "ordered_groups_alg")
+
+    def test_changing_static_part_misses_cache(self):
+        data = load_big_problem()
+        parser = Parser(ProblemCache())
+        parser.parse_dict(data)
+
+        data["rooms"][0]["capacity"] += 1
+        parser.parse_dict(data)
+
+        self.assertEqual(parser.cache.hits, 0)
+        self.assertEqual(len(parser.cache), 2)
+
+    def test_solving_does_not_change_cached_problem(self):
+        data = load_big_problem()
+        data["allocations"] = []
+        parser = Parser(ProblemCache())
+        first = parser.parse_dict(data).problem
+
+        first.book_established_allocations()
+        group = next(iter(first.groups.values()))
+        teacher = first.teachers[group.teacher_ids[0]]
+        day = next(day for day, slots in teacher.availability.slots.items() if slots)
+        slot = teacher.availability.slots[day][0]
+        self.assertTrue(first.book_time_slot(teacher.availability, day, slot, []))
+
+        second = parser.parse_dict(data).problem
+        self.assertTrue(second.teachers[teacher.id].availability.is_available(day, slot))
+
+    def test_least_recently_used_are_evicted(self):
+        cache = ProblemCache(max_bytes=100)
+
+        cache.put("a", "problem a", 40)
+        cache.put("b", "problem b", 40)
+        cache.get("a")
+        cache.put("c", "problem c", 40)
+
+        self.assertEqual(set(cache.entries), {"a", "c"})
+        self.assertEqual(cache.size, 80)
+
+    def test_invalid_allocations_are_reported_on_cache_hit(self):
+        data = load_big_problem()
+        parser = Parser(ProblemCache())
+        parser.parse_dict(data)
+
+        data["allocations"] = [{"group_id": 1, "room_ids": [], "day": 9, "slots": [1]}]
+        with self.assertRaises(ValueError) as err:
+            parser.parse_dict(data)
+
+        self.assertIn("allocations[0].day", str(err.exception))
@@ -0,0 +1,136 @@
+from src.propagation import DomainPropagation
+from src import Problem, Solver
+from src.models import Group, Teacher, Room, Availability, Allocation
+from src.algorithms.utils import get_all_placements_for_group
+import unittest
+
+class TestPropagation(unittest.TestCase):
+    def test_should_drop_times_overlapping_every_time_of_group_of_same_teacher(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        # group 1 can start at 10 or 11 only, so it always takes slot 11
+        problem.add_group(Group(1, 2, 30, Availability({1: [10, 11, 12]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11, 12, 13]}), [], [1], []))
+
+        propagation = DomainPropagation(problem)
+
+        self.assertEqual(propagation.run(), [])
+        self.assertEqual(propagation.times[1], {(1, 10), (1, 11)})
+        self.assertEqual(propagation.times[2], {(1, 10), (1, 12), (1, 13)})
+
+    def test_should_find_forced_assignments(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+
+        propagation = DomainPropagation(problem)
+
+        self.assertEqual(propagation.run(), [])
+        self.assertEqual(propagation.forced, {1: (1, 10), 2: (1, 11)})
+
+    def test_should_use_only_room_suiting_groups_as_shared_resource(self):
+        problem = Problem()
+        problem.add_room(Room(101, 50, Availability({1: [10, 11]}), ["lab", "pc"]))
+        problem.add_room(Room(102, 50, Availability({1: [10, 11]}), ["pc"]))
+        for t_id in [1, 2, 3]:
+            problem.add_teacher(Teacher(t_id, Availability({1: [10, 11]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [[["lab"]]], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11]}), [[["lab"]]], [2], []))
+        # both rooms suit group 3, so it does not always need the lab
+        problem.add_group(Group(3, 1, 30, Availability({1: [10]}), [[["pc"]]], [3], []))
+
+        propagation = DomainPropagation(problem)
+
+        self.assertEqual(propagation.run(), [])
+        self.assertEqual(propagation.times[2], {(1, 11)})
+        self.assertEqual(propagation.arcs()[3], set())
+
+    def test_should_not_connect_groups_of_different_periods(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [], [1], [1, 3]))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10]}), [], [1], [2, 4]))
+
+        self.assertEqual(DomainPropagation(problem).run(), [])
+
+    def test_should_report_groups_without_placements(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [12]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10]}), [], [1], []))
+        problem.add_group(Group(3, 1, 30, Availability({1: [10]}), [], [1], []))
+
+        issues = DomainPropagation(problem).run()
+
+        self.assertEqual([i.id for i in issues], [1])
+        self.assertIn("No placement is possible for group with id=1", issues[0].msg)
+
+        # group 1 is fine now, 2 and 3 both need slot 10
+        problem.groups[1].availability = Availability({1: [11]})
+        issues = DomainPropagation(problem).run()
+
+        self.assertEqual(len(issues), 1)
+        other = 3 if issues[0].id == 2 else 2
+        self.assertIn(f"overlaps all times left to group with id={other}", issues[0].msg)
+
+    def test_should_keep_established_allocations(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+        problem.allocations = [Allocation(1, [], 1, [10])]
+
+        propagation = DomainPropagation(problem)
+
+        self.assertEqual(propagation.run(), [])
+        self.assertEqual(propagation.times, {2: {(1, 11)}})
+        self.assertEqual(problem.teachers[1].availability.slots[1], [10, 11])
+
+    def test_algorithms_should_use_reduced_domains(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        problem.add_group(Group(1, 2, 30, Availability({1: [10, 11, 12]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11, 12, 13]}), [], [1], []))
+        propagation = DomainPropagation(problem)
+        propagation.run()
+
+        problem.domains = propagation.domains()
+
+        self.assertEqual(sorted(a.slots[0] for a in get_all_placements_for_group(problem.groups[2], problem)), [10, 12, 13])
+
+    def test_solver_should_return_issues_of_propagation(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [11]}), [], [1], []))
+
+        result = Solver().solve(problem, "backtracking_alg")
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.solution, [])
+        self.assertIn("(PROPAGATION)", result.errors[0]["msg:"])
+        self.assertEqual(problem.domains, {})
+
+    def test_solver_should_keep_established_allocations_when_propagation_fails(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10]}), [], [1], []))
+        problem.allocations = [Allocation(1, [], 1, [10])]
+
+        result = Solver().solve(problem, "backtracking_alg")
+
+        self.assertFalse(result.success)
+        self.assertEqual(result.errors[0]["id"], 2)
+        self.assertEqual(result.solution, [Allocation(1, [], 1, [10])])
+
+    def test_solver_should_report_forced_assignments(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12]})))
+        problem.add_group(Group(1, 1, 30, Availability({1: [10]}), [], [1], []))
+        problem.add_group(Group(2, 1, 30, Availability({1: [10, 11, 12]}), [], [1], []))
+
+        result = Solver().solve(problem, "backtracking_alg")
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.stats["forced"], [{"group_id": 1, "day": 1, "start": 10}])
@@ -0,0 +1,78 @@
+from src.algorithms.repair_solve import repair_solve, RepairSearch
+from src.algorithms.utils import get_all_placements_for_group
+from src import Problem, Solver
+from src.models import Group, Teacher, Room, Availability, Allocation, Cluster
+import unittest
+import random
+
+class TestRepair(unittest.TestCase):
+    def make_problem(self) -> Problem:
+        # three groups of one teacher who is available in slots 10-12 only
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12]})))
+        problem.add_room(Room(101, 50, Availability({1: [10, 11, 12]}), ["lab"]))
+        for g_id in [1, 2, 3]:
+            problem.add_group(Group(g_id, 1, 30, Availability({1: [10, 11, 12]}), [[["lab"]]], [1], []))
+        return problem
+
+    def test_should_resolve_conflicts_of_initial_placements(self):
+        for seed in range(10):
+            random.seed(seed)
+            problem = self.make_problem()
+            placements = {g.id: get_all_placements_for_group(g, problem) for g in problem.groups.values()}
+            search = RepairSearch(problem, placements)
+
+            # all groups at the same time
+            search.assign([Allocation(g_id, [101], 1, [10]) for g_id in [1, 2, 3]])
+            self.assertEqual(sorted(search.conflicted()), [1, 2, 3])
+
+            self.assertTrue(search.run())
+            self.assertEqual(sorted(a.slots[0] for a in search.assignment.values()), [10, 11, 12])
+
+    def test_should_solve_cluster_of_groups(self):
+        for seed in range(10):
+            random.seed(seed)
+            problem = self.make_problem()
+            problem.teachers[1].availability = Availability({1: [10, 11, 12], 2: [10, 11, 12]})
+            problem.rooms[101].availability = Availability({1: [10, 11, 12], 2: [10, 11, 12]})
+            for g in problem.groups.values():
+                g.availability = Availability({1: [10, 11, 12], 2: [10, 11, 12]})
+            # groups 1 and 2 have to take place one after another
+            problem.add_cluster(Cluster(1, [2], [1, 2]))
+
+            result = Solver().solve(problem, "repair_alg")
+
+            self.assertTrue(result.success)
+            cluster_allocations = [a for a in result.solution if a.group_id in [1, 2]]
+            self.assertEqual(cluster_allocations[0].day, cluster_allocations[1].day)
+
+    def test_cluster_conflicts_should_agree_with_cluster_uncovered(self):
+        random.seed(0)
+        problem = Problem()
+        days = {1: list(range(8, 14)), 2: list(range(8, 14))}
+        problem.add_teacher(Teacher(1, Availability(days)))
+        for g_id in [1, 2, 3, 4]:
+            problem.add_group(Group(g_id, 1 + g_id % 2, 30, Availability(days), [], [1], [g_id]))
+        problem.add_cluster(Cluster(1, [2, 3], [1, 2, 3, 4]))
+        cluster = problem.clusters[0]
+        placements = {g.id: get_all_placements_for_group(g, problem) for g in problem.groups.values()}
+        search = RepairSearch(problem, placements)
+        search.assign([])
+
+        for _ in range(50):
+            g_id = random.choice(list(placements))
+            allocation = random.choice(placements[g_id])
+            others = [a for id, a in search.assignment.items() if id != g_id]
+            self.assertEqual(search.covers[1].uncovered(search.assignment[g_id], allocation), cluster.uncovered(others + [allocation]))
+            search.move({g_id: allocation})
+            self.assertEqual(search.covers[1].uncovered(), cluster.uncovered(list(search.assignment.values())))
+
+    def test_should_report_groups_with_conflicts_left(self):
+        problem = self.make_problem()
+        problem.add_group(Group(4, 1, 30, Availability({1: [10, 11, 12]}), [[["lab"]]], [1], []))
+
+        result = repair_solve(problem, max_steps=50)
+
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.solution), 3)
+        self.assertEqual(result.errors[0]["type"], "group")
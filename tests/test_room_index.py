@@ -0,0 +1,35 @@
+from src import RoomIndex, Problem, Room, Availability
+import unittest
+
+class TestRoomIndex(unittest.TestCase):
+    def test_candidates_filter_labels_and_capacity(self):
+        rooms = {
+            1: Room(1, 30, Availability({}), ["lab", "linux"]),
+            2: Room(2, 20, Availability({}), ["lab"]),
+            3: Room(3, 40, Availability({}), ["TV"]),
+        }
+        index = RoomIndex(rooms)
+
+        self.assertEqual(index.candidates([["lab"]], 10), [1, 2])
+        self.assertEqual(index.candidates([["lab"]], 25), [1])
+        self.assertEqual(index.candidates([["lab", "linux"]], 0), [1])
+        self.assertEqual(index.candidates([["linux"], ["TV"]], 0), [1, 3])
+        self.assertEqual(index.candidates([["projector"]], 0), [])
+
+    def test_same_clause_in_different_order_shares_cache_entry(self):
+        rooms = {1: Room(1, 30, Availability({}), ["lab", "linux"])}
+        index = RoomIndex(rooms)
+
+        first = index.candidates([["lab", "linux"], ["TV"]], 10)
+        second = index.candidates([["TV"], ["linux", "lab"]], 10)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(index.candidates_cache), 1)
+
+    def test_problem_rebuilds_index_after_adding_room(self):
+        problem = Problem()
+        problem.add_room(Room(1, 30, Availability({}), ["lab"]))
+        self.assertEqual(problem.get_room_index().candidates([["lab"]], 0), [1])
+
+        problem.add_room(Room(2, 30, Availability({}), ["lab"]))
+        self.assertEqual(problem.get_room_index().candidates([["lab"]], 0), [1, 2])
@@ -0,0 +1,131 @@
+from src import Parser, SessionManager
+from src.validation import ValidationError
+from unittest import mock
+import unittest
+
+def make_request() -> dict:
+    return {
+        "method": "full_check",
+        "teachers": [{"id": 1, "availability": {"1": [8, 9, 10, 11]}}],
+        "rooms": [
+            {"id": 101, "capacity": 30, "availability": {"1": [8, 9, 10, 11]}, "labels": ["lab"]},
+            {"id": 102, "capacity": 30, "availability": {"1": [8, 9, 10, 11]}, "labels": ["lab"]}
+        ],
+        "groups": [
+            {"id": 1, "duration": 2, "capacity": 20, "availability": {"1": [8, 9, 10, 11]}, "labels": [[["lab"]]], "teacher_ids": [1]},
+            {"id": 2, "duration": 2, "capacity": 20, "availability": {"1": [8, 9, 10, 11]}, "labels": [[["lab"]]], "teacher_ids": [1]}
+        ],
+        "allocations": [
+            {"group_id": 1, "room_ids": [101], "day": 1, "slots": [8, 9]},
+            {"group_id": 2, "room_ids": [102], "day": 1, "slots": [10, 11]}
+        ]
+    }
+
+def allocation(group_id, room_id, slots) -> dict:
+    return {"group_id": group_id, "room_ids": [room_id], "day": 1, "slots": slots}
+
+class TestSessions(unittest.TestCase):
+    def setUp(self):
+        self.sessions = SessionManager(Parser())
+        self.created = self.sessions.create(make_request())
+        self.session_id = self.created.session_id
+
+    def test_create_session(self):
+        self.assertTrue(self.created.success)
+        self.assertEqual(self.created.created, [])
+        self.assertIsNotNone(self.sessions.get(self.session_id))
+
+    def test_move_creates_and_resolves_issues(self):
+        response = self.sessions.apply(self.session_id, {"operations": [{"op": "move", "allocation": allocation(2, 101, [9, 10])}]})
+
+        self.assertFalse(response.success)
+        types = sorted(issue["type"] for issue in response.created)
+        # both groups now have teacher and room conflicts
+        self.assertEqual(types, ["room", "room", "teacher", "teacher"])
+        self.assertEqual(response.resolved, [])
+        self.assertEqual(response.remaining, 4)
+
+        response = self.sessions.apply(self.session_id, {"operations": [{"op": "move", "allocation": allocation(2, 102, [10, 11])}]})
+
+        self.assertTrue(response.success)
+        self.assertEqual(response.created, [])
+        self.assertEqual(len(response.resolved), 4)
+
+    def test_remove_and_add(self):
+        response = self.sessions.apply(self.session_id, {"operations": [{"op": "remove", "group_id": 1}]})
+
+        self.assertEqual([issue["id"] for issue in response.created], [1])
+        self.assertEqual(response.remaining, 1)
+
+        response = self.sessions.apply(self.session_id, {"operations": [{"op": "add", "allocation": allocation(1, 101, [8, 9])}]})
+
+        self.assertTrue(response.success)
+        self.assertEqual(len(response.resolved), 1)
+
+    def test_delta_agrees_with_full_check(self):
+        operations = [
+            {"op": "move", "allocation": allocation(1, 102, [10, 11])},
+            {"op": "remove", "group_id": 2},
+            {"op": "add", "allocation": allocation(2, 102, [11, 12])}
+        ]
+        self.sessions.apply(self.session_id, {"operations": operations})
+
+        session = self.sessions.get(self.session_id)
+        full = session.problem.check("full_check")
+        self.assertEqual(sorted((i.type, i.id, i.msg) for i in full), sorted((i.type, i.id, i.msg) for i in session.all_issues()))
+
+    def test_invalid_operation_changes_nothing(self):
+        operations = [
+            {"op": "remove", "group_id": 1},
+            {"op": "move", "allocation": allocation(1, 101, [8, 9])}
+        ]
+        with self.assertRaises(ValueError):
+            self.sessions.apply(self.session_id, {"operations": operations})
+
+        session = self.sessions.get(self.session_id)
+        self.assertEqual(len(session.problem.allocations), 2)
+        self.assertEqual(len(session.problem.clusters), 0)
+        self.assertEqual(session.remaining, 0)
+
+    def test_any_error_changes_nothing(self):
+        session = self.sessions.get(self.session_id)
+        operations = [{"op": "remove", "group_id": 1}]
+        with mock.patch.object(session.problem, "check_group", side_effect=RuntimeError("failed")):
+            with self.assertRaises(RuntimeError):
+                self.sessions.apply(self.session_id, {"operations": operations})
+
+        self.assertEqual(len(session.problem.allocations), 2)
+        self.assertEqual(session.remaining, 0)
+        # the same operations can be applied again
+        response = self.sessions.apply(self.session_id, {"operations": operations})
+        self.assertEqual(response.remaining, 1)
+
+    def test_cluster_with_undefined_group(self):
+        request = make_request()
+        request["clusters"] = [{"id": 1, "range": [], "group_ids": [1, 99]}]
+        session_id = self.sessions.create(request).session_id
+
+        response = self.sessions.apply(session_id, {"operations": [{"op": "move", "allocation": allocation(1, 101, [10, 11])}]})
+
+        session = self.sessions.get(session_id)
+        full = session.problem.check("full_check")
+        self.assertEqual(response.remaining, len(full))
+        self.assertEqual(sorted((i.type, i.id, i.msg) for i in full), sorted((i.type, i.id, i.msg) for i in session.all_issues()))
+
+    def test_malformed_ids(self):
+        operations = [{"op": "remove", "group_id": [2]}, {"op": "add", "allocation": {**allocation(1, 101, [8, 9]), "room_ids": [None]}}]
+        with self.assertRaises(ValidationError) as err:
+            self.sessions.apply(self.session_id, {"operations": operations})
+
+        self.assertEqual([issue.path for issue in err.exception.issues], ["$.operations[0].group_id", "$.operations[1].allocation.room_ids[0]"])
+
+    def test_malformed_operations(self):
+        with self.assertRaises(ValidationError) as err:
+            self.sessions.apply(self.session_id, {"operations": [{"op": "swap"}, {"op": "add"}]})
+
+        self.assertEqual(len(err.exception.issues), 2)
+
+    def test_unknown_session(self):
+        self.assertIsNone(self.sessions.apply("missing", {"operations": []}))
+        self.assertFalse(self.sessions.remove("missing"))
+        self.assertTrue(self.sessions.remove(self.session_id))
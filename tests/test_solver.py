@@ -1,5 +1,11 @@
-from src import ALGORITHMS_AVAILABLE, Problem, Availability, Teacher, Room, Group, Solver, Response, Allocation
+from src import ALGORITHMS_AVAILABLE, Problem, Availability, Teacher, Room, Group, Solver, Response, Allocation, PORTFOLIO_METHOD, Monitor
+from src.solver import PORTFOLIO
+from unittest import mock
 import unittest
+import random
+
+# methods searching over placements of groups, which find solutions greedy algorithms may miss
+SEARCH_METHODS = ["backtracking_alg", "lns_alg", "exact_alg"]
 
 class TestSolver(unittest.TestCase):
     def test_solve_simple_case(self):
@@ -263,3 +269,186 @@ class TestSolver(unittest.TestCase):
                 self.assertEqual(result.solution[0].group_id, 1)
                 # Should have 2 rooms (one for each label set)
                 self.assertEqual(len(result.solution[0].room_ids), 2)
+
+    def test_solve_should_not_change_problem(self):
+        for method in ALGORITHMS_AVAILABLE:
+            with self.subTest(f"SOLVE USING OPTION {method}"):
+                problem = Problem()
+                teacher = Teacher(1, Availability({1: [10, 11, 12, 13]}))
+                room = Room(101, 50, Availability({1: [10, 11, 12, 13]}), ["lab"])
+                problem.add_teacher(teacher)
+                problem.add_room(room)
+                problem.add_group(Group(1, 1, 30, Availability({1: [10, 11, 12, 13]}), [[["lab"]]], [1], []))
+                problem.add_group(Group(2, 1, 30, Availability({1: [10, 11, 12, 13]}), [[["lab"]]], [1], []))
+                problem.add_allocation(Allocation(1, [101], 1, [10]))
+
+                solver = Solver()
+                for _ in range(3):
+                    result = solver.solve(problem, method)
+                    self.assertTrue(result.success)
+                    self.assertEqual(len(result.solution), 2)
+                    problem.allocations = [Allocation(1, [101], 1, [10])]
+
+                self.assertEqual(teacher.availability.slots[1], [10, 11, 12, 13])
+                self.assertEqual(room.availability.slots[1], [10, 11, 12, 13])
+
+    def make_one_teacher_problem(self, durations: list[int]) -> Problem:
+        # groups of one teacher who is available in slots 10-13 only
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        for g_id, duration in enumerate(durations, start=1):
+            problem.add_group(Group(g_id, duration, 30, Availability({1: [10, 11, 12, 13]}), [], [1], []))
+        return problem
+
+    def test_search_methods_should_place_groups_when_only_some_placements_fit_together(self):
+        # the first group taking slots 11-12 leaves no place for the second one
+        for method in SEARCH_METHODS:
+            for seed in range(10):
+                with self.subTest(f"{method} SEED {seed}"):
+                    random.seed(seed)
+                    problem = self.make_one_teacher_problem([2, 2])
+
+                    result = Solver().solve(problem, method)
+
+                    self.assertTrue(result.success)
+                    self.assertEqual(sorted(a.slots[0] for a in result.solution), [10, 12])
+
+    def test_search_methods_should_keep_established_allocations(self):
+        for method in SEARCH_METHODS:
+            for seed in range(5):
+                with self.subTest(f"{method} SEED {seed}"):
+                    random.seed(seed)
+                    problem = self.make_one_teacher_problem([2, 1, 1])
+                    problem.allocations = [Allocation(2, [], 1, [11])]
+
+                    result = Solver().solve(problem, method)
+
+                    self.assertTrue(result.success)
+                    self.assertEqual(sorted((a.group_id, a.slots[0]) for a in result.solution), [(1, 12), (2, 11), (3, 10)])
+
+    def make_two_groups_problem(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12, 13]})))
+        problem.add_room(Room(101, 50, Availability({1: [10, 11, 12, 13]}), ["lab"]))
+        problem.add_group(Group(1, 2, 30, Availability({1: [10, 11, 12, 13]}), [[["lab"]]], [1], []))
+        problem.add_group(Group(2, 2, 30, Availability({1: [10, 11, 12, 13]}), [[["lab"]]], [1], []))
+        return problem
+
+    def test_solve_with_restarts_in_one_process(self):
+        problem = self.make_two_groups_problem()
+
+        result = Solver().solve(problem, "probabilistic_alg", restarts=10, workers=1)
+
+        # random_solve fails whenever the first group takes slots 11 and 12
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.solution), 2)
+        attempts = result.stats["attempts"]
+        self.assertTrue(attempts[-1]["success"])
+        self.assertEqual(result.stats["winner"], attempts[-1]["attempt"])
+        self.assertTrue(all(a["time"] >= 0 for a in attempts))
+
+    def test_solve_with_restarts_in_process_pool(self):
+        for select in ["first", "best"]:
+            with self.subTest(f"SELECT {select}"):
+                problem = self.make_two_groups_problem()
+
+                # also where this machine has one CPU only
+                with mock.patch("src.solver.MAX_WORKERS", 2):
+                    result = Solver().solve(problem, "probabilistic_alg", restarts=6, workers=2, select=select)
+
+                self.assertTrue(result.success)
+                self.assertEqual(len(result.solution), 2)
+                self.assertIn(result.stats["winner"], range(6))
+                if select == "best":
+                    self.assertEqual(len(result.stats["attempts"]), 6)
+
+    def test_solve_in_other_processes_reports_progress_of_finished_attempts(self):
+        for method, restarts, workers in [(PORTFOLIO_METHOD, 1, 1), ("probabilistic_alg", 4, 2)]:
+            with self.subTest(method):
+                problem = self.make_two_groups_problem()
+                monitor = Monitor()
+
+                with mock.patch("src.solver.MAX_WORKERS", 2):
+                    result = Solver().solve(problem, method, restarts=restarts, workers=workers, monitor=monitor)
+
+                self.assertTrue(result.success)
+                self.assertEqual(monitor.progress()["groups_total"], 2)
+                self.assertEqual(monitor.progress()["groups_placed"], 2)
+
+    def test_solve_with_restarts_when_no_solution(self):
+        # three groups of one teacher in two slots (propagation alone does not find it)
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        for g_id in [1, 2, 3]:
+            problem.add_group(Group(g_id, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+
+        with mock.patch("src.solver.MAX_WORKERS", 2):
+            result = Solver().solve(problem, "ordered_groups_alg", restarts=3, workers=2)
+
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.stats["attempts"]), 3)
+
+    def test_solve_portfolio(self):
+        for select in ["first", "best"]:
+            with self.subTest(f"SELECT {select}"):
+                problem = Problem()
+                problem.add_teacher(Teacher(1, Availability({1: [10, 11, 12]})))
+                problem.add_room(Room(101, 50, Availability({1: [10, 11, 12]}), ["lab"]))
+                problem.add_group(Group(1, 1, 30, Availability({1: [10, 11, 12]}), [[["lab"]]], [1], []))
+
+                result = Solver().solve(problem, PORTFOLIO_METHOD, select=select, deadline=30)
+
+                self.assertTrue(result.success)
+                self.assertEqual(len(result.solution), 1)
+                self.assertIn(result.stats["winner"], PORTFOLIO)
+                members = {m["algorithm"]: m for m in result.stats["members"]}
+                self.assertEqual(set(members), set(PORTFOLIO))
+                self.assertTrue(members[result.stats["winner"]]["success"])
+                if select == "best":
+                    self.assertTrue(all(m["success"] for m in members.values()))
+
+    def test_solve_portfolio_with_restarts_throws(self):
+        problem = self.make_two_groups_problem()
+
+        with self.assertRaises(ValueError):
+            Solver().solve(problem, PORTFOLIO_METHOD, restarts=2)
+
+    def test_solve_portfolio_no_solution(self):
+        problem = Problem()
+        problem.add_teacher(Teacher(1, Availability({1: [10, 11]})))
+        for g_id in [1, 2, 3]:
+            problem.add_group(Group(g_id, 1, 30, Availability({1: [10, 11]}), [], [1], []))
+
+        result = Solver().solve(problem, PORTFOLIO_METHOD)
+
+        self.assertFalse(result.success)
+        self.assertTrue(all(m["success"] is False for m in result.stats["members"]))
+
+    def test_solve_reports_progress_to_monitor(self):
+        for method in ALGORITHMS_AVAILABLE:
+            with self.subTest(f"ALGORITHM {method}"):
+                problem = self.make_two_groups_problem()
+                problem.groups[1].availability = Availability({1: [10, 11]})
+                problem.groups[2].availability = Availability({1: [12, 13]})
+                monitor = Monitor()
+
+                result = Solver().solve(problem, method, monitor=monitor)
+
+                self.assertTrue(result.success)
+                progress = monitor.progress()
+                self.assertEqual(progress["algorithm"], method)
+                self.assertEqual(progress["groups_total"], 2)
+                self.assertEqual(progress["groups_placed"], 2)
+
+    def test_solve_cancelled(self):
+        for method in ALGORITHMS_AVAILABLE:
+            with self.subTest(f"ALGORITHM {method}"):
+                problem = self.make_two_groups_problem()
+                monitor = Monitor()
+                monitor.cancel()
+
+                result = Solver().solve(problem, method, monitor=monitor)
+
+                self.assertFalse(result.success)
+                self.assertEqual(result.errors[0]["type"], "solver")
+                self.assertEqual(result.solution, [])
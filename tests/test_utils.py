@@ -1,4 +1,4 @@
-from src.algorithms.utils import covers, get_all_placements_for_group
+from src.algorithms.utils import covers, get_all_placements_for_group, number_of_possible_placements, iter_placement_candidates, sample_placement
 from src.models import Group, Teacher, Availability, Room, Cluster, Allocation
 from src import Problem
 import unittest
@@ -201,3 +201,48 @@ class TestUtils(unittest.TestCase):
         placements = get_all_placements_for_group(g2, problem)
         # Should find all placements (1 12 and 13, not at 1 14 because cluster range is 5h long)
         self.assertEqual(len(placements), 2)
+
+    def test_numberOfPossiblePlacements_should_agree_with_get_all_placements(self):
+        problem = Problem()
+        group = Group(1,2,30,Availability({1:[10,11,12,13], 2:[8,9]}), [[["lab"]], [["TV"], ["lab"]]], [2], [])
+        problem.add_group(group)
+        problem.add_teacher(Teacher(2, Availability({1:[10,11,12,13], 2:[8,9]})))
+        problem.add_room(Room(3, 34, Availability({1:[10,11,12,13], 2:[8,9]}), ["lab"]))
+        problem.add_room(Room(4, 34, Availability({1:[10,11,12,13]}), ["lab"]))
+        problem.add_room(Room(5, 34, Availability({1:[12,13], 2:[8,9]}), ["TV"]))
+
+        placements = get_all_placements_for_group(group, problem)
+        # day 1: starts 10, 11 with 2*2 combos, start 12 with 2*3 combos; day 2: start 8 with 1*2 combos
+        self.assertEqual(len(placements), 16)
+        self.assertEqual(number_of_possible_placements(group, problem), 16)
+
+    def test_iterPlacementCandidates_should_yield_rooms_per_labels_clause(self):
+        problem = Problem()
+        group = Group(1,2,30,Availability({1:[10,11,12]}), [[["lab"]], [["TV"]]], [2], [])
+        problem.add_group(group)
+        problem.add_teacher(Teacher(2, Availability({1:[10,11,12]})))
+        problem.add_room(Room(3, 34, Availability({1:[10,11,12]}), ["lab"]))
+        problem.add_room(Room(4, 34, Availability({1:[11,12]}), ["lab", "TV"]))
+
+        candidates = list(iter_placement_candidates(group, problem))
+        self.assertEqual(candidates, [(1, 11, [[3, 4], [4]])])
+
+    def test_samplePlacement_should_return_one_of_all_placements(self):
+        problem = Problem()
+        group = Group(1,2,30,Availability({1:[10,11,12,13], 2:[8,9]}), [[["lab"]]], [2], [])
+        problem.add_group(group)
+        problem.add_teacher(Teacher(2, Availability({1:[10,11,12,13], 2:[8,9]})))
+        problem.add_room(Room(3, 34, Availability({1:[10,11,12,13], 2:[8,9]}), ["lab"]))
+        problem.add_room(Room(4, 34, Availability({1:[10,11,12,13]}), ["lab"]))
+
+        placements = get_all_placements_for_group(group, problem)
+        for _ in range(20):
+            self.assertIn(sample_placement(group, problem), placements)
+
+    def test_samplePlacement_should_return_none_when_no_placement(self):
+        problem = Problem()
+        group = Group(1,2,30,Availability({1:[10,12,14]}), [], [2], [])
+        problem.add_group(group)
+        problem.add_teacher(Teacher(2, Availability({1:[10,11,12,13,14,15]})))
+
+        self.assertIsNone(sample_placement(group, problem))
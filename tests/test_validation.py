@@ -0,0 +1,80 @@
+from src import Parser
+from src.validation import ValidationError, compile_schema, list_of, non_negative_int
+from src.parser import SCHEDULE_VALIDATOR, CHECK_VALIDATOR
+import json
+import os
+import unittest
+
+class TestValidation(unittest.TestCase):
+    def test_valid_request_has_no_issues(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, "big_problem.json")) as f:
+            data = json.load(f)
+
+        self.assertEqual(SCHEDULE_VALIDATOR(data), [])
+
+    def test_collects_all_issues_with_paths(self):
+        data = {
+            "method": "probabilistic_alg",
+            "restarts": 0,
+            "teachers": [
+                {"id": 1, "availability": {"1": [8, 9]}},
+                {"id": 2, "availability": {"1": [8, -1, "x"], "9": []}}
+            ],
+            "groups": [
+                {"id": 5, "duration": "abc", "capacity": 20, "availability": {"1": [8]}, "labels": [[[]]], "teacher_ids": [1]}
+            ],
+            "allocations": [{"group_id": 5, "room_ids": [], "day": 8}]
+        }
+
+        issues = SCHEDULE_VALIDATOR(data)
+
+        paths = {issue.path: issue for issue in issues}
+        self.assertEqual(set(paths), {
+            "$.restarts",
+            "$.teachers[1].availability['1'][1]",
+            "$.teachers[1].availability['1'][2]",
+            "$.teachers[1].availability['9']",
+            "$.groups[0].duration",
+            "$.groups[0].labels[0][0]",
+            "$.allocations[0].slots",
+            "$.allocations[0].day"
+        })
+        self.assertEqual(paths["$.restarts"].type, "parser")
+        self.assertEqual(paths["$.groups[0].duration"].type, "group")
+        self.assertEqual(paths["$.groups[0].duration"].id, 5)
+        self.assertEqual(paths["$.teachers[1].availability['1'][2]"].id, 2)
+        self.assertIn("abc", paths["$.groups[0].duration"].msg)
+
+    def test_method_depends_on_endpoint(self):
+        self.assertEqual(CHECK_VALIDATOR({"method": "full_check"}), [])
+        self.assertEqual(len(CHECK_VALIDATOR({"method": "probabilistic_alg"})), 1)
+        self.assertEqual(len(SCHEDULE_VALIDATOR({"method": "full_check"})), 1)
+
+    def test_booleans_are_not_integers(self):
+        validate = compile_schema(list_of(non_negative_int()))
+
+        self.assertEqual(validate([0, 3, 7]), [])
+        issues = validate([0, True])
+        self.assertEqual([issue.path for issue in issues], ["$[1]"])
+
+    def test_repeated_ids(self):
+        data = {
+            "rooms": [
+                {"id": 1, "capacity": 10, "availability": {}, "labels": []},
+                {"id": 1, "capacity": 20, "availability": {}, "labels": []}
+            ]
+        }
+
+        issues = SCHEDULE_VALIDATOR(data)
+
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(issues[0].path, "$.rooms[1].id")
+        self.assertIn("repeats", issues[0].msg)
+
+    def test_parser_raises_validation_error(self):
+        with self.assertRaises(ValidationError) as err:
+            Parser().parse_dict({"method": "ordered_groups_alg", "workers": -2, "select": "worst"})
+
+        self.assertEqual(len(err.exception.issues), 2)
+        self.assertIn("workers", str(err.exception))
@@ -81,6 +81,14 @@ class TestAvailability(unittest.TestCase):
         self.assertEqual(avail.slots[6], [])
         self.assertEqual(avail.slots[7], [])
 
+    def test_from_dict_accepts_string_and_integer_days(self):
+        for validate in [True, False]:
+            with self.subTest(f"VALIDATE {validate}"):
+                avail = Availability.from_dict({"1": [8, 9], 2: [10, 11]}, validate=validate)
+
+                self.assertEqual(avail.slots[1], [8, 9])
+                self.assertEqual(avail.slots[2], [10, 11])
+
     def test_remove_slot_without_mask(self):
         avail = Availability({1: [10, 11, 12], 2: [], 3: [], 4: [], 5: [], 6: [], 7: []})
         
@@ -203,3 +211,26 @@ class TestAvailability(unittest.TestCase):
         self.assertFalse(Availability.check_occurrence_desc([],[3]))
         self.assertTrue(Availability.check_occurrence_desc([1,2,3,4],[]))
         self.assertTrue(Availability.check_occurrence_desc([1,3],[2,4]))
+
+    def test_covers(self):
+        avail = Availability({1: [10, 11, 12, 14]})
+
+        self.assertTrue(avail.covers(1, 10, 3))
+        self.assertTrue(avail.covers(1, 14, 1))
+        self.assertFalse(avail.covers(1, 12, 2))
+        self.assertFalse(avail.covers(1, 9, 2))
+        self.assertFalse(avail.covers(2, 10, 1))
+
+    def test_starts_mask(self):
+        avail = Availability({1: [10, 11, 12, 14, 15]})
+
+        self.assertEqual(Availability.mask_to_slots(avail.starts_mask(1, 2)), [10, 11, 14])
+        self.assertEqual(Availability.mask_to_slots(avail.starts_mask(1, 3)), [10])
+        self.assertEqual(Availability.mask_to_slots(avail.starts_mask(1, 1)), [10, 11, 12, 14, 15])
+        self.assertEqual(avail.starts_mask(3, 1), 0)
+
+    def test_slots_view_is_sorted_and_deduplicated(self):
+        avail = Availability({1: [12, 10, 11, 10]})
+
+        self.assertEqual(avail.slots[1], [10, 11, 12])
+        self.assertEqual(list(avail.slots.keys()), [1, 2, 3, 4, 5, 6, 7])
@@ -15,7 +15,7 @@ class TestCluster(unittest.TestCase):
 
         self.assertEqual(cluster.id, 1)
         self.assertEqual(cluster.range, [2,2])
-        self.assertEqual(cluster.group_ids, [17,18])
+        self.assertEqual(cluster.group_ids, {17,18})
 
     def test_not_int_in_range_throws(self):
         data = """
@@ -32,6 +32,20 @@ class TestCluster(unittest.TestCase):
         self.assertIn("range", str(err.exception))
         self.assertIn("abc", str(err.exception))
     
+    def test_not_int_in_group_ids_throws(self):
+        data = """
+        {
+            "id" : 1,
+            "range": [2],
+            "group_ids": [17, [18]]
+        }
+        """
+
+        with self.assertRaises(ValueError) as err:
+            Cluster.from_json(data)
+
+        self.assertIn("group_ids", str(err.exception))
+
     def test_missing_field_throws(self):
         data = """
         {
@@ -58,13 +72,13 @@ class TestCluster(unittest.TestCase):
 
         self.assertEqual(c.id, 1)
         self.assertEqual(c.range, [])
-        self.assertEqual(c.group_ids, [17,18])
+        self.assertEqual(c.group_ids, {17,18})
 
     def test_can_create_cluster_with_empty_range_with_init(self):
         c = Cluster(1, [], [17,18])
         self.assertEqual(c.id, 1)
         self.assertEqual(c.range, [])
-        self.assertEqual(c.group_ids, [17,18])
+        self.assertEqual(c.group_ids, {17,18})
 
     def test_cluster_check_general(self):
         allocs = [
@@ -129,4 +143,46 @@ class TestCluster(unittest.TestCase):
                 c.add_allocation(a)
 
         self.assertFalse(cs[0].check())
-        self.assertTrue(cs[1].check())
\ No newline at end of file
+        self.assertTrue(cs[1].check())
+
+    def test_can_use_slots_should_check_all_slots_for_every_order_of_blocks(self):
+        c = Cluster(7, [2,1], [1,2])
+        c.add_allocation(Allocation(1, [], 1, [10]))
+
+        self.assertTrue(c.can_use_slots(1, [12,13]))
+        self.assertFalse(c.can_use_slots(1, [12,13,14]))
+
+    def test_cluster_check_with_many_blocks(self):
+        # every order of 10 blocks would be 3628800 permutations
+        c = Cluster(7, [1,2,3,4,5,6,7,8,9,10], [1,2])
+        c.add_allocation(Allocation(1, [], 1, list(range(0, 30))))
+        c.add_allocation(Allocation(2, [], 2, list(range(0, 25))))
+
+        self.assertTrue(c.check())
+        self.assertFalse(c.can_use_slots(3, [0]))
+
+    def test_check_should_follow_added_and_removed_allocations(self):
+        c = Cluster(7, [2,2], [1,2,3])
+        a1 = Allocation(1, [], 1, [10,11])
+        a2 = Allocation(2, [], 2, [10,11])
+        a3 = Allocation(3, [], 2, [14])
+        for a in [a1, a2, a3]:
+            c.add_allocation(a)
+        self.assertFalse(c.check())
+
+        self.assertTrue(c.remove_allocation(a3))
+        self.assertTrue(c.check())
+        self.assertEqual(c.day_slots, {1: [10,11], 2: [10,11]})
+        self.assertFalse(c.remove_allocation(a3))
+
+        self.assertTrue(c.can_use_slots(1, [11]))
+        self.assertFalse(c.can_use_slots(3, [10]))
+
+    def test_uncovered_should_count_slots_blocks_cannot_cover(self):
+        c = Cluster(7, [2], [1,2])
+        self.assertEqual(c.uncovered([Allocation(1, [], 1, [10,11])]), 0)
+        self.assertEqual(c.uncovered([Allocation(1, [], 1, [10,11]), Allocation(2, [], 1, [13])]), 1)
+        self.assertEqual(c.uncovered([Allocation(1, [], 1, [10,11]), Allocation(2, [], 2, [10,11])]), 2)
+
+        c = Cluster(7, [], [1,2])
+        self.assertEqual(c.uncovered([Allocation(1, [], 1, [10,11]), Allocation(2, [], 1, [11,12])]), 1)